@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.api.api_v1.endpoints import metrics, sync
 from app.api.api_v1.endpoints.auth import authentication, users
 from app.api.api_v1.endpoints.tasks import (
     projects,
@@ -19,3 +20,5 @@ api_router.include_router(tags.router)
 api_router.include_router(tag_items.router)
 api_router.include_router(sections.router)
 api_router.include_router(reactions.router)
+api_router.include_router(metrics.router)
+api_router.include_router(sync.router)
@@ -15,14 +15,16 @@ router = APIRouter(tags=["auth"])
 
 
 @router.post("/access-token", response_model=schemas.Token)
-def get_access_token(
+async def get_access_token(
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     OAuth2 compatible token login, get an access token for future requests
     """
     try:
-        user = User.authenticate(email=form_data.username, password=form_data.password)
+        user = await User.aauthenticate(
+            email=form_data.username, password=form_data.password
+        )
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         return {
             "access_token": User.generate_access_token(
@@ -1,9 +1,13 @@
-from fastapi import Depends
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, Response
 
 from app import schemas
 from app.api.deps import get_current_active_user
-from app.api.router import CrudRouter
-from app.models import User
+from app.api.router import CrudRouter, set_next_cursor
+from app.core.exceptions import InvalidCursor
+from app.managers.loading import load_profile
+from app.models import Activity, User
 
 router = CrudRouter(
     model=User,
@@ -15,6 +19,12 @@ router = CrudRouter(
 )
 
 
+@router.post("/", response_model=schemas.User, status_code=201)
+async def create_user(user_in: schemas.UserCreate):
+    """Password is hashed in the hashing pool, off the event loop."""
+    return await User.acreate(**dict(user_in))
+
+
 @router.get("/me/", response_model=schemas.User)
 async def get_me(
     user: schemas.User = Depends(get_current_active_user),
@@ -23,5 +33,29 @@ async def get_me(
 
 
 @router.get("/me/activities", response_model=list[schemas.Activity])
-async def get_my_activities(user: schemas.User = Depends(get_current_active_user)):
-    return user.activities[::-1]
+async def get_my_activities(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    project_id: Optional[int] = None,
+    task_id: Optional[int] = None,
+    tag_id: Optional[int] = None,
+    user: schemas.User = Depends(get_current_active_user),
+):
+    """Activities of the user, newest first. Pages are selected by keyset on
+    (created, id), the next one is in `X-Next-Cursor` header."""
+    targets = {"project_id": project_id, "task_id": task_id, "tag_id": tag_id}
+    try:
+        with load_profile(Activity, schemas.Activity):
+            activities, next_cursor = Activity.paginate(
+                limit=limit,
+                order_by="created",
+                desc=True,
+                cursor=cursor,
+                actor_id=user.id,
+                **{key: value for key, value in targets.items() if value is not None},
+            )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, next_cursor)
+    return activities
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_active_superuser
+from app.db.cache import cache
+from app.tasks.activity import activity_queue
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/cache", dependencies=[Depends(get_current_active_superuser)])
+async def get_cache_metrics():
+    return {**cache.stats.as_dict(), "local_size": len(cache.local)}
+
+
+@router.get("/activities", dependencies=[Depends(get_current_active_superuser)])
+async def get_activity_metrics():
+    return {**activity_queue.stats.as_dict(), "depth": activity_queue.depth}
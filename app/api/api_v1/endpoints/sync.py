@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app import schemas
+from app.api.deps import get_current_active_user
+from app.core.exceptions import InvalidCursor
+from app.managers.loading import load_profile
+from app.models import Tombstone, User
+from app.models.tasks import Reaction
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/", response_model=schemas.SyncChanges)
+async def get_changes(
+    since: str | None = None,
+    user: User = Depends(get_current_active_user),
+):
+    """Changes of tasks, sections, tags and reactions since `since`, the
+    `cursor` of the previous response. Without it every row is returned.
+    Deleted rows are listed in `deleted`."""
+    try:
+        since_time = Tombstone.decode_since(since) if since else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    with load_profile(Reaction, schemas.Reaction):
+        return Tombstone.changes(user.id, since_time)
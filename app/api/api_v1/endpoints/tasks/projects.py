@@ -1,9 +1,12 @@
-from fastapi import Depends, HTTPException
-from fastapi_sqlalchemy import db
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import select
 
 from app import schemas
 from app.api.deps import Permission, get_current_active_user
-from app.api.router import AuthenticatedCrudRouter
+from app.api.etag import is_fresh, not_modified, set_etag
+from app.api.router import AuthenticatedCrudRouter, headers_target, set_next_cursor
+from app.core.exceptions import InvalidCursor
+from app.managers.loading import load_profile
 from app.models import Project, Task, User
 
 router = AuthenticatedCrudRouter(
@@ -14,63 +17,116 @@ router = AuthenticatedCrudRouter(
     prefix="/projects",
     tags=["task"],
     owner_field_is_required=True,
+    filter_fields=("is_favorite", "is_pinned", "name__icontains"),
+    fast_serialization=True,
 )
 
 
-def get_project_from_db(id):
-    return schemas.Project.from_orm(Project.get(id=id))
+def get_project_from_db(id: int):
+    """Loads only what permissions need, responses load the rest."""
+    owner_id, participant_ids = Project.access(id)
+    return schemas.ProjectAccess(
+        id=id, owner_id=owner_id, participant_ids=participant_ids
+    )
 
 
-@router.get("/{id}")
+@router.get("/{id}", response_model=schemas.Project)
 async def get_project(
-    project: schemas.Project = Permission("view", get_project_from_db)
+    request: Request,
+    response: Response,
+    project: schemas.ProjectAccess = Permission("view", get_project_from_db),
 ):
-    return project
+    fieldset = router.parse_fieldset(request)
+    etag = router.etag(request, select(Project.id).where(Project.id == project.id))
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    instance = await router.run_manager("get", id=project.id, fieldset=fieldset)
+    content = router.render(fieldset, instance)
+    set_etag(headers_target(content, response), etag)
+    return content
 
 
 @router.patch("/{id}", response_model=schemas.Project)
 async def update_project(
     update_schema: schemas.ProjectUpdate,
-    project: schemas.Project = Permission("edit", get_project_from_db),
+    project: schemas.ProjectAccess = Permission("edit", get_project_from_db),
 ):
-    return Project.update(id=project.id, **update_schema.dict(exclude_unset=True))
+    with load_profile(Project, schemas.Project):
+        return Project.update(id=project.id, **update_schema.dict(exclude_unset=True))
 
 
 @router.delete("/{id}")
 async def delete_project(
-    project: schemas.Project = Permission("edit", get_project_from_db)
+    project: schemas.ProjectAccess = Permission("edit", get_project_from_db)
 ):
     return Project.delete(Project.get(id=project.id))
 
 
 @router.get("/user/", response_model=list[schemas.Project])
 async def get_user_projects(
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_active_user),
+):
+    fieldset = router.parse_fieldset(request)
+    etag = router.etag(request, select(Project.id).where(Project.owner_id == user.id))
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    projects = await router.run_manager("filter", owner=user, fieldset=fieldset)
+    content = router.render(fieldset, projects, many=True)
+    set_etag(headers_target(content, response), etag)
+    return content
+
+
+@router.get("/summary", response_model=list[schemas.ProjectSummary])
+async def get_projects_summary(
     user: User = Depends(get_current_active_user),
 ):
-    return Project.filter(owner=user)
+    """Owned and shared projects with task counts, for sidebars."""
+    return Project.summaries(user.id)
 
 
 @router.get("/{project_id}/tasks", response_model=list[schemas.Task])
 async def get_tasks_by_project(
     project_id,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     order_by: str = "created",
     desc: bool = False,
+    cursor: str | None = None,
     _: User = Depends(get_current_active_user),
 ):
     project = Project.get(id=project_id)
-    if project.show_completed_tasks:
-        return Task.filter(skip, limit, order_by, desc, project_id=project_id)
-
-    return Task.filter(
-        skip, limit, order_by, desc, project_id=project_id, is_done=False
+    fields = {"project_id": project_id}
+    if not project.show_completed_tasks:
+        fields["is_done"] = False
+
+    etag = router.etag(
+        request,
+        select(Task.id).where(*Task.build_filter(**fields)),
+        schema=schemas.Task,
+        model=Task,
     )
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    try:
+        with load_profile(Task, schemas.Task):
+            tasks, next_cursor = Task.paginate(
+                skip, limit, order_by, desc, cursor, **fields
+            )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    content = router.render(None, tasks, many=True, model=Task, schema=schemas.Task)
+    set_next_cursor(headers_target(content, response), next_cursor)
+    set_etag(headers_target(content, response), etag)
+    return content
 
 
 @router.get("/{id}/invite")
 async def get_invitation_code(
-    project: schemas.Project = Permission("invite", get_project_from_db),
+    project: schemas.ProjectAccess = Permission("invite", get_project_from_db),
 ):
     return {"code": Project.generate_invitaion_code(project.id)}
 
@@ -80,18 +136,17 @@ async def accept_invitation(
     code: str,
     user: User = Depends(get_current_active_user)
 ):
-    project = Project.validate_invitation_code(code)
+    with load_profile(Project, schemas.Project):
+        project = Project.validate_invitation_code(code)
     if user not in project.participants and user != project.owner:
         project.participants.append(user)
-        db.session.commit()
-        db.session.refresh(project)
-        return project
+        return Project.refresh(project)
     else:
         raise HTTPException(status_code=404, detail="Current user is already participant of this project")
 
 
 @router.get("/{id}/direct-invite")
 async def send_direct_invitation(
-    project: schemas.Project = Permission("invite", get_project_from_db),
+    project: schemas.ProjectAccess = Permission("invite", get_project_from_db),
 ):
     pass
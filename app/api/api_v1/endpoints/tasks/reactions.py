@@ -1,56 +1,52 @@
-from typing import Optional
-
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi_sqlalchemy import db
 
 from app import schemas
 from app.api.deps import get_current_active_user
 from app.core.exceptions import ObjectDoesNotExist
+from app.managers.loading import load_profile
 from app.models import User
-from app.models.tasks import Reaction, Task, UserReaction
+from app.models.tasks import Reaction, Task
 
 router = APIRouter(prefix="/reactions", tags=["task"])
 
 
+def _task(task_id: int) -> Task:
+    with load_profile(Task, schemas.Task):
+        return Task.get(id=task_id)
+
+
 @router.post("/", response_model=schemas.Task)
 async def add_reaction(
     reaction: schemas.ReactionCreate,
     user: User = Depends(get_current_active_user),
 ):
-    task = Task.get(id=reaction.task_id)
-    for r in task.reactions:
-        if reaction.emoji == r.emoji:
-            UserReaction.create(user_id=user.id, reaction_id=r.id)
-            db.session.commit()
-            db.session.refresh(task)
-            return Task.get(id=reaction.task_id)
-
-    reaction = Reaction.create(emoji=reaction.emoji, task_id=reaction.task_id)
-    UserReaction.create(user_id=user.id, reaction_id=reaction.id)
-    db.session.commit()
-    db.session.refresh(task)
-    return Task.get(id=reaction.task_id)
-
-
-@router.post("/remove", response_model=Optional[schemas.Task])
+    try:
+        Reaction.add(reaction.task_id, reaction.emoji, user.id)
+    except ObjectDoesNotExist as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _task(reaction.task_id)
+
+
+@router.post("/remove", response_model=schemas.Task)
 async def remove_reaction(
     reaction: schemas.ReactionCreate,
     user: User = Depends(get_current_active_user),
 ):
-    task = Task.get(id=reaction.task_id)
-    for r in task.reactions:
-        if reaction.emoji == r.emoji:
-            try:
-                user_reaction = UserReaction.get(reaction_id=r.id, user_id=user.id)
-            except ObjectDoesNotExist:
-                return HTTPException(
-                    status_code=404, detail="No reactions according to user was found."
-                )
-
-            UserReaction.delete(user_reaction)
-            if len(r.users) == 0:
-                Reaction.delete(r)
-            return Task.get(id=reaction.task_id)
-    return HTTPException(
-        status_code=404, detail="No reactions according to user was found."
-    )
+    if not Reaction.remove(reaction.task_id, reaction.emoji, user.id):
+        raise HTTPException(
+            status_code=404, detail="No reactions according to user was found."
+        )
+    return _task(reaction.task_id)
+
+
+@router.post("/toggle", response_model=schemas.Task)
+async def toggle_reaction(
+    reaction: schemas.ReactionCreate,
+    user: User = Depends(get_current_active_user),
+):
+    """Adds the reaction of the user or takes it back."""
+    try:
+        Reaction.toggle(reaction.task_id, reaction.emoji, user.id)
+    except ObjectDoesNotExist as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _task(reaction.task_id)
@@ -1,11 +1,13 @@
-from fastapi import Depends
+from fastapi import BackgroundTasks, Depends
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_active_user
 from app.api.router import AuthenticatedCrudRouter
+from app.managers.async_tasks import AsyncSectionManager
 from app.models import User
 from app.models.tasks import Section
 from app.schemas import section
+from app.tasks.ranking import schedule_rebalance
 
 router = AuthenticatedCrudRouter(
     model=Section,
@@ -14,6 +16,8 @@ router = AuthenticatedCrudRouter(
     update_schema=section.SectionUpdate,
     prefix="/sections",
     tags=["task"],
+    filter_fields=("project_id",),
+    manager=AsyncSectionManager.for_model(Section),
 )
 
 
@@ -21,12 +25,11 @@ router = AuthenticatedCrudRouter(
 async def reorder_section(
     id: int,
     order: int,
+    background_tasks: BackgroundTasks,
     _: User = Depends(get_current_active_user),
 ):
     instance = Section.get(id=id)
-    for sec in instance.project.sections:
-        if sec.order >= order:
-            Section.update(sec.id, order=sec.order + 1)
-    instance = Section.update(id=instance.id, order=order)
+    instance = Section.reorder(instance, instance.project, order)
+    schedule_rebalance(background_tasks, instance)
 
     return instance
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app import schemas
 from app.api.deps import get_current_active_user
 from app.api.router import AuthenticatedCrudRouter
+from app.managers.loading import load_profile
 from app.models import TagItem, User
 from app.models.tasks import Task
 
@@ -23,4 +24,5 @@ async def remove_tag(
 ):
     tag_item = TagItem.get(**tag_data.dict())
     TagItem.delete(tag_item)
-    return Task.get(id=tag_data.task_id)
+    with load_profile(Task, schemas.Task):
+        return Task.get(id=tag_data.task_id)
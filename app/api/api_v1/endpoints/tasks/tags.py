@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app import schemas
 from app.api.deps import get_current_active_user
 from app.api.router import AuthenticatedCrudRouter
+from app.managers.loading import load_profile
 from app.models import Tag, User
 
 router = AuthenticatedCrudRouter(
@@ -21,4 +22,5 @@ router = AuthenticatedCrudRouter(
 async def get_user_tags(
     user: User = Depends(get_current_active_user)
 ):
-    return Tag.filter(owner_id=user.id)
+    with load_profile(Tag, schemas.Tag):
+        return Tag.filter(owner_id=user.id)
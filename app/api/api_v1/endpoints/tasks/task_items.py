@@ -1,14 +1,23 @@
-from datetime import datetime
+from datetime import date, datetime
+from itertools import groupby
+from operator import attrgetter
 
-from fastapi import BackgroundTasks, Depends, HTTPException
+from typing import Optional
+
+from fastapi import BackgroundTasks, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app import schemas
 from app.api.deps import get_current_active_user
-from app.api.router import AuthenticatedCrudRouter
+from app.api.router import AuthenticatedCrudRouter, set_next_cursor
+from app.core.exceptions import InvalidCursor
 from app.models import Project, Task, User
+from app.managers.loading import load_profile
 from app.models.tasks import Section
 from app.sse.tasks import remind
+from app.tasks.ranking import schedule_rebalance
+
+MAX_RANGE_DAYS = 366
 
 router = AuthenticatedCrudRouter(
     model=Task,
@@ -17,6 +26,18 @@ router = AuthenticatedCrudRouter(
     update_schema=schemas.TaskUpdate,
     prefix="/tasks",
     tags=["task"],
+    filter_fields=(
+        "is_done",
+        "deadline",
+        "deadline__gte",
+        "deadline__lte",
+        "deadline__isnull",
+        "project_id",
+        "project_id__in",
+        "section_id",
+        "name__icontains",
+    ),
+    fast_serialization=True,
 )
 
 
@@ -29,20 +50,75 @@ async def create_task(
     instance = Task.create(**dict(task_in))
     if task_in.remind_at is not None:
         background_tasks.add_task(remind, instance)
+    schedule_rebalance(background_tasks, instance)
     return instance
 
 
+@router.get("/range", response_model=list[schemas.TasksByDay])
+async def get_tasks_by_range(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    user: User = Depends(get_current_active_user),
+):
+    """Tasks with deadline between `from` and `to` (inclusive) from all
+    projects the user can see, grouped by day."""
+    if start > end:
+        raise HTTPException(status_code=400, detail="`from` has to be before `to`.")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"Range can't be longer than {MAX_RANGE_DAYS} days."
+        )
+
+    with load_profile(Task, schemas.Task):
+        tasks = Task.between(user.id, start, end)
+    return [
+        {"date": day, "tasks": list(day_tasks)}
+        for day, day_tasks in groupby(tasks, key=attrgetter("deadline"))
+    ]
+
+
+@router.get("/search", response_model=list[schemas.Task])
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    tag_id: Optional[int] = None,
+    priority: Optional[str] = None,
+    is_done: Optional[bool] = None,
+    user: User = Depends(get_current_active_user),
+):
+    """Tasks of projects the user can see whose name or description match
+    `q`, best matches first. The cursor of the next page is in
+    `X-Next-Cursor` header."""
+    filters = {"priority": priority, "is_done": is_done}
+    try:
+        with load_profile(Task, schemas.Task):
+            tasks, next_cursor = Task.search(
+                user.id,
+                q,
+                limit,
+                cursor,
+                tag_id=tag_id,
+                **{key: value for key, value in filters.items() if value is not None},
+            )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, next_cursor)
+    return tasks
+
+
 @router.get("/date/{date}", response_model=list[schemas.Task])
 async def get_tasks_by_date(
     date: str,
     user: User = Depends(get_current_active_user),
 ):
-    raw_date = datetime.strptime(date, "%Y-%m-%d")
-    owned_projects = Project.filter(owner=user)
-    tasks = []
-    for project in owned_projects:
-        tasks += Task.filter(deadline=raw_date, project=project)
-    return tasks
+    try:
+        day = datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Date has to be in YYYY-MM-DD format.")
+    days = await get_tasks_by_range(start=day, end=day, user=user)
+    return days[0]["tasks"] if days else []
 
 
 @router.post("/{id}/move/{project_id}", response_model=schemas.Task)
@@ -61,19 +137,17 @@ async def move_task_to_proejct(
 
 @router.post("/{order}/reorder/", response_model=schemas.Task)
 async def reorder_tasks(
-    order: str | int,
+    order: int,
     reorder_schema: schemas.TaskReorder,
+    background_tasks: BackgroundTasks,
     _: User = Depends(get_current_active_user),
 ):
-
-    project_id, section_id = (
-        (reorder_schema.source_id, None)
-        if reorder_schema.source_type == "project"
-        else (None, reorder_schema.source_id)
-    )
-    instance = Task.get(section_id=section_id, project_id=project_id, order=order)
+    source_model = Project if reorder_schema.source_type == "project" else Section
+    instance = Task.at_position(source_model, reorder_schema.source_id, order)
 
     model = Section if reorder_schema.destination_type == "section" else Project
     destination = model.get(id=reorder_schema.destination_id)
 
-    return Task.reorder(instance, destination, reorder_schema.order)
+    instance = Task.reorder(instance, destination, reorder_schema.order)
+    schedule_rebalance(background_tasks, instance)
+    return instance
@@ -25,7 +25,7 @@ def get_current_user(token: str = Depends(reusable_oauth2)) -> models.User | Non
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = models.User.get(id=token_data.sub)
+    user = models.User.get_authenticated(token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -0,0 +1,87 @@
+"""Weak ETags of GET responses.
+
+The validator of a response is max(updated) and the number of rows it is
+serialized from: the root rows and rows of every relationship of the
+response schema, nested ones included. Both are computed with a single
+aggregate query over a UNION ALL of `updated` columns, so clients polling
+with `If-None-Match` get 304 without loading or serializing anything.
+Rows of association tables (participants, tag items) are counted as well.
+"""
+import hashlib
+from typing import List, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session, class_mapper
+from sqlalchemy.sql import Select
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.api.serialization import relationship_schemas
+
+ETAG_HEADER = "ETag"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+
+
+def _updated(table) -> Optional[object]:
+    return table.c.get("updated")
+
+
+def validator_sources(model, schema: Type[BaseModel], ids: Select) -> List[Select]:
+    """Selects of `updated` of rows with `ids` and rows of relationships
+    serialized by `schema`."""
+    sources = []
+    if _updated(model.__table__) is not None:
+        sources.append(select(model.updated).where(model.id.in_(ids)))
+
+    relationships = class_mapper(model).relationships
+    for name, (target, nested, _) in relationship_schemas(model, schema).items():
+        relationship = relationships[name]
+        local, remote = relationship.synchronize_pairs[0]
+        parents = select(local).where(model.id.in_(ids))
+        if relationship.secondary is not None:
+            secondary = relationship.secondary
+            target_key, secondary_key = relationship.secondary_synchronize_pairs[0]
+            if _updated(secondary) is not None:
+                sources.append(select(_updated(secondary)).where(remote.in_(parents)))
+            children = select(secondary_key).where(remote.in_(parents))
+        else:
+            children = select(target.id).where(remote.in_(parents))
+        sources.extend(validator_sources(target, nested, children))
+    return sources
+
+
+def compute_etag(
+    session: Session, model, schema: Type[BaseModel], ids: Select, vary: str = ""
+) -> str:
+    """Weak ETag of `schema` responses of rows with `ids`. Responses that
+    depend on query parameters pass them in `vary`."""
+    sources = union_all(*validator_sources(model, schema, ids)).subquery()
+    updated, count = session.execute(
+        select(func.max(sources.c[0]), func.count(literal(1))).select_from(sources)
+    ).one()
+    digest = hashlib.md5(f"{vary}|{updated}|{count}".encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_fresh(request: Request, etag: str) -> bool:
+    """Weak comparison with `If-None-Match` of the request."""
+    header = request.headers.get(IF_NONE_MATCH_HEADER)
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in header.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={ETAG_HEADER: etag})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers[ETAG_HEADER] = etag
@@ -1,26 +1,59 @@
 from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Type, Union
 
-from fastapi import APIRouter, Depends, HTTPException, params
+from fastapi import APIRouter, Depends, HTTPException, Request, params
+from fastapi.encoders import jsonable_encoder
+from fastapi_sqlalchemy import db
 from fastapi.datastructures import Default, DefaultPlaceholder
 from fastapi.encoders import DictIntStrAny, SetIntStr
 from fastapi.routing import APIRoute
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from fastapi.responses import ORJSONResponse
 from starlette.responses import JSONResponse, Response
 from starlette.routing import BaseRoute
 
 from app import models
 from app.api.deps import get_current_active_user
-from app.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from app.api.etag import compute_etag, is_fresh, not_modified, set_etag
+from app.api.serialization import (
+    FieldSet,
+    load_paths,
+    parse_fieldset,
+    render,
+    serializer,
+)
+from app.core.exceptions import ImproperlyConfigured, InvalidCursor, ObjectDoesNotExist
+from app.managers.async_base import AsyncBaseManager
 from app.managers.base import BaseManager
+from app.managers.lookups import parse_query_filters, split_lookup
+from app.managers.pagination import apply_keyset
+from app.managers.loading import load_profile
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+
+def headers_target(content, response: Response) -> Response:
+    """Response that gets headers: FastAPI doesn't merge headers of the
+    injected response into responses returned by routes."""
+    return content if isinstance(content, Response) else response
 
 
 class BaseCrudRouter(APIRouter):
     """Base router implements methods for create and remove api routes."""
 
     model = None
+    manager = None
     create_schema = None
     get_schema = None
+    fast_serialization = False
 
     def __init__(
         self,
@@ -30,12 +63,18 @@ class BaseCrudRouter(APIRouter):
         update_schema: BaseModel = None,
         prefix: Optional[str] = None,
         tags: Optional[List] = list(),
+        manager: Optional[Type[AsyncBaseManager]] = None,
         *args,
         **kwargs,
     ) -> None:
         if not issubclass(model, BaseManager):
             raise AttributeError("Model class has to inherit BaseManager.")
+        if manager is not None and not (
+            issubclass(manager, AsyncBaseManager) and manager.model is model
+        ):
+            raise AttributeError(f"Manager has to be AsyncBaseManager bound to {model.__name__}.")
         self.model = model
+        self.manager = manager
 
         self.get_schema = get_schema
         self.create_schema = create_schema
@@ -131,7 +170,7 @@ class BaseCrudRouter(APIRouter):
                 if len(methods) == 1 and methods[0].upper() == "POST":
                     status_code = 201
 
-        return super().add_api_route(
+        super().add_api_route(
             path,
             endpoint,
             response_model=response_model,
@@ -157,6 +196,23 @@ class BaseCrudRouter(APIRouter):
             route_class_override=route_class_override,
             callbacks=callbacks,
         )
+        self._promote_static_route()
+
+    def _promote_static_route(self) -> None:
+        """Moves the route added last before parametrized routes that would
+        shadow it, so that `/tasks/range` is not matched by `/tasks/{id}`."""
+        route = self.routes[-1] if self.routes else None
+        if not isinstance(route, APIRoute) or route.param_convertors:
+            return
+        for index, other in enumerate(self.routes[:-1]):
+            if (
+                isinstance(other, APIRoute)
+                and other.param_convertors
+                and other.methods & route.methods
+                and other.path_regex.match(route.path)
+            ):
+                self.routes.insert(index, self.routes.pop())
+                return
 
     def remove_api_route(self, path: str, methods: List[str]):
         methods = set(methods)
@@ -168,6 +224,72 @@ class BaseCrudRouter(APIRouter):
     def get_routes(self) -> list:
         return self.routes
 
+    async def run_manager(
+        self, method: str, *args, fieldset: Optional[FieldSet] = None, **kwargs
+    ):
+        """Calls manager method, async manager is preferred when configured.
+        Relationships serialized by get_schema (or requested by `fieldset`)
+        are loaded eagerly."""
+        if fieldset is None:
+            profile = load_profile(self.model, self.get_schema)
+        else:
+            profile = load_profile(
+                self.model, paths=load_paths(self.model, self.get_schema, fieldset)
+            )
+        with profile:
+            if self.manager is not None:
+                return await getattr(self.manager, method)(*args, **kwargs)
+            return getattr(self.model, method)(*args, **kwargs)
+
+    def parse_fieldset(self, request: Request) -> Optional[FieldSet]:
+        """Sparse fieldset of the request (see app.api.serialization)."""
+        try:
+            return parse_fieldset(self.model, self.get_schema, request.query_params)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def etag(
+        self,
+        request: Request,
+        ids: Select,
+        schema: Optional[Type[BaseModel]] = None,
+        model=None,
+    ) -> str:
+        """Weak ETag of the response serialized from rows with `ids`,
+        get_schema of the router by default."""
+        return compute_etag(
+            db.session,
+            model or self.model,
+            schema or self.get_schema,
+            ids,
+            vary=f"{request.url.path}?{request.url.query}",
+        )
+
+    def render(
+        self,
+        fieldset: Optional[FieldSet],
+        result,
+        many: bool = False,
+        model=None,
+        schema: Optional[Type[BaseModel]] = None,
+    ):
+        """Returns `result` as is, to be validated by response_model, or as
+        a response serialized with the sparse fieldset or the compiled
+        serializer when `fast_serialization` is on."""
+        if fieldset is None and not self.fast_serialization:
+            return result
+        model, schema = model or self.model, schema or self.get_schema
+        instances = result if many else [result]
+        if fieldset is None:
+            to_dict = serializer(model, schema)
+            content = [to_dict(instance) for instance in instances]
+        else:
+            content = render(db.session, model, schema, fieldset, instances)
+        content = content if many else content[0]
+        if self.fast_serialization:
+            return ORJSONResponse(content)
+        return JSONResponse(jsonable_encoder(content))
+
 
 class CrudRouter(BaseCrudRouter):
     """Base router that implements basic CRUD operations
@@ -183,9 +305,23 @@ class CrudRouter(BaseCrudRouter):
         tags: Optional[List] = [],
         add_create_route: bool = True,
         override_routes: bool = False,
+        manager: Optional[Type[AsyncBaseManager]] = None,
+        filter_fields: Sequence[str] = (),
+        fast_serialization: bool = False,
         *args,
         **kwargs,
     ) -> None:
+        self.fast_serialization = fast_serialization
+        self.filter_fields = tuple(filter_fields)
+        registry = model.model_registry()
+        for key in self.filter_fields:
+            field, _ = split_lookup(key)
+            if field not in registry.columns or field not in registry.filterable:
+                raise ImproperlyConfigured(
+                    f"{model.__name__} can't be filtered by {key}, "
+                    "filter fields have to be columns that aren't sensitive."
+                )
+
         if not override_routes:
             super().__init__(
                 model=model,
@@ -194,13 +330,14 @@ class CrudRouter(BaseCrudRouter):
                 update_schema=update_schema,
                 prefix=prefix,
                 tags=tags,
+                manager=manager,
                 *args,
                 **kwargs,
             )
 
             super().add_api_route(
                 "/",
-                self._get_all,
+                self._get_all(),
                 response_model=List[self.get_schema],
                 summary=f"Get all {self.model.__name__.lower()}s",
                 description=f"""
@@ -209,6 +346,14 @@ class CrudRouter(BaseCrudRouter):
                 *`skip`: Start offset
                 *`limit`: Limit of items to retrieve, works with offset
                 *`order_by`: Is used for ordering, `created` by default
+                *`desc`: Order descending
+                *`cursor`: Opaque cursor from `X-Next-Cursor` header of the previous page,
+                replaces `skip`
+                *`fields`, `expand`, `<collection>_limit`: Sparse fieldsets
+                *`If-None-Match` header: Weak `ETag` of the previous response,
+                304 is returned when nothing changed
+                *Lookups: {", ".join(f"`{key}`" for key in self.filter_fields) or "none"},
+                `in` lookups accept comma separated values
                 """,
             )
 
@@ -247,38 +392,84 @@ class CrudRouter(BaseCrudRouter):
                 description=f"Delete {self.model.__name__.lower()} by ID.",
             )
 
-    async def _get_all(
-        self,
-        skip: int = 0,
-        limit: int = 100,
-        order_by: str = "created",
-        desc: bool = False,
-    ) -> Callable:
-        @self.get("/", response_model=List[self.get_schema])
+    def _get_all(self) -> Callable:
+        sortable = self.model.model_registry().sortable
+
         async def _get_all(
-            skip: int = 0, limit: int = 100
+            request: Request,
+            response: Response,
+            skip: int = 0,
+            limit: int = 100,
+            order_by: str = "created",
+            desc: bool = False,
+            cursor: Optional[str] = None,
         ):
+            if order_by not in sortable:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Can't order by {order_by}, sortable fields: {sorted(sortable)}",
+                )
+            fieldset = self.parse_fieldset(request)
+            try:
+                filters = parse_query_filters(
+                    self.model, request.query_params, self.filter_fields
+                )
+                # Only rows of the page (and the one that tells whether the
+                # next page exists) are validated, not every matching row.
+                page = apply_keyset(
+                    select(self.model.id).where(*self.model.build_filter(**filters)),
+                    self.model,
+                    order_by,
+                    desc,
+                    skip,
+                    limit,
+                    cursor,
+                ).subquery()
+                etag = self.etag(request, select(page.c.id))
+                if is_fresh(request, etag):
+                    return not_modified(etag)
+                items, next_cursor = await self.run_manager(
+                    "paginate",
+                    skip,
+                    limit,
+                    order_by,
+                    desc,
+                    cursor,
+                    fieldset=fieldset,
+                    **filters,
+                )
+            except (InvalidCursor, ValueError) as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            content = self.render(fieldset, items, many=True)
+            set_next_cursor(headers_target(content, response), next_cursor)
+            set_etag(headers_target(content, response), etag)
+            return content
 
-            return self.model.all(skip, limit, order_by, desc)
-
-        return await _get_all(skip, limit)
+        return _get_all
 
     def _create(self) -> Callable:
         async def route(
             instance_create_schema: self.create_schema
         ):
-            return self.model.create(**dict(instance_create_schema))
+            return await self.run_manager("create", **dict(instance_create_schema))
 
         return route
 
     def _get(self) -> Callable:
-        async def route(id: int):
+        async def route(id: int, request: Request, response: Response):
+            fieldset = self.parse_fieldset(request)
+            etag = self.etag(request, select(self.model.id).where(self.model.id == id))
+            if is_fresh(request, etag):
+                return not_modified(etag)
             try:
-                return self.model.get(id=id)
+                instance = await self.run_manager("get", id=id, fieldset=fieldset)
             except ObjectDoesNotExist:
                 raise HTTPException(
                     status_code=400, detail=f"{self.model.__name__} does not exists"
                 )
+            content = self.render(fieldset, instance)
+            set_etag(headers_target(content, response), etag)
+            return content
 
         return route
 
@@ -286,13 +477,15 @@ class CrudRouter(BaseCrudRouter):
         async def route(
             id, update_schema: self.update_schema
         ):
-            return self.model.update(id, **update_schema.dict(exclude_unset=True))
+            return await self.run_manager(
+                "update", id, **update_schema.dict(exclude_unset=True)
+            )
 
         return route
 
     def _delete(self) -> Callable:
         async def route(id):
-            return self.model.delete(self.model.get(id=id))
+            return await self.run_manager("delete", await self.run_manager("get", id=id))
 
         return route
 
@@ -310,6 +503,9 @@ class AuthenticatedCrudRouter(CrudRouter):
         tags: Optional[List] = [],
         add_create_route: bool = False,
         owner_field_is_required: bool = False,
+        manager: Optional[Type[AsyncBaseManager]] = None,
+        filter_fields: Sequence[str] = (),
+        fast_serialization: bool = False,
         *args,
         **kwargs,
     ) -> None:
@@ -322,6 +518,9 @@ class AuthenticatedCrudRouter(CrudRouter):
             prefix=prefix,
             tags=tags,
             add_create_route=add_create_route,
+            manager=manager,
+            filter_fields=filter_fields,
+            fast_serialization=fast_serialization,
             *args,
             **kwargs,
         )
@@ -341,8 +540,11 @@ class AuthenticatedCrudRouter(CrudRouter):
             user: models.User = Depends(get_current_active_user),
         ):
             if self.owner_field_is_required:
-                return self.model.create(**dict(instance_create_schema), owner=user)
-            return self.model.create(
+                return await self.run_manager(
+                    "create", **dict(instance_create_schema), owner_id=user.id
+                )
+            return await self.run_manager(
+                "create",
                 **dict(instance_create_schema),
             )
 
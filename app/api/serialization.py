@@ -0,0 +1,281 @@
+"""Sparse fieldsets of responses.
+
+?fields=id,name,tasks.name      attributes to return, dotted for nested objects
+?expand=tasks,sections.tasks    relationships to return
+?tasks_limit=10                 limit of a top level collection
+
+Without these parameters responses don't change. With `fields` or `expand`
+only requested relationships are returned, and only those are loaded from
+the database. Limited collections are loaded for all parents at once with
+a window function. Sparse responses are serialized to dicts directly,
+`id` is always included.
+
+`serializer` compiles a schema into a function that builds the response
+dict straight from ORM rows, without validation of response_model. It is
+used by routers with `fast_serialization`, values are taken as they are,
+so schemas served this way must declare types of their columns.
+"""
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.managers.loading import build_load_options
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+LIMIT_SUFFIX = "_limit"
+
+Overrides = Dict[Tuple[str, Any], list]
+
+
+class FieldSet:
+    """Requested fields of one level of the response. In explicit mode
+    relationships are returned only when they are listed in `children`."""
+
+    __slots__ = ("fields", "children", "limits", "explicit")
+
+    def __init__(self, explicit: bool) -> None:
+        self.fields: Optional[set] = None
+        self.children: Dict[str, "FieldSet"] = {}
+        self.limits: Dict[str, int] = {}
+        self.explicit = explicit
+
+    def child(self, name: str) -> "FieldSet":
+        if name not in self.children:
+            self.children[name] = FieldSet(self.explicit)
+        return self.children[name]
+
+    def includes_field(self, name: str) -> bool:
+        return self.fields is None or name in self.fields or name == "id"
+
+    def includes_relationship(self, name: str) -> bool:
+        return name in self.children if self.explicit else True
+
+
+@lru_cache(maxsize=None)
+def relationship_schemas(model, schema: Type[BaseModel]) -> Dict[str, tuple]:
+    """Schema fields serialized from relationships of `model`:
+    name -> (related model, nested schema, is collection)."""
+    relationships = inspect(model).relationships
+    result = {}
+    for name, field in schema.__fields__.items():
+        nested = field.type_
+        if (
+            name in relationships
+            and isinstance(nested, type)
+            and issubclass(nested, BaseModel)
+        ):
+            relationship = relationships[name]
+            result[name] = (relationship.mapper.class_, nested, relationship.uselist)
+    return result
+
+
+@lru_cache(maxsize=None)
+def serializer(model, schema: Type[BaseModel]) -> Callable[[Any], Dict[str, Any]]:
+    """Function serializing instances of `model` with all fields of `schema`,
+    relationships come after columns. Schema fields missing on the model get
+    their defaults."""
+    relationships = relationship_schemas(model, schema)
+    names = [name for name in schema.__fields__ if name not in relationships]
+    present = tuple(name for name in names if hasattr(model, name))
+    defaults = {
+        name: schema.__fields__[name].default for name in names if name not in present
+    }
+    # attrgetter of a single name doesn't return a tuple.
+    getter = attrgetter(*present) if len(present) > 1 else None
+    nested = tuple(
+        (name, serializer(target, nested_schema), many)
+        for name, (target, nested_schema, many) in relationships.items()
+    )
+
+    def serialize(instance) -> Dict[str, Any]:
+        if getter is not None:
+            data = dict(zip(present, getter(instance)))
+        else:
+            data = {name: getattr(instance, name) for name in present}
+        data.update(defaults)
+        for name, to_dict, many in nested:
+            value = getattr(instance, name)
+            if many:
+                data[name] = [to_dict(item) for item in value]
+            else:
+                data[name] = None if value is None else to_dict(value)
+        return data
+
+    return serialize
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _descend(fieldset: FieldSet, model, schema, names: Iterable[str], path: str):
+    for name in names:
+        relationships = relationship_schemas(model, schema)
+        if name not in relationships:
+            raise ValueError(f"{path} can't be expanded, {name} is not a relationship.")
+        fieldset = fieldset.child(name)
+        model, schema, _ = relationships[name]
+    return fieldset, model, schema
+
+
+def parse_fieldset(
+    model, schema: Type[BaseModel], query_params: Mapping[str, str]
+) -> Optional[FieldSet]:
+    """Returns None when the request doesn't use sparse parameters.
+    Raises ValueError on unknown fields and relationships."""
+    fields = _split(query_params.get(FIELDS_PARAM))
+    expand = _split(query_params.get(EXPAND_PARAM))
+    limits = {
+        key[: -len(LIMIT_SUFFIX)]: value
+        for key, value in query_params.items()
+        if key.endswith(LIMIT_SUFFIX)
+    }
+    if not (fields or expand or limits):
+        return None
+
+    root = FieldSet(explicit=bool(fields or expand))
+    for path in expand:
+        _descend(root, model, schema, path.split("."), path)
+
+    for path in fields:
+        *parents, name = path.split(".")
+        level, level_model, level_schema = _descend(root, model, schema, parents, path)
+        if name not in level_schema.__fields__:
+            raise ValueError(f"Unknown field {path}.")
+        if level.fields is None:
+            level.fields = set()
+        if name in relationship_schemas(level_model, level_schema):
+            level.child(name)
+        else:
+            level.fields.add(name)
+
+    relationships = relationship_schemas(model, schema)
+    for name, value in limits.items():
+        if name not in relationships or not relationships[name][2]:
+            raise ValueError(f"{name} is not a collection and can't be limited.")
+        try:
+            root.limits[name] = int(value)
+        except ValueError:
+            raise ValueError(f"{name}{LIMIT_SUFFIX} has to be an integer.")
+        if root.limits[name] < 0:
+            raise ValueError(f"{name}{LIMIT_SUFFIX} can't be negative.")
+    return root
+
+
+def _paths(model, schema, fieldset: FieldSet, prefix: str = "") -> List[str]:
+    paths = []
+    for name, (target, nested, _) in relationship_schemas(model, schema).items():
+        if not fieldset.includes_relationship(name):
+            continue
+        path = prefix + name
+        paths.extend(_paths(target, nested, fieldset.child(name), path + ".") or [path])
+    return paths
+
+
+def load_paths(model, schema: Type[BaseModel], fieldset: FieldSet) -> Tuple[str, ...]:
+    """Relationship paths to load eagerly, limited collections are loaded
+    separately by `load_limited`."""
+    return tuple(
+        path
+        for path in _paths(model, schema, fieldset)
+        if path.split(".")[0] not in fieldset.limits
+    )
+
+
+def load_limited(
+    session: Session,
+    model,
+    schema: Type[BaseModel],
+    fieldset: FieldSet,
+    instances: list,
+) -> Overrides:
+    """Loads first N items of limited collections of every instance,
+    in relationship order, with two queries per collection."""
+    overrides: Overrides = {}
+    relationships = relationship_schemas(model, schema)
+    for name, limit in fieldset.limits.items():
+        if not fieldset.includes_relationship(name) or not instances:
+            continue
+        target, nested, _ = relationships[name]
+        relationship = inspect(model).relationships[name]
+        local, remote = relationship.synchronize_pairs[0]
+        local_key = inspect(model).get_property_by_column(local).key
+        parent_ids = [getattr(instance, local_key) for instance in instances]
+
+        position = func.row_number().over(
+            partition_by=remote,
+            order_by=[*(relationship.order_by or ()), target.id],
+        )
+        ranked = select(
+            target.id.label("id"),
+            remote.label("parent_id"),
+            position.label("position"),
+        ).select_from(target.__table__)
+        if relationship.secondary is not None:
+            ranked = ranked.join(relationship.secondary, relationship.secondaryjoin)
+        ranked = ranked.where(remote.in_(parent_ids)).subquery()
+        rows = session.execute(
+            select(ranked.c.id, ranked.c.parent_id)
+            .where(ranked.c.position <= limit)
+            .order_by(ranked.c.parent_id, ranked.c.position)
+        ).all()
+
+        options = build_load_options(
+            target, tuple(_paths(target, nested, fieldset.child(name)))
+        )
+        children = {
+            child.id: child
+            for child in session.query(target)
+            .filter(target.id.in_([row.id for row in rows]))
+            .options(*options)
+        }
+        for parent_id in parent_ids:
+            overrides[(name, parent_id)] = []
+        for row in rows:
+            overrides[(name, row.parent_id)].append(children[row.id])
+    return overrides
+
+
+def serialize(
+    instance,
+    schema: Type[BaseModel],
+    fieldset: FieldSet,
+    overrides: Optional[Overrides] = None,
+) -> Dict[str, Any]:
+    relationships = relationship_schemas(type(instance), schema)
+    data = {}
+    for name, field in schema.__fields__.items():
+        if name not in relationships:
+            if fieldset.includes_field(name):
+                data[name] = getattr(instance, name, field.default)
+            continue
+        if not fieldset.includes_relationship(name):
+            continue
+
+        _, nested, many = relationships[name]
+        child = fieldset.child(name)
+        if overrides is not None and (name, instance.id) in overrides:
+            value = overrides[(name, instance.id)]
+        else:
+            value = getattr(instance, name)
+        if many:
+            data[name] = [serialize(item, nested, child) for item in value]
+        else:
+            data[name] = serialize(value, nested, child) if value is not None else None
+    return data
+
+
+def render(
+    session: Session,
+    model,
+    schema: Type[BaseModel],
+    fieldset: FieldSet,
+    instances: list,
+) -> List[Dict[str, Any]]:
+    overrides = load_limited(session, model, schema, fieldset, instances)
+    return [serialize(instance, schema, fieldset, overrides) for instance in instances]
@@ -36,6 +36,22 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
 
+    ASYNC_SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
+
+    @validator("ASYNC_SQLALCHEMY_DATABASE_URI", pre=True)
+    def assemble_async_db_connection(
+        cls, v: Optional[str], values: Dict[str, Any]
+    ) -> Any:
+        if isinstance(v, str):
+            return v
+        return PostgresDsn.build(
+            scheme="postgresql+asyncpg",
+            user=values.get("POSTGRES_USER"),
+            password=values.get("POSTGRES_PASSWORD"),
+            host=values.get("POSTGRES_SERVER"),
+            path=f"/{values.get('POSTGRES_DB') or ''}",
+        )
+
     POSTGRES_TEST_DB: str
     SQLALCHEMY_TEST_DATABASE_URI: Optional[PostgresDsn] = None
 
@@ -101,6 +117,57 @@ class Settings(BaseSettings):
     SSE_RETRY_TIMEOUT: int = 2000
     SSE_STREAM_DELAY: int = 1
 
+    # "dense" keeps integer positions in `order`, "rank" stores lexicographic
+    # keys in `rank` so that a move writes a single row.
+    ORDERING_STRATEGY: str = "dense"
+    RANK_MAX_LENGTH: int = 16
+
+    @validator("ORDERING_STRATEGY")
+    def validate_ordering_strategy(cls, v: str) -> str:
+        if v not in ("dense", "rank"):
+            raise ValueError("ORDERING_STRATEGY has to be either 'dense' or 'rank'")
+        return v
+
+    # Commit once per request instead of once per manager call.
+    UNIT_OF_WORK: bool = True
+
+    REDIS_URL: str = "redis://localhost"
+    # Read-through cache of `get(id=...)` for models with `cache_enabled`.
+    CACHE_ENABLED: bool = True
+    CACHE_TTL: int = 60
+    CACHE_LOCAL_SIZE: int = 1024
+    # Snapshots of authenticated users, see UserManager.get_authenticated.
+    AUTH_CACHE_TTL: int = 30
+
+    # Server-Timing header and logging of slow requests (app.core.profiling).
+    SQL_PROFILING: bool = True
+    SQL_QUERY_BUDGET: int = 30
+    SQL_TIME_BUDGET_MS: int = 200
+    SQL_REPEATED_THRESHOLD: int = 5
+
+    # Pool of app.core.hashing, either "thread" or "process".
+    PASSWORD_HASHING_EXECUTOR: str = "thread"
+    PASSWORD_HASHING_WORKERS: int = 4
+
+    @validator("PASSWORD_HASHING_EXECUTOR")
+    def validate_password_hashing_executor(cls, v: str) -> str:
+        if v not in ("thread", "process"):
+            raise ValueError(
+                "PASSWORD_HASHING_EXECUTOR has to be either 'thread' or 'process'"
+            )
+        return v
+
+    # Activities are journaled by app.tasks.activity in batches of at most
+    # ACTIVITY_BATCH_SIZE rows, events beyond ACTIVITY_QUEUE_SIZE are dropped.
+    ACTIVITY_JOURNAL_ENABLED: bool = True
+    ACTIVITY_BATCH_SIZE: int = 100
+    ACTIVITY_FLUSH_INTERVAL_MS: int = 200
+    ACTIVITY_QUEUE_SIZE: int = 10000
+
+    # Changes of rows updated this many seconds before a sync cursor are sent
+    # again, transactions may commit rows with older timestamps.
+    SYNC_CURSOR_OVERLAP: int = 5
+
     class Config:
         env_file = "settings.ini"
         env_file_encoding = "utf-8"
@@ -8,3 +8,7 @@ class ObjectDoesNotExist(Exception):
 
 class ImproperlyConfigured(Exception):
     pass
+
+
+class InvalidCursor(Exception):
+    pass
@@ -0,0 +1,62 @@
+"""Password hashing and verification off the event loop.
+
+pbkdf2 takes tens of milliseconds per call, async routes run it in a
+bounded pool instead (`ahash_password`, `averify_password`), so a burst of
+signups or logins queues in the pool and doesn't stall other requests and
+SSE streams of the worker. PASSWORD_HASHING_EXECUTOR selects a thread pool
+(hashlib releases the GIL) or a process pool, PASSWORD_HASHING_WORKERS
+caps concurrency.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from passlib.hash import pbkdf2_sha256
+
+from app.core.config import settings
+
+_executor: Optional[Executor] = None
+
+
+@lru_cache(maxsize=None)
+def hasher():
+    return pbkdf2_sha256.using(salt=bytes(settings.SECRET_KEY.encode("utf-8")))
+
+
+def hash_password(password: str) -> str:
+    return hasher().hash(password)
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return hasher().verify(password, hashed)
+
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        workers = settings.PASSWORD_HASHING_WORKERS
+        if settings.PASSWORD_HASHING_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hashing"
+            )
+    return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def ahash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), hash_password, password)
+
+
+async def averify_password(password: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), verify_password, password, hashed)
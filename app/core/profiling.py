@@ -0,0 +1,142 @@
+"""Per-request SQL instrumentation.
+
+Engine events record every statement into the QueryStats of the current
+request, QueryStatsMiddleware reports them in the `Server-Timing` header
+and logs requests over the configured budget. Statements executed with
+the same SQL several times are reported as possible N+1 queries.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_START_TIME = "query_start_time"
+
+
+class QueryStats:
+    __slots__ = ("count", "duration", "shapes")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    @property
+    def statements(self) -> List[str]:
+        return list(self.shapes.elements())
+
+    def repeated(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Statements executed at least `threshold` times."""
+        threshold = threshold or settings.SQL_REPEATED_THRESHOLD
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration_ms:.2f};desc="{self.count} queries"'
+
+
+_stats: ContextVar[Optional[QueryStats]] = ContextVar("_query_stats", default=None)
+# Process wide collectors, statements are recorded regardless of context.
+_watchers: List[QueryStats] = []
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryStats]:
+    """Collects statements executed in the current context."""
+    stats = QueryStats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+@contextmanager
+def watch_queries() -> Iterator[QueryStats]:
+    """Collects statements of all threads and tasks, meant for tests."""
+    stats = QueryStats()
+    _watchers.append(stats)
+    try:
+        yield stats
+    finally:
+        _watchers.remove(stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_TIME, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info[_START_TIME].pop()
+    stats = _stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    for watcher in _watchers:
+        watcher.record(statement, duration)
+
+
+def report(stats: QueryStats, method: str, path: str) -> None:
+    if (
+        stats.count > settings.SQL_QUERY_BUDGET
+        or stats.duration_ms > settings.SQL_TIME_BUDGET_MS
+    ):
+        logger.warning(
+            "%s %s executed %d queries in %.2f ms",
+            method,
+            path,
+            stats.count,
+            stats.duration_ms,
+        )
+    for shape, count in stats.repeated().items():
+        logger.warning(
+            "%s %s executed the same query %d times, possible N+1: %s",
+            method,
+            path,
+            count,
+            shape,
+        )
+
+
+class QueryStatsMiddleware:
+    """Adds `Server-Timing: db;dur=<ms>;desc="<n> queries"` to responses."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        with collect_queries() as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                report(stats, scope["method"], scope["path"])
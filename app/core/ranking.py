@@ -0,0 +1,56 @@
+"""Lexicographic rank keys used by the `rank` ordering strategy.
+
+A key is a string of base36 digits read as a fraction (``"i"`` is 0.5),
+so there is always room for a new key between any two existing ones and
+moving an item only rewrites that item's key. Keys never end with the
+lowest digit, which keeps string and numeric ordering identical.
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+
+def key_between(before: Optional[str] = None, after: Optional[str] = None) -> str:
+    """Returns a key that sorts strictly between `before` and `after`.
+    `None` stands for the start and the end of the list respectively."""
+    before = before or ""
+    if after is not None and before >= after:
+        raise ValueError(f"Rank {before!r} has to be lower than {after!r}.")
+
+    key = ""
+    position = 0
+    while True:
+        low = DIGITS.index(before[position]) if position < len(before) else 0
+        high = (
+            DIGITS.index(after[position])
+            if after is not None and position < len(after)
+            else BASE
+        )
+        middle = (low + high) // 2
+        if middle > low:
+            return key + DIGITS[middle]
+
+        key += DIGITS[low]
+        if high > low:
+            # Prefix is already lower than `after`, any suffix will do.
+            after = None
+        position += 1
+
+
+def spread(count: int) -> List[str]:
+    """Returns `count` evenly spaced keys of the shortest possible length."""
+    length = 1
+    while BASE**length <= count:
+        length += 1
+    step = BASE**length // (count + 1)
+
+    keys = []
+    for index in range(1, count + 1):
+        value = index * step
+        digits = []
+        for _ in range(length):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip(DIGITS[0]))
+    return keys
@@ -0,0 +1,78 @@
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+
+from app.db.session import get_async_sessionmaker
+
+
+class MissingAsyncSessionError(Exception):
+    pass
+
+
+class _SessionScope:
+    def __init__(self) -> None:
+        self.session: Optional[AsyncSession] = None
+
+
+_scope: ContextVar[Optional[_SessionScope]] = ContextVar("_async_scope", default=None)
+
+
+class AsyncDBSessionMeta(type):
+    @property
+    def session(self) -> AsyncSession:
+        """Returns AsyncSession local to the current async context.
+        Session is opened on first access, so routes that never touch
+        the async layer don't pay for it."""
+        scope = _scope.get()
+        if scope is None:
+            raise MissingAsyncSessionError
+        if scope.session is None:
+            scope.session = get_async_sessionmaker()()
+        return scope.session
+
+
+class AsyncDBSession(metaclass=AsyncDBSessionMeta):
+    """Async counterpart of fastapi_sqlalchemy `db`:
+
+    async with async_db():
+        await async_db.session.execute(...)
+    """
+
+    def __init__(self, commit_on_exit: bool = False):
+        self.token = None
+        self.commit_on_exit = commit_on_exit
+
+    async def __aenter__(self):
+        self.token = _scope.set(_SessionScope())
+        return type(self)
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        session = _scope.get().session
+        try:
+            if session is not None:
+                if exc_type is not None:
+                    await session.rollback()
+                elif self.commit_on_exit:
+                    await session.commit()
+                await session.close()
+        finally:
+            _scope.reset(self.token)
+
+
+async_db: AsyncDBSessionMeta = AsyncDBSession
+
+
+def get_opened_session() -> Optional[AsyncSession]:
+    """Returns async session of the current context only if it was opened."""
+    scope = _scope.get()
+    return scope.session if scope is not None else None
+
+
+class AsyncDBSessionMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
+        async with async_db():
+            response = await call_next(request)
+        return response
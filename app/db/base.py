@@ -1,5 +1,6 @@
 # Import all the models, so that Base has them before being
 # imported by Alembic
+from app.models.sync import Tombstone  # noqa
 from app.models.tasks import Project, Tag, TagItem, Task
 from app.models.user import Activity, ActivityJournal, User  # noqa
 
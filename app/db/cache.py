@@ -0,0 +1,407 @@
+"""Two tier read-through cache of model rows keyed by primary key.
+
+Managers of models with `cache_enabled = True` serve `get(id=...)` from an
+in-process LRU first, then from Redis and only then from the database.
+Rows are stored as snapshots of their column values, relationships are
+lazy loaded as usual once the instance is attached to the session.
+
+Changed and deleted rows are collected on flush and invalidated after
+commit, locally, in Redis and in the LRUs of all other workers through
+Redis pub/sub. Bulk updates invalidate every row of the model by bumping
+its generation, which is a part of Redis keys.
+
+`auth_cache` holds compact snapshots of authenticated users with a short
+TTL, it is invalidated together with `cache`.
+
+Columns listed in `cache_excluded` of a model (passwords) are never
+stored. Snapshots are kept in Redis as JSON and converted back to column
+types when they are loaded, so nothing read from Redis is unpickled.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from datetime import time as time_
+from decimal import Decimal
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+ALL = "*"
+_PENDING = "cache_invalidations"
+
+
+class LocalCache:
+    """Thread safe LRU with per entry expiration."""
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, name: Optional[str] = None) -> None:
+        """Drops all entries or only entries of the model `name`."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == name]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheStats:
+    __slots__ = ("local_hits", "remote_hits", "misses", "invalidations", "errors")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.local_hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        hits = self.local_hits + self.remote_hits
+        total = hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "remote_hits": self.remote_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "hit_ratio": hits / total if total else 0.0,
+            "miss_ratio": self.misses / total if total else 0.0,
+        }
+
+
+class TieredCache:
+    """LRU in front of Redis. Works with the local tier only until
+    `connect` is called, which is fine as long as there is one worker."""
+
+    def __init__(self, maxsize: int, ttl: int, prefix: str = "cache") -> None:
+        self.local = LocalCache(maxsize, ttl)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+        self.remote = None
+        self._listener = None
+        self._generations: Dict[str, int] = {}
+
+    def connect(self, url: str) -> None:
+        if redis is None:
+            logger.warning("redis is not installed, only local cache is used.")
+            return
+        self.remote = redis.Redis.from_url(url)
+        pubsub = self.remote.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: self._on_message})
+        self._listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def disconnect(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self.remote is not None:
+            self.remote.close()
+            self.remote = None
+
+    def get(self, name: str, id: Hashable) -> Optional[dict]:
+        snapshot = self.local.get((name, id))
+        if snapshot is not None:
+            self.stats.local_hits += 1
+            return snapshot
+
+        if self.remote is not None:
+            try:
+                payload = self.remote.get(self._remote_key(name, id))
+            except redis.RedisError:
+                self.stats.errors += 1
+                logger.warning("Cache read failed.", exc_info=True)
+                payload = None
+            if payload is not None:
+                try:
+                    snapshot = orjson.loads(payload)
+                except orjson.JSONDecodeError:
+                    snapshot = None
+            if isinstance(snapshot, dict):
+                self.local.set((name, id), snapshot)
+                self.stats.remote_hits += 1
+                return snapshot
+
+        self.stats.misses += 1
+        return None
+
+    def set(self, name: str, id: Hashable, snapshot: dict) -> None:
+        self.local.set((name, id), snapshot)
+        if self.remote is not None:
+            try:
+                self.remote.set(
+                    self._remote_key(name, id),
+                    orjson.dumps(snapshot, default=str),
+                    ex=self.ttl,
+                )
+            except redis.RedisError:
+                self.stats.errors += 1
+                logger.warning("Cache write failed.", exc_info=True)
+
+    def invalidate(self, keys: Set[Tuple[str, Hashable]]) -> None:
+        """Drops rows everywhere. `(name, ALL)` drops every row of a model."""
+        messages = []
+        for name, id in keys:
+            self.stats.invalidations += 1
+            if id == ALL:
+                self.local.clear(name)
+                messages.append(f"{name}:{ALL}")
+            else:
+                self.local.delete((name, id))
+                messages.append(f"{name}:{id}")
+
+        if self.remote is None or not messages:
+            return
+        try:
+            with self.remote.pipeline(transaction=False) as pipe:
+                for name, id in keys:
+                    if id == ALL:
+                        pipe.incr(self._generation_key(name))
+                    else:
+                        pipe.delete(self._remote_key(name, id))
+                for message in messages:
+                    pipe.publish(self.channel, message)
+                pipe.execute()
+        except redis.RedisError:
+            self.stats.errors += 1
+            logger.warning("Cache invalidation failed.", exc_info=True)
+        for name, id in keys:
+            if id == ALL:
+                self._generations.pop(name, None)
+
+    def clear(self) -> None:
+        self.local.clear()
+        self._generations.clear()
+
+    def _on_message(self, message: dict) -> None:
+        data = message["data"]
+        if isinstance(data, bytes):
+            data = data.decode()
+        name, _, id = data.partition(":")
+        if id == ALL:
+            self.local.clear(name)
+            self._generations.pop(name, None)
+        else:
+            self.local.delete((name, _parse_id(id)))
+
+    @property
+    def channel(self) -> str:
+        return f"{self.prefix}:invalidate"
+
+    def _generation(self, name: str) -> int:
+        generation = self._generations.get(name)
+        if generation is None:
+            generation = int(self.remote.get(self._generation_key(name)) or 0)
+            self._generations[name] = generation
+        return generation
+
+    def _generation_key(self, name: str) -> str:
+        return f"{self.prefix}:{name}:generation"
+
+    def _remote_key(self, name: str, id: Hashable) -> str:
+        return f"{self.prefix}:{name}:{self._generation(name)}:{id}"
+
+
+def _parse_id(id: str) -> Hashable:
+    return int(id) if id.isdigit() else id
+
+
+cache = TieredCache(settings.CACHE_LOCAL_SIZE, settings.CACHE_TTL)
+auth_cache = TieredCache(
+    settings.CACHE_LOCAL_SIZE, settings.AUTH_CACHE_TTL, prefix="auth"
+)
+CACHES = (cache, auth_cache)
+
+
+def cache_name(model) -> str:
+    return model.__tablename__
+
+
+def _pending(session: Session) -> Set[Tuple[str, Hashable]]:
+    return session.info.setdefault(_PENDING, set())
+
+
+def _is_pending(session: Session, name: str, id: Hashable) -> bool:
+    pending = session.info.get(_PENDING)
+    return bool(pending) and ((name, id) in pending or (name, ALL) in pending)
+
+
+# Values JSON keeps as strings, by python type of the column.
+_DECODERS: Dict[type, Callable[[str], Any]] = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    time_: time_.fromisoformat,
+    Decimal: Decimal,
+    uuid.UUID: uuid.UUID,
+}
+
+
+def _decoder(model, key: str) -> Optional[Callable[[str], Any]]:
+    try:
+        return _DECODERS.get(inspect(model).columns[key].type.python_type)
+    except NotImplementedError:
+        return None
+
+
+def _restore(model, snapshot: dict) -> Optional[dict]:
+    """Column values of a snapshot, None if it doesn't fit the model."""
+    columns = inspect(model).column_attrs
+    restored = {}
+    for key, value in snapshot.items():
+        if key not in columns or key in getattr(model, "cache_excluded", ()):
+            return None
+        decode = _decoder(model, key) if isinstance(value, str) else None
+        try:
+            restored[key] = decode(value) if decode else value
+        except ValueError:
+            return None
+    return restored
+
+
+def _coerce_id(model, id) -> Optional[Hashable]:
+    try:
+        return inspect(model).primary_key[0].type.python_type(id)
+    except (TypeError, ValueError, NotImplementedError):
+        return None
+
+
+def load(
+    session: Session, model, id, tier: TieredCache = cache
+) -> Optional[Any]:
+    """Returns the instance from the identity map or the cache, attached to
+    `session` without querying the database, or None on a miss. Columns
+    missing in partial snapshots are loaded on access."""
+    id = _coerce_id(model, id)
+    if id is None:
+        return None
+    instance = session.identity_map.get(identity_key(model, id))
+    if instance is not None:
+        return instance
+
+    name = cache_name(model)
+    if _is_pending(session, name, id):
+        return None
+    snapshot = tier.get(name, id)
+    if snapshot is not None:
+        snapshot = _restore(model, snapshot)
+    if snapshot is None:
+        return None
+
+    instance = inspect(model).class_manager.new_instance()
+    for key, value in snapshot.items():
+        set_committed_value(instance, key, value)
+    make_transient_to_detached(instance)
+    session.add(instance)
+    return instance
+
+
+def store(
+    session: Session,
+    instance,
+    tier: TieredCache = cache,
+    fields: Optional[Iterable[str]] = None,
+) -> None:
+    """Stores a snapshot of all columns, or only of `fields`, except of
+    `cache_excluded` columns of the model."""
+    state = inspect(instance)
+    if state.modified or state.key is None:
+        return
+    name = cache_name(type(instance))
+    id = state.identity[0]
+    if _is_pending(session, name, id):
+        return
+
+    snapshot = {}
+    keys = fields or [attribute.key for attribute in state.mapper.column_attrs]
+    excluded = getattr(type(instance), "cache_excluded", ())
+    for key in keys:
+        if key in excluded:
+            continue
+        if key not in state.dict:
+            # Deferred or expired column, the snapshot would be incomplete.
+            return
+        snapshot[key] = state.dict[key]
+    tier.set(name, id, snapshot)
+
+
+def _cached_model(model) -> bool:
+    return settings.CACHE_ENABLED and getattr(model, "cache_enabled", False)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_invalidations(session: Session, flush_context) -> None:
+    for instance in chain(session.dirty, session.deleted):
+        model = type(instance)
+        if _cached_model(model):
+            _pending(session).add((cache_name(model), inspect(instance).identity[0]))
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def _collect_bulk_invalidations(context) -> None:
+    model = context.mapper.class_
+    if _cached_model(model):
+        _pending(context.session).add((cache_name(model), ALL))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        for tier in CACHES:
+            tier.invalidate(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
@@ -1,7 +1,27 @@
+from functools import lru_cache
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    """Async engine is created lazily, so asyncpg is only required
+    when AsyncBaseManager is actually used."""
+    return create_async_engine(settings.ASYNC_SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+
+
+@lru_cache()
+def get_async_sessionmaker() -> sessionmaker:
+    return sessionmaker(
+        bind=get_async_engine(),
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
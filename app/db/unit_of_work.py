@@ -0,0 +1,108 @@
+"""Request scoped unit of work.
+
+While a unit of work is active managers only flush their changes and the
+whole request is committed once, right before the response is sent, or
+rolled back when the request fails. Outside of it (scripts, shell, tests
+that call managers directly) managers keep committing every call.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from fastapi_sqlalchemy import db
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.async_session import get_opened_session
+
+
+class _UnitOfWork:
+    __slots__ = ("active",)
+
+    def __init__(self) -> None:
+        self.active = True
+
+
+_unit_of_work: ContextVar[Optional[_UnitOfWork]] = ContextVar(
+    "_unit_of_work", default=None
+)
+
+
+def in_unit_of_work() -> bool:
+    unit = _unit_of_work.get()
+    return unit is not None and unit.active
+
+
+def _finish(unit: _UnitOfWork, commit: bool) -> None:
+    unit.active = False
+    if commit:
+        db.session.commit()
+    else:
+        db.session.rollback()
+
+
+async def _finish_async(commit: bool) -> None:
+    session = get_opened_session()
+    if session is None:
+        return
+    if commit:
+        await session.commit()
+    else:
+        await session.rollback()
+
+
+@contextmanager
+def unit_of_work() -> Iterator[None]:
+    """Commits everything managers do inside of the block once, or rolls it
+    back. Joins the unit of work that is already active."""
+    if in_unit_of_work():
+        yield
+        return
+
+    unit = _UnitOfWork()
+    token = _unit_of_work.set(unit)
+    try:
+        yield
+    except BaseException:
+        _finish(unit, commit=False)
+        raise
+    else:
+        _finish(unit, commit=True)
+    finally:
+        _unit_of_work.reset(token)
+
+
+class UnitOfWorkMiddleware:
+    """Commits the request once when the response starts (status < 400)
+    and rolls it back otherwise. Has to be installed inside of DBSessionMiddleware.
+
+    Committing before the first response message guarantees that clients
+    and background tasks never observe uncommitted state. Writes done after
+    that (e.g. from streaming responses) are committed immediately again."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        unit = _UnitOfWork()
+        token = _unit_of_work.set(unit)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and unit.active:
+                commit = message["status"] < 400
+                await _finish_async(commit)
+                _finish(unit, commit)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            if unit.active:
+                await _finish_async(commit=False)
+                _finish(unit, commit=False)
+            raise
+        finally:
+            _unit_of_work.reset(token)
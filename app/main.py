@@ -10,8 +10,14 @@ from sse_starlette.sse import EventSourceResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.api_v1.api import api_router
+from app.core import hashing
 from app.core.config import settings
+from app.core.profiling import QueryStatsMiddleware
+from app.db.async_session import AsyncDBSessionMiddleware
+from app.db.cache import CACHES
+from app.db.unit_of_work import UnitOfWorkMiddleware
 from app.sse.notifications import sse_router
+from app.tasks.activity import activity_queue
 
 app = FastAPI(
     title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
@@ -19,7 +25,13 @@ app = FastAPI(
 
 app.mount("/static/", StaticFiles(directory="app/static"), name="static")
 
+if settings.UNIT_OF_WORK:
+    # Added first so that it runs inside of the session middlewares.
+    app.add_middleware(UnitOfWorkMiddleware)
 app.add_middleware(DBSessionMiddleware, db_url=settings.SQLALCHEMY_DATABASE_URI)
+app.add_middleware(AsyncDBSessionMiddleware)
+if settings.SQL_PROFILING:
+    app.add_middleware(QueryStatsMiddleware)
 
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -34,14 +46,22 @@ if settings.BACKEND_CORS_ORIGINS:
 @app.on_event("startup")
 async def on_startup() -> None:
     await redis_plugin.init_app(app)
-    app.redis = aioredis.from_url("redis://localhost")
+    app.redis = aioredis.from_url(settings.REDIS_URL)
     app.pubsub = app.redis.pubsub()
     await redis_plugin.init()
+    if settings.CACHE_ENABLED:
+        for tier in CACHES:
+            tier.connect(settings.REDIS_URL)
+    activity_queue.start()
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
+    await activity_queue.stop()
     await redis_plugin.terminate()
+    for tier in CACHES:
+        tier.disconnect()
+    hashing.shutdown()
 
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -0,0 +1,205 @@
+from typing import List, Optional, Tuple, Type, Union
+
+from sqlalchemy import select
+
+from app.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from app.db.async_session import async_db
+from app.db.unit_of_work import in_unit_of_work
+from app.managers import pagination
+from app.managers.base import BaseManager
+from app.managers.loading import options_for
+
+
+class AsyncBaseManager:
+    """Awaitable counterpart of BaseManager backed by AsyncSession.
+
+    Models keep inheriting the sync BaseManager, async managers are bound
+    to a model instead:
+
+    TaskManager = AsyncBaseManager.for_model(Task)
+    task = await TaskManager.get(id=1)
+
+    Lazy loading is not available with AsyncSession, so relationships that
+    are serialized have to be covered by the active load profile
+    (see app.managers.loading) or listed in `load_options`.
+
+    create, update and delete only write the row and call `_changed` right
+    before it's committed. Async managers mirror `sync_manager`, writes of
+    models that override its logic (password hashing of users, ordering
+    and activities of tasks) are refused, see app.managers.async_tasks and
+    app.managers.async_users for their managers."""
+
+    model: Type[BaseManager] = None
+    sync_manager: Type[BaseManager] = BaseManager
+    load_options: tuple = ()
+
+    @classmethod
+    def for_model(cls, model, **attrs) -> Type["AsyncBaseManager"]:
+        if not issubclass(model, cls.sync_manager):
+            raise ImproperlyConfigured(
+                f"Model class has to inherit {cls.sync_manager.__name__}."
+            )
+        return type(f"Async{model.__name__}Manager", (cls,), {"model": model, **attrs})
+
+    @classmethod
+    def _select(cls):
+        return select(cls.model).options(*cls.load_options, *options_for(cls.model))
+
+    @classmethod
+    def _check_generic(cls, method: str) -> None:
+        mirrored = getattr(cls.sync_manager, method).__func__
+        if getattr(cls.model, method).__func__ is not mirrored:
+            raise ImproperlyConfigured(
+                f"{cls.model.__name__}.{method} has model specific logic, "
+                f"{cls.__name__} has to override {method}."
+            )
+
+    @classmethod
+    async def _changed(cls, instance, action: str) -> None:
+        """Called with the flushed instance before "created", "updated" or
+        "deleted" is committed, writes done here are committed with it."""
+
+    @classmethod
+    async def create(cls, disable_check: bool = False, **fields):
+        cls._check_generic("create")
+        if not disable_check:
+            cls.check_fields(**fields)
+        instance = cls.model(**fields)
+
+        async_db.session.add(instance)
+        await async_db.session.flush()
+        await cls._changed(instance, "created")
+        await cls._commit()
+        return await cls._reload(instance)
+
+    @classmethod
+    async def delete(cls, instance):
+        cls._check_generic("delete")
+        await cls._changed(instance, "deleted")
+        await async_db.session.delete(instance)
+        await cls._commit()
+
+    @classmethod
+    async def all(
+        cls,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "created",
+        desc: bool = False,
+    ) -> List[Type]:
+        query = cls._select()
+        if order_by in cls.model.model_registry().sortable:
+            column = getattr(cls.model, order_by)
+            query = query.order_by(column.desc() if desc else column)
+
+        result = await async_db.session.execute(query.offset(skip).limit(limit))
+        return result.scalars().all()
+
+    @classmethod
+    async def get(cls, **fields) -> Type:
+        result = await async_db.session.execute(
+            cls._select().filter(*cls.model.build_filter(**fields))
+        )
+        instance = result.scalars().first()
+        if instance:
+            return instance
+
+        raise ObjectDoesNotExist(
+            f"No {cls.model.__name__.lower()} with such parameters."
+        )
+
+    @classmethod
+    async def update(cls, id, **updated_fields):
+        cls._check_generic("update")
+        cls.check_fields(**updated_fields)
+        instance = await cls.get(id=id)
+
+        for field in updated_fields:
+            setattr(instance, field, updated_fields[field])
+
+        await async_db.session.flush()
+        await cls._changed(instance, "updated")
+        await cls._commit()
+        return await cls._reload(instance)
+
+    @classmethod
+    async def filter(
+        cls,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "created",
+        desc: bool = False,
+        **fields,
+    ):
+        query = cls._select().filter(*cls.model.build_filter(**fields))
+        if order_by in cls.model.model_registry().sortable:
+            column = getattr(cls.model, order_by)
+            if desc:
+                query = query.order_by(column.desc(), cls.model.updated.desc())
+            else:
+                query = query.order_by(column, cls.model.updated.desc())
+
+        result = await async_db.session.execute(query.offset(skip).limit(limit))
+        return result.scalars().all()
+
+    @classmethod
+    async def paginate(
+        cls,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "created",
+        desc: bool = False,
+        cursor: Optional[str] = None,
+        **fields,
+    ) -> Tuple[List[Type], Optional[str]]:
+        if order_by not in cls.model.model_registry().sortable:
+            order_by = "id"
+
+        query = pagination.apply_keyset(
+            cls._select().filter(*cls.model.build_filter(**fields)),
+            cls.model,
+            order_by,
+            desc,
+            skip,
+            limit,
+            cursor,
+        )
+        result = await async_db.session.execute(query)
+        return pagination.split_page(result.scalars().all(), order_by, limit)
+
+    @classmethod
+    async def get_or_false(cls, **fields) -> Union[Type, bool]:
+        try:
+            return await cls.get(**fields)
+        except ObjectDoesNotExist:
+            return False
+
+    @classmethod
+    async def exists(cls, **fields):
+        try:
+            await cls.get(**fields)
+            return True
+        except ObjectDoesNotExist:
+            return False
+
+    @classmethod
+    def check_fields(cls, **fields):
+        cls.model.check_fields(**fields)
+
+    @classmethod
+    async def _commit(cls):
+        if in_unit_of_work():
+            await async_db.session.flush()
+        else:
+            await async_db.session.commit()
+
+    @classmethod
+    async def _reload(cls, instance):
+        """Server side defaults are expired after commit and can't be lazy
+        loaded, so the row is selected again with configured options."""
+        result = await async_db.session.execute(
+            cls._select()
+            .filter(cls.model.id == instance.id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().one()
@@ -0,0 +1,220 @@
+"""Async counterparts of app.managers.tasks.
+
+Changes of projects, tasks and tags are journaled in the transaction that
+writes them, tasks and sections keep their positions. Container filters,
+ordering and activity events come from the sync managers, only the
+statements are awaited here.
+"""
+from sqlalchemy import func, select, update
+
+from app.core import ranking
+from app.db.async_session import async_db
+from app.models import tasks
+from app.tasks import activity
+
+from .async_base import AsyncBaseManager
+from .tasks import OrderedManager, SectionManager, TasksBaseManager, TasksManager
+
+
+class AsyncTasksBaseManager(AsyncBaseManager):
+    sync_manager = TasksBaseManager
+
+    @classmethod
+    async def _scalar(cls, query):
+        return (await async_db.session.execute(query)).scalar()
+
+    @classmethod
+    async def _activity_actor_id(cls, instance) -> int | None:
+        """Owner of the instance, or of the project it belongs to."""
+        if getattr(instance, "owner_id", None) is not None:
+            return instance.owner_id
+        project_id = getattr(instance, "project_id", None)
+        if project_id is None and getattr(instance, "section_id", None) is not None:
+            project_id = await cls._scalar(
+                select(tasks.Section.project_id).where(
+                    tasks.Section.id == instance.section_id
+                )
+            )
+        if project_id is None:
+            return None
+        return await cls._scalar(
+            select(tasks.Project.owner_id).where(tasks.Project.id == project_id)
+        )
+
+    @classmethod
+    async def _changed(cls, instance, action: str) -> None:
+        if not cls.model.journals_activity():
+            return
+        event = cls.model.activity_event(
+            instance, action, await cls._activity_actor_id(instance)
+        )
+        if event is not None:
+            activity.record(async_db.session.sync_session, event)
+
+
+class AsyncOrderedManager(AsyncTasksBaseManager):
+    sync_manager = OrderedManager
+
+    @classmethod
+    def _ordered_select(cls, container_model, container_id, exclude_id=None, **group):
+        model = cls.model
+        query = select(model.id, model.rank).where(
+            model._container_filter(container_model, container_id),
+            *(getattr(model, key) == value for key, value in group.items()),
+        )
+        if exclude_id is not None:
+            query = query.where(model.id != exclude_id)
+        return query.order_by(*model.ordering())
+
+    @classmethod
+    async def shift_order(
+        cls,
+        container_model,
+        container_id,
+        start: int,
+        delta: int,
+        inclusive: bool = True,
+    ) -> int:
+        """Shifts order of every item in container starting from `start` by `delta`
+        with a single UPDATE statement. Changes are committed by the caller."""
+        model = cls.model
+        result = await async_db.session.execute(
+            update(model)
+            .where(
+                model._container_filter(container_model, container_id),
+                model.order >= start if inclusive else model.order > start,
+            )
+            .values({model.order: model.order + delta})
+            .execution_options(synchronize_session="evaluate")
+        )
+        return result.rowcount
+
+    @classmethod
+    async def rank_for_position(
+        cls, container_model, container_id, position: int, exclude_id=None, **group
+    ) -> str:
+        """Generates rank that places an item at `position` of the container."""
+        query = cls._ordered_select(container_model, container_id, exclude_id, **group)
+        execute = async_db.session.execute
+        if position > 0:
+            rows = (await execute(query.offset(position - 1).limit(2))).all()
+            if not rows:
+                # Position is past the end of container, place after the last item.
+                last = query.order_by(None).order_by(
+                    *(column.desc() for column in cls.model.ordering())
+                )
+                rows = (await execute(last.limit(1))).all()
+            before, after = (rows + [None, None])[:2]
+        else:
+            before, after = None, (await execute(query.limit(1))).first()
+
+        if any(row is not None and row.rank is None for row in (before, after)):
+            # Container still has items ordered by the dense strategy.
+            await cls.rebalance(container_model, container_id)
+            return await cls.rank_for_position(
+                container_model, container_id, position, exclude_id, **group
+            )
+        return ranking.key_between(
+            before.rank if before else None, after.rank if after else None
+        )
+
+    @classmethod
+    async def rebalance(cls, container_model, container_id) -> None:
+        """Rewrites ranks of the container with evenly spaced short keys and
+        restores consecutive `order` values."""
+        ids = (
+            await async_db.session.execute(
+                cls._ordered_select(container_model, container_id).with_only_columns(
+                    cls.model.id
+                )
+            )
+        ).scalars().all()
+        mappings = [
+            {"id": id, "rank": rank, "order": order}
+            for order, (id, rank) in enumerate(zip(ids, ranking.spread(len(ids))))
+        ]
+        await async_db.session.run_sync(
+            lambda session: session.bulk_update_mappings(cls.model, mappings)
+        )
+        await cls._commit()
+
+
+class AsyncTasksManager(AsyncOrderedManager):
+    sync_manager = TasksManager
+
+    @classmethod
+    async def _rank_for_task(
+        cls, container_model, container_id, position: int, is_done, exclude_id=None
+    ) -> str:
+        """Rank of a task placed at `position` of the container, which counts
+        open tasks first. Tasks stay among the ones with the same `is_done`."""
+        is_done = bool(is_done)
+        if is_done:
+            position -= await cls._scalar(
+                select(func.count()).select_from(
+                    cls._ordered_select(
+                        container_model, container_id, exclude_id, is_done=False
+                    )
+                    .order_by(None)
+                    .subquery()
+                )
+            )
+        return await cls.rank_for_position(
+            container_model,
+            container_id,
+            max(position, 0),
+            exclude_id,
+            is_done=is_done,
+        )
+
+    @classmethod
+    async def create(cls, disable_check: bool = False, **fields):
+        if fields.get("section_id", False):
+            container_model, container_id = tasks.Section, fields["section_id"]
+        else:
+            container_model, container_id = tasks.Project, fields["project_id"]
+        fields["order"] = fields["order"] if fields.get("order", False) else 0
+        if cls.model.uses_rank():
+            fields["rank"] = await cls._rank_for_task(
+                container_model,
+                container_id,
+                fields["order"],
+                fields.get("is_done", False),
+            )
+        else:
+            await cls.shift_order(container_model, container_id, fields["order"], 1)
+        return await super().create(disable_check, **fields)
+
+    @classmethod
+    async def delete(cls, instance):
+        if not cls.model.uses_rank():
+            container_model, container_id = cls.model.container_of(instance)
+            await cls.shift_order(
+                container_model, container_id, instance.order, -1, inclusive=False
+            )
+        return await super().delete(instance)
+
+
+class AsyncSectionManager(AsyncOrderedManager):
+    sync_manager = SectionManager
+
+    @classmethod
+    async def create(cls, disable_check: bool = False, **fields):
+        fields["order"] = fields["order"] if fields.get("order", False) else 0
+        if cls.model.uses_rank():
+            fields["rank"] = await cls.rank_for_position(
+                tasks.Project, fields["project_id"], fields["order"]
+            )
+        else:
+            await cls.shift_order(
+                tasks.Project, fields["project_id"], fields["order"], 1
+            )
+        return await super().create(disable_check, **fields)
+
+    @classmethod
+    async def delete(cls, instance):
+        if not cls.model.uses_rank():
+            await cls.shift_order(
+                tasks.Project, instance.project_id, instance.order, -1, inclusive=False
+            )
+        return await super().delete(instance)
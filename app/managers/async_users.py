@@ -0,0 +1,33 @@
+"""Async counterpart of app.managers.users."""
+from sqlalchemy import delete
+
+from app import models
+from app.core import hashing
+from app.db.async_session import async_db
+
+from .async_base import AsyncBaseManager
+from .users import UserManager
+
+
+class AsyncUserManager(AsyncBaseManager):
+    """Hashes passwords in the hashing pool, activity journals of users are
+    created and deleted with them."""
+
+    sync_manager = UserManager
+
+    @classmethod
+    async def create(cls, disable_check: bool = False, **fields):
+        if not disable_check:
+            cls.check_fields(**fields)
+        fields["password"] = await hashing.ahash_password(fields["password"])
+        return await super().create(disable_check=True, **fields)
+
+    @classmethod
+    async def _changed(cls, instance, action: str) -> None:
+        journal = models.ActivityJournal
+        if action == "created":
+            async_db.session.add(journal(user_id=instance.id))
+        elif action == "deleted":
+            await async_db.session.execute(
+                delete(journal).where(journal.user_id == instance.id)
+            )
@@ -1,12 +1,24 @@
-from typing import List, Type, Union
+from typing import List, Optional, Tuple, Type, Union
 
 from fastapi_sqlalchemy import db
-from sqlalchemy import MetaData
 
+from app.core.config import settings
 from app.core.exceptions import ObjectDoesNotExist
+from app.db import cache
+from app.db.unit_of_work import in_unit_of_work
+from app.managers import lookups, pagination
+from app.managers.loading import options_for
+from app.managers.registry import ModelRegistry, get_registry
 
 
 class BaseManager:
+    # Serve `get(id=...)` from app.db.cache.
+    cache_enabled: bool = False
+    # Columns that are never written to the cache.
+    cache_excluded: Tuple[str, ...] = ("password",)
+    # Columns that can't be used in filters or to order by.
+    sensitive_fields: Tuple[str, ...] = ("password",)
+
     @classmethod
     def create(cls, disable_check: bool = False, **fields):
         if not disable_check:
@@ -14,14 +26,13 @@ class BaseManager:
         instance = cls(**fields)
 
         db.session.add(instance)
-        db.session.commit()
-        db.session.refresh(instance)
+        cls._commit(instance)
         return instance
 
     @classmethod
     def delete(cls, instance):
         db.session.delete(instance)
-        db.session.commit()
+        cls._commit()
 
     @classmethod
     def all(
@@ -31,33 +42,25 @@ class BaseManager:
         order_by: str = "created",
         desc: bool = False,
     ) -> List[Type]:
-        try:
-            if desc:
-                return (
-                    db.session.query(cls)
-                    .order_by(getattr(cls, order_by).desc())
-                    .offset(skip)
-                    .limit(limit)
-                    .all()
-                )
-            return (
-                db.session.query(cls)
-                .order_by(getattr(cls, order_by))
-                .offset(skip)
-                .limit(limit)
-                .all()
-            )
-        except AttributeError:
-            return db.session.query(cls).offset(skip).limit(limit).all()
+        query = cls._query()
+        if order_by in cls.model_registry().sortable:
+            column = getattr(cls, order_by)
+            query = query.order_by(column.desc() if desc else column)
+        return query.offset(skip).limit(limit).all()
 
     @classmethod
     def get(cls, **fields) -> Type:
-        cls.check_fields(**fields)
-
-        expression = [getattr(cls, k) == fields[k] for k in fields.keys()]
-
-        instance = db.session.query(cls).filter(*expression).first()
+        criteria = cls.build_filter(**fields)
+        cached = cls._is_cached_lookup(fields)
+        if cached:
+            instance = cache.load(db.session, cls, fields["id"])
+            if instance is not None:
+                return instance
+
+        instance = cls._query().filter(*criteria).first()
         if instance:
+            if cached:
+                cache.store(db.session, instance)
             return instance
 
         raise ObjectDoesNotExist(f"No {cls.__name__.lower()} with such parameters.")
@@ -70,8 +73,7 @@ class BaseManager:
         for field in updated_fields:
             setattr(instance, field, updated_fields[field])
 
-        db.session.commit()
-        db.session.refresh(instance)
+        cls._commit(instance)
 
         return instance
 
@@ -84,35 +86,39 @@ class BaseManager:
         desc: bool = False,
         **fields,
     ):
-        cls.check_fields(**fields)
-
-        expression = [getattr(cls, k) == fields[k] for k in fields.keys()]
-        try:
-            if desc:
-                return (
-                    db.session.query(cls)
-                    .order_by(getattr(cls, order_by).desc(), cls.updated.desc())
-                    .filter(*expression)
-                    .offset(skip)
-                    .limit(limit)
-                    .all()
-                )
-            return (
-                db.session.query(cls)
-                .order_by(getattr(cls, order_by), cls.updated.desc())
-                .filter(*expression)
-                .offset(skip)
-                .limit(limit)
-                .all()
-            )
-        except AttributeError:
-            return (
-                db.session.query(cls)
-                .filter(*expression)
-                .offset(skip)
-                .limit(limit)
-                .all()
+        query = cls._query()
+        if order_by in cls.model_registry().sortable:
+            column = getattr(cls, order_by)
+            query = query.order_by(
+                column.desc() if desc else column, cls.updated.desc()
             )
+        return query.filter(*cls.build_filter(**fields)).offset(skip).limit(limit).all()
+
+    @classmethod
+    def paginate(
+        cls,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "created",
+        desc: bool = False,
+        cursor: Optional[str] = None,
+        **fields,
+    ) -> Tuple[List[Type], Optional[str]]:
+        """Returns page of rows and opaque cursor of the next page (None for the last one).
+        When cursor is passed, rows are selected by keyset on (order_by, id) and skip is ignored."""
+        if order_by not in cls.model_registry().sortable:
+            order_by = "id"
+
+        query = pagination.apply_keyset(
+            cls._query().filter(*cls.build_filter(**fields)),
+            cls,
+            order_by,
+            desc,
+            skip,
+            limit,
+            cursor,
+        )
+        return pagination.split_page(query.all(), order_by, limit)
 
     @classmethod
     def get_or_false(cls, **fields) -> Union[Type, bool]:
@@ -131,29 +137,61 @@ class BaseManager:
             return False
 
     @classmethod
-    def _get_model_fields(cls) -> List[str]:
-        fields = []
+    def _query(cls):
+        """Query of the model with eager loading of the active load profile."""
+        return db.session.query(cls).options(*options_for(cls))
 
-        for field in dir(cls):
-            if not field.startswith("_"):
-                if not callable(getattr(cls, field)) and not isinstance(
-                    getattr(cls, field), MetaData
-                ):  # noqa
-                    fields.append(field)
+    @classmethod
+    def model_registry(cls) -> ModelRegistry:
+        return get_registry(cls)
 
-        return fields
+    @classmethod
+    def _get_model_fields(cls) -> List[str]:
+        return sorted(cls.model_registry().fields)
 
     @classmethod
     def check_fields(cls, **fields):
+        supported = cls.model_registry().fields
         for field in fields.keys():
-            if field not in cls._get_model_fields():
+            if field not in supported:
                 raise ValueError(
                     f"Field {field} is not suported, suported fields: {cls._get_model_fields()}"
                 )  # noqa
 
+    @classmethod
+    def build_filter(cls, **fields) -> list:
+        """Builds WHERE clause expressions, fields may have lookups
+        (`deadline__gte`, `project_id__in`, see app.managers.lookups)."""
+        cls.check_fields(
+            **{lookups.split_lookup(key)[0]: value for key, value in fields.items()}
+        )
+        return lookups.compile_lookups(cls, cls.model_registry().filterable, **fields)
+
     @classmethod
     def refresh(cls, instance):
-        db.session.commit()
+        cls._commit()
         db.session.refresh(instance)
 
         return instance
+
+    @classmethod
+    def _is_cached_lookup(cls, fields: dict) -> bool:
+        # Loader options of an active profile can't be applied to cached rows.
+        return (
+            cls.cache_enabled
+            and settings.CACHE_ENABLED
+            and fields.keys() == {"id"}
+            and not options_for(cls)
+        )
+
+    @classmethod
+    def _commit(cls, *instances):
+        """Flushes inside of a unit of work (the request is committed once
+        by UnitOfWorkMiddleware), otherwise commits and reloads `instances`."""
+        if in_unit_of_work():
+            db.session.flush()
+            return
+
+        db.session.commit()
+        for instance in instances:
+            db.session.refresh(instance)
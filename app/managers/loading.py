@@ -0,0 +1,82 @@
+"""Eager loading profiles declared by response schemas.
+
+A schema lists relationship paths it serializes in `Config.load_profile`:
+
+class Section(SectionInDBBase):
+    tasks: list[Task]
+
+    class Config:
+        load_profile = ("tasks.tags", "tasks.reactions")
+
+While `load_profile(model, schema)` is active, every query a manager of
+that model runs gets matching selectinload/joinedload options, so the
+number of queries per response doesn't depend on the number of rows.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.core.exceptions import ImproperlyConfigured
+
+_profiles: ContextVar[Optional[Dict[type, Tuple[str, ...]]]] = ContextVar(
+    "_load_profiles", default=None
+)
+
+
+def get_profile_paths(schema: Type[BaseModel]) -> Tuple[str, ...]:
+    return tuple(getattr(schema.__config__, "load_profile", ()))
+
+
+@lru_cache(maxsize=None)
+def build_load_options(model, paths: Tuple[str, ...]) -> tuple:
+    """Compiles dotted relationship paths into loader options. Collections
+    are loaded with selectinload, many-to-one relationships are joined."""
+    options = []
+    for path in paths:
+        option = None
+        target = model
+        for name in path.split("."):
+            relationship = inspect(target).relationships.get(name)
+            if relationship is None:
+                raise ImproperlyConfigured(
+                    f"{target.__name__} has no relationship {name} (load profile {path})."
+                )
+            attribute = getattr(target, name)
+            if option is None:
+                strategy = selectinload if relationship.uselist else joinedload
+                option = strategy(attribute)
+            else:
+                strategy = "selectinload" if relationship.uselist else "joinedload"
+                option = getattr(option, strategy)(attribute)
+            target = relationship.mapper.class_
+        options.append(option)
+    return tuple(options)
+
+
+def options_for(model) -> tuple:
+    """Loader options of the active profile for `model`, if any."""
+    profiles = _profiles.get()
+    if not profiles or model not in profiles:
+        return ()
+    return build_load_options(model, profiles[model])
+
+
+@contextmanager
+def load_profile(
+    model,
+    schema: Optional[Type[BaseModel]] = None,
+    paths: Optional[Tuple[str, ...]] = None,
+) -> Iterator[None]:
+    """Activates profile of `schema`, or explicit relationship `paths`."""
+    profiles = dict(_profiles.get() or {})
+    profiles[model] = tuple(paths) if paths is not None else get_profile_paths(schema)
+    token = _profiles.set(profiles)
+    try:
+        yield
+    finally:
+        _profiles.reset(token)
@@ -0,0 +1,117 @@
+"""Django style field lookups compiled into SQL expressions.
+
+Filters are passed to managers as `<field>__<lookup>=value`, a field
+without lookup means `exact`:
+
+Task.filter(deadline__gte=start, project_id__in=ids, name__icontains="bug")
+
+`in` takes an iterable or a select, which keeps the lookup in one query.
+"""
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.sql import ClauseElement
+
+SEPARATOR = "__"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+LOOKUPS: Dict[str, Callable[[Any, Any], Any]] = {
+    # Comparison with None is compiled to IS (NOT) NULL, for relationships as well.
+    "exact": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "in": lambda column, value: column.in_(
+        value if isinstance(value, ClauseElement) else list(value)
+    ),
+    "contains": lambda column, value: column.contains(value, autoescape=True),
+    "icontains": lambda column, value: column.ilike(
+        f"%{_escape_like(value)}%", escape="/"
+    ),
+    "startswith": lambda column, value: column.startswith(value, autoescape=True),
+    "isnull": lambda column, value: column == None if value else column != None,  # noqa: E711
+}
+
+# Lookups that can be used with many-to-one relationships.
+RELATIONSHIP_LOOKUPS = frozenset(("exact", "ne", "isnull"))
+
+
+def split_lookup(key: str) -> Tuple[str, str]:
+    """Splits `deadline__gte` into field and lookup name."""
+    field, separator, lookup = key.rpartition(SEPARATOR)
+    if separator and lookup in LOOKUPS:
+        return field, lookup
+    return key, "exact"
+
+
+def compile_lookups(model, filterable: Iterable[str], /, **fields) -> List[Any]:
+    relationships = inspect(model).relationships
+    expressions = []
+    for key, value in fields.items():
+        field, lookup = split_lookup(key)
+        if field not in filterable:
+            raise ValueError(f"Field {field} can't be used for filtering.")
+        if field in relationships and lookup not in RELATIONSHIP_LOOKUPS:
+            raise ValueError(f"Lookup {lookup} can't be used with relationship {field}.")
+        expressions.append(LOOKUPS[lookup](getattr(model, field), value))
+    return expressions
+
+
+def _parse_bool(value: str) -> bool:
+    if value.lower() in ("1", "true", "yes", "on"):
+        return True
+    if value.lower() in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"{value} is not a valid boolean.")
+
+
+PARSERS: Dict[type, Callable[[str], Any]] = {
+    bool: _parse_bool,
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    time: time.fromisoformat,
+}
+
+
+def _parser(model, field: str) -> Callable[[str], Any]:
+    column = inspect(model).columns.get(field)
+    if column is None:
+        return str
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return str
+    return PARSERS.get(python_type, python_type)
+
+
+def parse_query_filters(
+    model, query_params: Mapping[str, str], allowed: Iterable[str]
+) -> Dict[str, Any]:
+    """Picks whitelisted lookups from query parameters and converts values
+    to python types of columns. `in` accepts comma separated values.
+    Raises ValueError on values that can't be converted."""
+    filters = {}
+    for key in allowed:
+        if key not in query_params:
+            continue
+        raw = query_params[key]
+        field, lookup = split_lookup(key)
+        if lookup == "isnull":
+            filters[key] = _parse_bool(raw)
+            continue
+        parse = _parser(model, field)
+        try:
+            if lookup == "in":
+                filters[key] = [parse(value) for value in raw.split(",") if value]
+            else:
+                filters[key] = parse(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value {raw!r} for {key}.")
+    return filters
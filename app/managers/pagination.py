@@ -0,0 +1,104 @@
+"""Keyset (cursor) pagination helpers shared by sync and async managers.
+
+Rows are ordered by (order_by column, id) and the cursor holds these two
+values of the last returned row, so the next page starts with an indexed
+range condition instead of skipping rows with OFFSET. NULLs are always
+placed after other values for ascending and before them for descending
+order, which keeps both directions symmetrical.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.core.exceptions import InvalidCursor
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = json.dumps(
+        [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Cursor is malformed.")
+    if not isinstance(values, list):
+        raise InvalidCursor("Cursor is malformed.")
+    return values
+
+
+def _python_value(column, value):
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        return python_type(value)
+    except (TypeError, ValueError):
+        raise InvalidCursor("Cursor doesn't match ordering.")
+
+
+def order_clause(model, order_by: str, desc: bool = False) -> Tuple:
+    column = getattr(model, order_by)
+    if desc:
+        return column.desc().nullsfirst(), model.id.desc()
+    return column.asc().nullslast(), model.id.asc()
+
+
+def keyset_condition(model, order_by: str, desc: bool, cursor: str):
+    values = decode_cursor(cursor)
+    if len(values) != 2:
+        raise InvalidCursor("Cursor doesn't match ordering.")
+    column = getattr(model, order_by)
+    value, last_id = _python_value(column, values[0]), values[1]
+
+    if desc:
+        if value is None:
+            return or_(and_(column.is_(None), model.id < last_id), column.isnot(None))
+        return or_(column < value, and_(column == value, model.id < last_id))
+    if value is None:
+        return and_(column.is_(None), model.id > last_id)
+    return or_(
+        column > value, and_(column == value, model.id > last_id), column.is_(None)
+    )
+
+
+def apply_keyset(
+    query,
+    model,
+    order_by: str,
+    desc: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+):
+    """Orders query for keyset pagination and fetches one extra row
+    to find out whether the next page exists."""
+    query = query.order_by(*order_clause(model, order_by, desc))
+    if cursor:
+        query = query.filter(keyset_condition(model, order_by, desc, cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def split_page(rows: list, order_by: str, limit: int) -> Tuple[list, Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, order_by), last.id)
@@ -0,0 +1,52 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import configure_mappers
+
+SORTABLE_TYPES = (int, float, Decimal, str, bool, date, datetime, time)
+
+
+class ModelRegistry:
+    """Field names of a mapped model, computed once from SQLAlchemy mapper.
+
+    `fields` are all public attributes that can be passed to managers,
+    `filterable` can be compared in WHERE clause and `sortable` are
+    columns with orderable python types. `sensitive_fields` of the model
+    are neither filterable nor sortable."""
+
+    __slots__ = ("columns", "relationships", "fields", "filterable", "sortable")
+
+    def __init__(self, model) -> None:
+        configure_mappers()
+        mapper = inspect(model)
+        sensitive = frozenset(getattr(model, "sensitive_fields", ()))
+
+        self.columns = frozenset(mapper.column_attrs.keys())
+        self.relationships = frozenset(mapper.relationships.keys())
+        self.fields = frozenset(
+            key for key in mapper.all_orm_descriptors.keys() if not key.startswith("_")
+        )
+        self.filterable = (
+            self.fields
+            - sensitive
+            - frozenset(key for key, rel in mapper.relationships.items() if rel.uselist)
+        )
+        self.sortable = frozenset(
+            key
+            for key, prop in mapper.column_attrs.items()
+            if key not in sensitive and _is_sortable(prop.columns[0].type)
+        )
+
+
+def _is_sortable(column_type) -> bool:
+    try:
+        return issubclass(column_type.python_type, SORTABLE_TYPES)
+    except NotImplementedError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def get_registry(model) -> ModelRegistry:
+    return ModelRegistry(model)
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi_sqlalchemy import db
+from sqlalchemy import func, or_, select
+
+from app.core.config import settings
+from app.core.exceptions import InvalidCursor
+from app.managers.base import BaseManager
+from app.managers.pagination import decode_cursor, encode_cursor
+from app.models import sync, tasks
+
+
+class SyncManager(BaseManager):
+    @classmethod
+    def encode_since(cls, since: datetime) -> str:
+        return encode_cursor(since)
+
+    @classmethod
+    def decode_since(cls, cursor: str) -> datetime:
+        values = decode_cursor(cursor)
+        try:
+            (since,) = values
+            return datetime.fromisoformat(since)
+        except (TypeError, ValueError):
+            raise InvalidCursor("Cursor is malformed.")
+
+    @classmethod
+    def changes(cls, user_id: int, since: Optional[datetime] = None) -> dict:
+        """Tasks, sections, tags, tag items and reactions of the user
+        created or updated since `since` and tombstones of deleted ones.
+        Without `since` every row is returned. `cursor` of the result is
+        taken before reading, so concurrent changes are sent next time."""
+        cursor = db.session.execute(select(func.now())).scalar()
+        Task, Section = tasks.Task, tasks.Section
+        projects = tasks.Project.visible_ids(user_id)
+        sections = select(Section.id).where(Section.project_id.in_(projects))
+        task_ids = select(Task.id).where(
+            or_(Task.project_id.in_(projects), Task.section_id.in_(sections))
+        )
+        criteria = {
+            "tasks": (Task, [Task.id.in_(task_ids)]),
+            "sections": (Section, [Section.id.in_(sections)]),
+            "tags": (tasks.Tag, [tasks.Tag.owner_id == user_id]),
+            "tag_items": (tasks.TagItem, [tasks.TagItem.task_id.in_(task_ids)]),
+            "reactions": (tasks.Reaction, [tasks.Reaction.task_id.in_(task_ids)]),
+        }
+        deleted = []
+        if since is not None:
+            since -= timedelta(seconds=settings.SYNC_CURSOR_OVERLAP)
+            for model, where in criteria.values():
+                where.append(model.updated >= since)
+            deleted = (
+                db.session.query(sync.Tombstone)
+                .filter(
+                    sync.Tombstone.created >= since,
+                    or_(
+                        sync.Tombstone.project_id.in_(projects),
+                        sync.Tombstone.owner_id == user_id,
+                    ),
+                )
+                .order_by(sync.Tombstone.created, sync.Tombstone.id)
+                .all()
+            )
+
+        changes = {
+            name: model._query().filter(*where).order_by(model.updated, model.id).all()
+            for name, (model, where) in criteria.items()
+        }
+        return {**changes, "deleted": deleted, "cursor": cls.encode_since(cursor)}
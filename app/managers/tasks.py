@@ -1,57 +1,380 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import re
 from fastapi import HTTPException
+from fastapi_sqlalchemy import db
 import jwt
 from pydantic import ValidationError
+from sqlalchemy import (
+    Float,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    update,
+)
 
+from app.core import ranking
 from app.core.config import settings
+from app.core.exceptions import ImproperlyConfigured, InvalidCursor, ObjectDoesNotExist
+from app.db.unit_of_work import in_unit_of_work, unit_of_work
+from app.tasks import activity
 from app.models import tasks, user
+from . import pagination
 from .base import BaseManager
 from app import schemas
 
 
 class TasksBaseManager(BaseManager):
+    """Changes and their activities are committed together, activities of
+    changes that are rolled back are discarded."""
+
     @classmethod
     def create(cls, disable_check: bool = False, **fields):
-        instance = super().create(disable_check, **fields)
-        # self.handle_activity(instance, "created")
+        with unit_of_work():
+            instance = super().create(disable_check, **fields)
+            cls.handle_activity(instance, "created")
+        cls._reload(instance)
 
         return instance
 
     @classmethod
     def delete(cls, instance):
-        # self.handle_activity(instance, "deleted")
-        return super().delete(instance)
+        with unit_of_work():
+            cls.handle_activity(instance, "deleted")
+            return super().delete(instance)
 
     @classmethod
     def update(cls, id, **updated_fields):
-        # self.handle_activity(self.get(id=id), "updated")
-        return super().update(id, **updated_fields)
-
-    def handle_activity(cls, instance, action: str) -> user.Activity:
-        actor = None
-        if isinstance(instance, tasks.Task):
-            if instance.project:
-                actor = instance.project.owner
-        elif isinstance(instance, tasks.TagItem):
-            actor = tasks.Tag.get(id=instance.tag_id).owner
+        with unit_of_work():
+            instance = super().update(id, **updated_fields)
+            cls.handle_activity(instance, "updated")
+        cls._reload(instance)
+        return instance
+
+    @classmethod
+    def _reload(cls, instance) -> None:
+        """Loads the instance expired by the commit, as `_commit` does."""
+        if not in_unit_of_work():
+            db.session.refresh(instance)
+
+    @classmethod
+    def _activity_actor_id(cls, instance) -> int | None:
+        """Owner of the instance, or of the project it belongs to."""
+        if getattr(instance, "owner_id", None) is not None:
+            return instance.owner_id
+        project_id = getattr(instance, "project_id", None)
+        if project_id is None and getattr(instance, "section_id", None) is not None:
+            project_id = instance.section.project_id
+        if project_id is None:
+            return None
+        return tasks.Project.access(project_id)[0]
+
+    @classmethod
+    def journals_activity(cls) -> bool:
+        """Only changes of models Activity can point to (projects, tasks and
+        tags) are journaled."""
+        return (
+            settings.ACTIVITY_JOURNAL_ENABLED
+            and f"{cls.__tablename__}_id" in user.Activity.__table__.c
+        )
+
+    @classmethod
+    def activity_event(cls, instance, action: str, actor_id: int | None) -> dict | None:
+        """Activity of the change, deleted rows aren't referenced, deletion
+        of a task keeps its project."""
+        if actor_id is None:
+            return None
+        target = f"{cls.__tablename__}_id"
+        event = {"actor_id": actor_id, "action": action}
+        if target != "project_id":
+            event["project_id"] = getattr(instance, "project_id", None)
+        if action != "deleted":
+            event[target] = instance.id
+        return event
+
+    @classmethod
+    def handle_activity(cls, instance, action: str) -> None:
+        """Journals the change through app.tasks.activity."""
+        if not cls.journals_activity():
+            return
+        event = cls.activity_event(instance, action, cls._activity_actor_id(instance))
+        if event is not None:
+            activity.record(db.session, event)
+
+
+class OrderedManager(TasksBaseManager):
+    """Keeps position of items inside of their container (project or section).
+
+    With the dense strategy `order` holds consecutive integers and inserting
+    shifts every row after the target. With the rank strategy `rank` holds
+    a lexicographic key, so inserts and moves write only the affected row.
+    `order` then just records the position the item was placed at, it only
+    orders items that have no rank yet and `rebalance` renumbers it."""
+
+    @classmethod
+    def uses_rank(cls) -> bool:
+        return settings.ORDERING_STRATEGY == "rank"
+
+    @classmethod
+    def _container_filter(cls, container_model, container_id):
+        """Items reference their container with `<container table>_id`,
+        managers of other schemas override it."""
+        return getattr(cls, f"{container_model.__tablename__}_id") == container_id
+
+    @classmethod
+    def ordering(cls) -> list:
+        """Order of items inside of their container, relationships of
+        containers are ordered the same way."""
+        return [cls.rank, case((cls.rank.is_(None), cls.order)), cls.id]
+
+    @classmethod
+    def _ordered_query(cls, container_model, container_id, exclude_id=None, **group):
+        query = db.session.query(cls).filter(
+            cls._container_filter(container_model, container_id)
+        )
+        if exclude_id is not None:
+            query = query.filter(cls.id != exclude_id)
+        return query.filter_by(**group).order_by(*cls.ordering())
+
+    @classmethod
+    def shift_order(
+        cls, container_model, container_id, start: int, delta: int, inclusive: bool = True
+    ) -> int:
+        """Shifts order of every item in container starting from `start` by `delta`
+        with a single UPDATE statement. Changes are committed by the caller."""
+        return (
+            db.session.query(cls)
+            .filter(
+                cls._container_filter(container_model, container_id),
+                cls.order >= start if inclusive else cls.order > start,
+            )
+            .update({cls.order: cls.order + delta}, synchronize_session="evaluate")
+        )
+
+    @classmethod
+    def rank_for_position(
+        cls, container_model, container_id, position: int, exclude_id=None, **group
+    ) -> str:
+        """Generates rank that places an item at `position` of the container.
+        With `group` (column values leading `ordering`) position counts
+        only items of the group."""
+        query = cls._ordered_query(
+            container_model, container_id, exclude_id, **group
+        ).with_entities(cls.id, cls.rank)
+        if position > 0:
+            rows = query.offset(position - 1).limit(2).all()
+            if not rows:
+                # Position is past the end of container, place after the last item.
+                rows = (
+                    query.order_by(None)
+                    .order_by(*(column.desc() for column in cls.ordering()))
+                    .limit(1)
+                    .all()
+                )
+            before, after = (rows + [None, None])[:2]
         else:
-            actor = instance.owner
-        try:
-            if not actor.journal:
-                user.ActivityJournal.create(user=actor)
-        except AttributeError:
-            user.ActivityJournal.create(user=actor)
+            before, after = None, query.first()
 
-        target = {cls.__name__.lower(): instance}
-        try:
-            return user.Activity.create(
-                journal=actor.journal, actor=actor, action=action, **target
+        if any(row is not None and row.rank is None for row in (before, after)):
+            # Container still has items ordered by the dense strategy.
+            cls.rebalance(container_model, container_id)
+            return cls.rank_for_position(
+                container_model, container_id, position, exclude_id, **group
+            )
+        return ranking.key_between(
+            before.rank if before else None, after.rank if after else None
+        )
+
+    @classmethod
+    def needs_rebalance(cls, instance) -> bool:
+        return bool(instance.rank) and len(instance.rank) > settings.RANK_MAX_LENGTH
+
+    @classmethod
+    def rebalance(cls, container_model, container_id):
+        """Rewrites ranks of the container with evenly spaced short keys and
+        restores consecutive `order` values."""
+        ids = [
+            id for id, in cls._ordered_query(container_model, container_id)
+            .with_entities(cls.id)
+        ]
+        db.session.bulk_update_mappings(
+            cls,
+            [
+                {"id": id, "rank": rank, "order": order}
+                for order, (id, rank) in enumerate(zip(ids, ranking.spread(len(ids))))
+            ],
+        )
+        cls._commit()
+
+
+class TasksManager(OrderedManager):
+    @classmethod
+    def between(cls, user_id: int, start: date, end: date) -> list:
+        """Tasks with deadline in [start, end] from every project the user
+        can see, including tasks of sections, in a single query."""
+        projects = tasks.Project.visible_ids(user_id)
+        sections = select(tasks.Section.id).where(tasks.Section.project_id.in_(projects))
+        return (
+            cls._query()
+            .filter(
+                tasks.Task.deadline.between(start, end),
+                or_(
+                    tasks.Task.project_id.in_(projects),
+                    tasks.Task.section_id.in_(sections),
+                ),
+            )
+            .order_by(tasks.Task.deadline, tasks.Task.is_done, tasks.Task.order, tasks.Task.id)
+            .all()
+        )
+
+    @classmethod
+    def search_document(cls):
+        """tsvector of name and description, matches ix_task_search_document.
+        Constants are inlined, bound parameters would keep PostgreSQL from
+        using the expression index."""
+        task = tasks.Task
+        return func.to_tsvector(
+            literal_column("'simple'::regconfig"),
+            func.coalesce(task.name, literal_column("''"))
+            .op("||")(literal_column("' '"))
+            .op("||")(func.coalesce(task.description, literal_column("''"))),
+        )
+
+    @classmethod
+    def _search_terms(cls, query: str, dialect: str):
+        """Condition and rank of tasks matching `query`. PostgreSQL matches
+        prefixes of every word with the tsvector and substrings of names with
+        trigrams, other databases (SQLite test runs) fall back to LIKE. Names
+        starting with `query` are ranked first on both."""
+        task = tasks.Task
+        pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        in_name = task.name.ilike(f"%{pattern}%", escape="\\")
+        prefix = task.name.ilike(f"{pattern}%", escape="\\")
+        if dialect == "postgresql":
+            boost = case((prefix, 1.0), else_=0.0)
+            words = re.findall(r"\w+", query)
+            if not words:
+                return in_name, boost + func.similarity(task.name, query)
+            tsquery = func.to_tsquery(
+                literal_column("'simple'::regconfig"),
+                " & ".join(f"{word}:*" for word in words),
+            )
+            document = cls.search_document()
+            return (
+                or_(document.op("@@")(tsquery), in_name),
+                boost
+                + func.ts_rank(document, tsquery)
+                + func.similarity(task.name, query),
+            )
+        return (
+            or_(in_name, task.description.ilike(f"%{pattern}%", escape="\\")),
+            case((prefix, 3.0), (in_name, 2.0), else_=1.0),
+        )
+
+    @classmethod
+    def search(
+        cls,
+        user_id: int,
+        query: str,
+        limit: int = 50,
+        cursor: str | None = None,
+        tag_id: int | None = None,
+        **fields,
+    ) -> tuple[list, str | None]:
+        """Page of tasks from projects the user can see (sections included)
+        matching `query`, best matches first, and the cursor of the next page.
+        Pages are selected by keyset on (rank, id), `fields` are filters."""
+        task = tasks.Task
+        condition, rank = cls._search_terms(query, db.session.get_bind().dialect.name)
+        # ts_rank and similarity are float4, the cursor holds a double. Ranks
+        # are compared as doubles, so a rank read back from the cursor equals
+        # the one computed by the database.
+        rank = cast(rank, Float(53))
+        projects = tasks.Project.visible_ids(user_id)
+        sections = select(tasks.Section.id).where(tasks.Section.project_id.in_(projects))
+        rows = (
+            cls._query()
+            .add_columns(rank.label("rank"))
+            .filter(
+                condition,
+                or_(task.project_id.in_(projects), task.section_id.in_(sections)),
+                *cls.build_filter(**fields),
+            )
+        )
+        if tag_id is not None:
+            rows = rows.filter(task.tags.any(tasks.Tag.id == tag_id))
+        if cursor:
+            values = pagination.decode_cursor(cursor)
+            try:
+                last_rank, last_id = float(values[0]), int(values[1])
+            except (IndexError, TypeError, ValueError):
+                raise InvalidCursor("Cursor doesn't match ordering.")
+            rows = rows.filter(
+                or_(rank < last_rank, and_(rank == last_rank, task.id < last_id))
+            )
+        rows = rows.order_by(rank.desc(), task.id.desc()).limit(limit + 1).all()
+        if len(rows) <= limit:
+            return [row[0] for row in rows], None
+        rows = rows[:limit]
+        return [row[0] for row in rows], pagination.encode_cursor(
+            float(rows[-1].rank), rows[-1][0].id
+        )
+
+    @classmethod
+    def ordering(cls) -> list:
+        """Done tasks go after the rest."""
+        return [tasks.Task.is_done, *super().ordering()]
+
+    @classmethod
+    def _rank_for_task(
+        cls, container_model, container_id, position: int, is_done, exclude_id=None
+    ) -> str:
+        """Rank of a task placed at `position` of the container, which counts
+        open tasks first. Tasks stay among the ones with the same `is_done`."""
+        is_done = bool(is_done)
+        if is_done:
+            position -= (
+                cls._ordered_query(
+                    container_model, container_id, exclude_id, is_done=False
+                )
+                .order_by(None)
+                .count()
             )
-        except AttributeError:
-            return user.Activity.create(actor=actor, action=action, **target)
+        return cls.rank_for_position(
+            container_model,
+            container_id,
+            max(position, 0),
+            exclude_id,
+            is_done=is_done,
+        )
+
+    @classmethod
+    def container_of(cls, instance):
+        if instance.section_id:
+            return tasks.Section, instance.section_id
+        return tasks.Project, instance.project_id
+
+    @classmethod
+    def at_position(cls, container_model, container_id, order: int):
+        if not cls.uses_rank():
+            if container_model is tasks.Section:
+                return tasks.Task.get(section_id=container_id, project_id=None, order=order)
+            return tasks.Task.get(section_id=None, project_id=container_id, order=order)
 
+        instance = (
+            cls._ordered_query(container_model, container_id)
+            .offset(order)
+            .first()
+        )
+        if instance:
+            return instance
+        raise ObjectDoesNotExist("No task with such parameters.")
 
-class TasksManager(TasksBaseManager):
     @classmethod
     def create(cls, disable_check: bool = False, **fields):
         model = tasks.Section if fields.get("section_id", False) else tasks.Project
@@ -61,17 +384,18 @@ class TasksManager(TasksBaseManager):
             else fields["project_id"]
         )
         fields["order"] = fields["order"] if fields.get("order", False) else 0
-        for task in model.get(id=id).tasks:
-            if task.order >= fields["order"]:
-                tasks.Task.update(task.id, order=task.order + 1)
+        if cls.uses_rank():
+            fields["rank"] = cls._rank_for_task(
+                model, id, fields["order"], fields.get("is_done", False)
+            )
+        else:
+            cls.shift_order(model, id, fields["order"], 1)
         return super().create(disable_check, **fields)
 
     @classmethod
     def delete(cls, instance):
-        model = instance.section or instance.project
-        for task in model.tasks:
-            if task.order > instance.order:
-                tasks.Task.update(task.id, order=task.order - 1)
+        if not cls.uses_rank():
+            cls.reorder_source(instance)
         return super().delete(instance)
 
     @classmethod
@@ -79,21 +403,27 @@ class TasksManager(TasksBaseManager):
         cls,
         instance,
     ):
-        source = instance.section or instance.project
-        for task in source.tasks:
-            if task.order > instance.order:
-                tasks.Task.update(task.id, order=task.order - 1)
+        model, id = cls.container_of(instance)
+        cls.shift_order(model, id, instance.order, -1, inclusive=False)
 
     @classmethod
     def reorder_destination(cls, order: int, source):
-        for task in source.tasks:
-            if task.order >= order:
-                tasks.Task.update(task.id, order=task.order + 1)
+        cls.shift_order(type(source), source.id, order, 1)
 
     @classmethod
     def reorder(cls, instance, destination, order: int):
-        cls.reorder_source(instance)
-        cls.reorder_destination(order, destination)
+        fields = {}
+        if cls.uses_rank():
+            fields["rank"] = cls._rank_for_task(
+                type(destination),
+                destination.id,
+                order,
+                instance.is_done,
+                exclude_id=instance.id,
+            )
+        else:
+            cls.reorder_source(instance)
+            cls.reorder_destination(order, destination)
         project_id, section_id = (
             (destination.id, None)
             if isinstance(destination, tasks.Project)
@@ -104,35 +434,126 @@ class TasksManager(TasksBaseManager):
             order=order,
             project_id=project_id,
             section_id=section_id,
+            **fields,
         )
 
 
-class SectionManager(TasksBaseManager):
+class SectionManager(OrderedManager):
+    @classmethod
+    def container_of(cls, instance):
+        return tasks.Project, instance.project_id
+
     @classmethod
     def create(cls, disable_check: bool = False, **fields):
         fields["order"] = fields["order"] if fields.get("order", False) else 0
-        for section in tasks.Project.get(id=fields["project_id"]).sections:
-            if section.order >= fields["order"]:
-                tasks.Section.update(id=section.id, order=section.order + 1)
+        if cls.uses_rank():
+            fields["rank"] = cls.rank_for_position(
+                tasks.Project, fields["project_id"], fields["order"]
+            )
+        else:
+            cls.shift_order(tasks.Project, fields["project_id"], fields["order"], 1)
         return super().create(disable_check, **fields)
 
     @classmethod
     def delete(cls, instance):
-        for section in instance.project.sections:
-            if section.order > instance.order:
-                tasks.Section.update(id=section.id, order=section.order - 1)
+        if not cls.uses_rank():
+            cls.shift_order(
+                tasks.Project, instance.project_id, instance.order, -1, inclusive=False
+            )
         return super().delete(instance)
 
     @classmethod
     def reorder(cls, instance, destination, order: int):
-        fields = instance.__dict__.copy()
-        fields.pop("_sa_instance_state")
-        fields["order"] = order
-        tasks.Section.manager.delete(instance)
-        return tasks.Section.manager.create(**fields)
+        fields = {}
+        if cls.uses_rank():
+            fields["rank"] = cls.rank_for_position(
+                tasks.Project, destination.id, order, exclude_id=instance.id
+            )
+        else:
+            cls.shift_order(
+                tasks.Project, instance.project_id, instance.order, -1, inclusive=False
+            )
+            cls.shift_order(tasks.Project, destination.id, order, 1)
+        return tasks.Section.update(
+            id=instance.id, order=order, project_id=destination.id, **fields
+        )
+
+
+# Session.info key of permissions resolved by ProjectManager.access.
+PROJECT_ACCESS_CACHE = "project_access"
 
 
 class ProjectManager(TasksBaseManager):
+    @classmethod
+    def visible_ids(cls, user_id: int):
+        """Select of ids of projects owned by the user or shared with them."""
+        participated = select(tasks.Participant.project_id).where(
+            tasks.Participant.user_id == user_id
+        )
+        return select(tasks.Project.id).where(
+            or_(tasks.Project.owner_id == user_id, tasks.Project.id.in_(participated))
+        )
+
+    @classmethod
+    def access(cls, id: int) -> tuple[int, tuple[int, ...]]:
+        """Owner id and participant ids of the project with a single query.
+        Results are kept in the session (one per request) until owner or
+        participants of the project change."""
+        cached = db.session.info.setdefault(PROJECT_ACCESS_CACHE, {})
+        if id not in cached:
+            rows = db.session.execute(
+                select(tasks.Project.owner_id, tasks.Participant.user_id)
+                .outerjoin(
+                    tasks.Participant, tasks.Participant.project_id == tasks.Project.id
+                )
+                .where(tasks.Project.id == id)
+            ).all()
+            if not rows:
+                raise ObjectDoesNotExist("No project with such parameters.")
+            participants = tuple(row.user_id for row in rows if row.user_id is not None)
+            cached[id] = (rows[0].owner_id, participants)
+        return cached[id]
+
+    @classmethod
+    def summaries(cls, user_id: int, today: date | None = None) -> list:
+        """Visible projects with open, done and overdue task counts,
+        including tasks of sections, in a single GROUP BY query."""
+        today = today or date.today()
+        task, section = tasks.Task, tasks.Section
+        project_id = func.coalesce(task.project_id, section.project_id)
+        counts = (
+            select(
+                project_id.label("project_id"),
+                func.sum(case((task.is_done, 0), else_=1)).label("open"),
+                func.sum(case((task.is_done, 1), else_=0)).label("done"),
+                func.sum(
+                    case((and_(~task.is_done, task.deadline < today), 1), else_=0)
+                ).label("overdue"),
+            )
+            .select_from(task)
+            .outerjoin(section, task.section_id == section.id)
+            .where(project_id.in_(cls.visible_ids(user_id)))
+            .group_by(project_id)
+            .subquery()
+        )
+        project = tasks.Project
+        return db.session.execute(
+            select(
+                project.id,
+                project.name,
+                project.icon,
+                project.accent_color,
+                project.is_pinned,
+                project.is_favorite,
+                func.coalesce(counts.c.open, 0).label("open"),
+                func.coalesce(counts.c.done, 0).label("done"),
+                func.coalesce(counts.c.overdue, 0).label("overdue"),
+            )
+            .outerjoin(counts, counts.c.project_id == project.id)
+            .where(project.id.in_(cls.visible_ids(user_id)))
+            .order_by(project.is_pinned.desc(), project.created, project.id)
+        ).all()
+
     @classmethod
     def generate_invitaion_code(
         cls,
@@ -156,3 +577,120 @@ class ProjectManager(TasksBaseManager):
             return tasks.Project.get(id=int(code.sub))
         except (jwt.PyJWTError, ValidationError):
             raise HTTPException(status_code=403, detail="Wrong invitation code")
+
+
+class ReactionManager(BaseManager):
+    """Reactions are stored once per emoji of a task with a denormalized
+    `count` of users, so tasks render them without loading the users."""
+
+    @classmethod
+    def _insert(cls, model):
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise ImproperlyConfigured(f"Reactions can't be upserted on {dialect}.")
+        return insert(model)
+
+    @classmethod
+    def _reaction_id(cls, task_id: int, emoji: str) -> int | None:
+        return db.session.execute(
+            select(tasks.Reaction.id).where(
+                tasks.Reaction.task_id == task_id, tasks.Reaction.emoji == emoji
+            )
+        ).scalar()
+
+    @classmethod
+    def _upsert(cls, task_id: int, emoji: str) -> int:
+        """Id of the `emoji` reaction of the task, created if missing. Raises
+        ObjectDoesNotExist when there is no such task."""
+        reaction = tasks.Reaction
+        db.session.execute(
+            cls._insert(reaction)
+            .from_select(
+                ["task_id", "emoji", "count"],
+                select(tasks.Task.id, literal(emoji), literal(0)).where(
+                    tasks.Task.id == task_id
+                ),
+            )
+            .on_conflict_do_nothing(index_elements=["task_id", "emoji"])
+        )
+        reaction_id = cls._reaction_id(task_id, emoji)
+        if reaction_id is None:
+            raise ObjectDoesNotExist(f"Task with id {task_id} does not exist.")
+        return reaction_id
+
+    @classmethod
+    def _change_count(cls, reaction_id: int, delta: int) -> None:
+        db.session.execute(
+            update(tasks.Reaction)
+            .where(tasks.Reaction.id == reaction_id)
+            .values(count=tasks.Reaction.count + delta)
+        )
+
+    @classmethod
+    def _add_user(cls, reaction_id: int, user_id: int) -> bool:
+        added = db.session.execute(
+            cls._insert(tasks.UserReaction)
+            .values(user_id=user_id, reaction_id=reaction_id)
+            .on_conflict_do_nothing(index_elements=["user_id", "reaction_id"])
+        ).rowcount
+        if added:
+            cls._change_count(reaction_id, 1)
+        return bool(added)
+
+    @classmethod
+    def _remove_user(cls, reaction_id: int, user_id: int) -> bool:
+        user_reaction = tasks.UserReaction
+        removed = db.session.execute(
+            delete(user_reaction).where(
+                user_reaction.user_id == user_id,
+                user_reaction.reaction_id == reaction_id,
+            )
+        ).rowcount
+        if not removed:
+            return False
+        cls._change_count(reaction_id, -1)
+        # Deleted through the session to leave a sync tombstone.
+        empty = (
+            db.session.query(tasks.Reaction)
+            .filter(tasks.Reaction.id == reaction_id, tasks.Reaction.count <= 0)
+            .one_or_none()
+        )
+        if empty is not None:
+            db.session.delete(empty)
+        return True
+
+    @classmethod
+    def _finish(cls, task_id: int) -> None:
+        task = db.session.identity_map.get(db.session.identity_key(tasks.Task, task_id))
+        if task is not None:
+            db.session.expire(task, ["reactions"])
+        cls._commit()
+
+    @classmethod
+    def add(cls, task_id: int, emoji: str, user_id: int) -> bool:
+        """Reacts with `emoji`, False if the user already did."""
+        added = cls._add_user(cls._upsert(task_id, emoji), user_id)
+        cls._finish(task_id)
+        return added
+
+    @classmethod
+    def remove(cls, task_id: int, emoji: str, user_id: int) -> bool:
+        """Takes the reaction back, False if the user didn't react."""
+        reaction_id = cls._reaction_id(task_id, emoji)
+        removed = reaction_id is not None and cls._remove_user(reaction_id, user_id)
+        cls._finish(task_id)
+        return removed
+
+    @classmethod
+    def toggle(cls, task_id: int, emoji: str, user_id: int) -> bool:
+        """Adds the reaction or takes it back, True if it was added."""
+        reaction_id = cls._upsert(task_id, emoji)
+        added = cls._add_user(reaction_id, user_id)
+        if not added:
+            cls._remove_user(reaction_id, user_id)
+        cls._finish(task_id)
+        return added
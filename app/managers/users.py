@@ -2,21 +2,53 @@ from datetime import datetime, timedelta
 from typing import Any, Type
 
 import jwt
-from passlib.hash import pbkdf2_sha256
+from fastapi_sqlalchemy import db
+from starlette.concurrency import run_in_threadpool
 
 from app import models
 from app.api.exceptions import WrongLoginCredentials
+from app.core import hashing
 from app.core.config import settings
 from app.core.exceptions import ObjectDoesNotExist
+from app.db import cache
 from app.managers.base import BaseManager
 
+# Columns needed to authorize a request, cached by get_authenticated.
+AUTH_SNAPSHOT = ("id", "is_active", "is_superuser", "email_verified")
+
 
 class UserManager(BaseManager):
+    @classmethod
+    def get_authenticated(cls, id: int | None) -> Type:
+        """User of a token subject. Served from a compact snapshot of
+        AUTH_SNAPSHOT columns in auth_cache when possible, other columns
+        are loaded on access."""
+        if not settings.CACHE_ENABLED:
+            return cls.get(id=id)
+        instance = cache.load(db.session, cls, id, tier=cache.auth_cache)
+        if instance is None:
+            instance = cls.get(id=id)
+            cache.store(
+                db.session, instance, tier=cache.auth_cache, fields=AUTH_SNAPSHOT
+            )
+        return instance
+
     @classmethod
     def create(cls, **fields):
         cls.check_fields(**fields)
         fields["password"] = cls.set_password(fields["password"])
+        return cls._create_hashed(**fields)
+
+    @classmethod
+    async def acreate(cls, **fields):
+        """`create` with the password hashed in the hashing pool and the
+        rows written in the threadpool, off the event loop."""
+        cls.check_fields(**fields)
+        fields["password"] = await hashing.ahash_password(fields["password"])
+        return await run_in_threadpool(cls._create_hashed, **fields)
 
+    @classmethod
+    def _create_hashed(cls, **fields):
         instance = super().create(disable_check=True, **fields)
 
         cls.refresh(instance)
@@ -36,7 +68,8 @@ class UserManager(BaseManager):
 
     @staticmethod
     def _hasher():
-        return pbkdf2_sha256.using(salt=bytes(settings.SECRET_KEY.encode("utf-8")))
+        # Built once, see app.core.hashing.
+        return hashing.hasher()
 
     @classmethod
     def authenticate(cls, email: str, password: str):
@@ -50,6 +83,18 @@ class UserManager(BaseManager):
         except ObjectDoesNotExist:
             raise WrongLoginCredentials("No user with such email was found.")
 
+    @classmethod
+    async def aauthenticate(cls, email: str, password: str):
+        """`authenticate` with the user looked up in the threadpool and the
+        password verified in the hashing pool, off the event loop."""
+        try:
+            user = await run_in_threadpool(cls.get, email=email)
+        except ObjectDoesNotExist:
+            raise WrongLoginCredentials("No user with such email was found.")
+        if not await hashing.averify_password(password, user.password):
+            raise WrongLoginCredentials("Password didn't match.")
+        return user
+
     @classmethod
     def generate_access_token(
         cls, subject: str | Any, expires_delta: timedelta = None
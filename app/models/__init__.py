@@ -1,2 +1,3 @@
 from .tasks import Project, Section, Tag, TagItem, Task  # noqa
 from .user import Activity, ActivityJournal, User  # noqa
+from .sync import Tombstone  # noqa
@@ -6,5 +6,8 @@ from app.db.base_class import Base
 
 class Timestamped(Base):
     __abstract__ = True
+    # Fetch generated timestamps on flush, managers don't refresh
+    # instances inside of a unit of work.
+    __mapper_args__ = {"eager_defaults": True}
     created = Column(DateTime(timezone=True), default=func.now())
     updated = Column(DateTime, onupdate=func.now(), default=func.now())
@@ -0,0 +1,64 @@
+from sqlalchemy import Column, Index, Integer, String, event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.managers.sync import SyncManager
+from app.models.base import Timestamped
+from app.models.tasks import Reaction, Section, Tag, TagItem, Task
+
+
+class Tombstone(Timestamped, SyncManager):
+    """Deleted row of a synchronized model, `created` is the deletion time.
+    Rows are scoped by project, or by owner for tags."""
+
+    __table_args__ = (
+        Index("ix_tombstone_project_id_created", "project_id", "created"),
+        Index("ix_tombstone_owner_id_created", "owner_id", "created"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    model = Column(String, nullable=False)
+    object_id = Column(Integer, nullable=False)
+    # No foreign keys, tombstones outlive projects and users.
+    project_id = Column(Integer, nullable=True)
+    owner_id = Column(Integer, nullable=True)
+
+
+def _task_project_id(session: Session, task_id) -> int | None:
+    return session.execute(
+        select(func.coalesce(Task.project_id, Section.project_id))
+        .select_from(Task)
+        .outerjoin(Section, Task.section_id == Section.id)
+        .where(Task.id == task_id)
+    ).scalar()
+
+
+def _scope(session: Session, instance) -> dict:
+    if isinstance(instance, Tag):
+        return {"owner_id": instance.owner_id}
+    if isinstance(instance, Section):
+        return {"project_id": instance.project_id}
+    if isinstance(instance, Task):
+        if instance.project_id is not None:
+            return {"project_id": instance.project_id}
+        return {"project_id": _task_project_id(session, instance.id)}
+    return {"project_id": _task_project_id(session, instance.task_id)}
+
+
+SYNCHRONIZED = (Task, Section, Tag, TagItem, Reaction)
+
+
+@event.listens_for(Session, "before_flush")
+def record_deletions(session: Session, flush_context, instances) -> None:
+    """Records tombstones of synchronized rows deleted with `session.delete`,
+    bulk deletes are not tracked."""
+    with session.no_autoflush:
+        for instance in list(session.deleted):
+            if isinstance(instance, SYNCHRONIZED):
+                session.add(
+                    Tombstone(
+                        model=instance.__tablename__,
+                        object_id=instance.id,
+                        **_scope(session, instance),
+                    )
+                )
@@ -1,34 +1,47 @@
 from sqlalchemy import (
+    DDL,
     Boolean,
     Column,
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
+    UniqueConstraint,
     event,
+    inspect,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
 
 from app.db.types import Priority
 from app.managers.base import BaseManager
-from app.managers.tasks import ProjectManager, SectionManager, TasksBaseManager, TasksManager
+from app.managers.tasks import (
+    PROJECT_ACCESS_CACHE,
+    ProjectManager,
+    ReactionManager,
+    SectionManager,
+    TasksBaseManager,
+    TasksManager,
+)
 from app.models.base import Timestamped
 
 
 class Participant(Timestamped):
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("user.id"))
-    project_id = Column(Integer, ForeignKey("project.id"))
+    user_id = Column(Integer, ForeignKey("user.id"), index=True)
+    project_id = Column(Integer, ForeignKey("project.id"), index=True)
 
 
 class Project(Timestamped, ProjectManager):
+    cache_enabled = True
+
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=False, nullable=False)
     description = Column(String, unique=False, nullable=True)
 
-    owner_id = Column(Integer, ForeignKey("user.id"))
+    owner_id = Column(Integer, ForeignKey("user.id"), index=True)
     owner = relationship("User", back_populates="projects")
 
     participants = relationship(
@@ -45,7 +58,9 @@ class Project(Timestamped, ProjectManager):
     icon = Column(String, nullable=True)
 
     sections = relationship(
-        "Section", back_populates="project", order_by="app.models.tasks.Section.order"
+        "Section",
+        back_populates="project",
+        order_by=lambda: Section.ordering(),
     )
 
     sort_tasks_by = Column(String, default="is_done")
@@ -54,14 +69,21 @@ class Project(Timestamped, ProjectManager):
     tasks = relationship(
         "Task",
         back_populates="project",
-        order_by="app.models.tasks.Task.is_done, app.models.tasks.Task.order",
+        order_by=lambda: Task.ordering(),
     )
     related_activities = relationship("Activity", back_populates="project")
 
 
 class Section(Timestamped, SectionManager):
+    cache_enabled = True
+    __table_args__ = (
+        # Shape of Project.sections order_by.
+        Index("ix_section_project_id_rank_order", "project_id", "rank", "order"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     order = Column(Integer, nullable=False)
+    rank = Column(String, nullable=True)
     name = Column(String, nullable=False)
 
     project_id = Column(Integer, ForeignKey("project.id"))
@@ -72,7 +94,7 @@ class Section(Timestamped, SectionManager):
     tasks = relationship(
         "Task",
         back_populates="section",
-        order_by="app.models.tasks.Task.is_done, app.models.tasks.Task.order",
+        order_by=lambda: Task.ordering(),
     )
 
 
@@ -82,22 +104,43 @@ class Tag(Timestamped, TasksBaseManager):
     color = Column(String, nullable=True)
     tasks = relationship("Task", secondary="tagitem", back_populates="tags")
 
-    owner_id = Column(Integer, ForeignKey("user.id"))
+    owner_id = Column(Integer, ForeignKey("user.id"), index=True)
     owner = relationship("User", back_populates="tags")
     related_activities = relationship("Activity", back_populates="tag")
 
 
 class TagItem(Timestamped, BaseManager):
     id = Column(Integer, primary_key=True, index=True)
-    tag_id = Column(Integer, ForeignKey("tag.id"))
-    task_id = Column(Integer, ForeignKey("task.id"))
+    tag_id = Column(Integer, ForeignKey("tag.id"), index=True)
+    task_id = Column(Integer, ForeignKey("task.id"), index=True)
 
 
 class Task(Timestamped, TasksManager):
+    __table_args__ = (
+        # Calendar lookups by deadline range within visible projects.
+        Index("ix_task_deadline_project_id", "deadline", "project_id"),
+        # Shape of Project.tasks and Section.tasks order_by.
+        Index(
+            "ix_task_project_id_is_done_rank_order",
+            "project_id",
+            "is_done",
+            "rank",
+            "order",
+        ),
+        Index(
+            "ix_task_section_id_is_done_rank_order",
+            "section_id",
+            "is_done",
+            "rank",
+            "order",
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     order = Column(Integer, nullable=False)
+    rank = Column(String, nullable=True)
 
-    parent_task_id = Column(Integer, ForeignKey("task.id"))
+    parent_task_id = Column(Integer, ForeignKey("task.id"), index=True)
     subtasks = relationship("Task")
 
     name = Column(String, unique=False, nullable=False)
@@ -124,6 +167,33 @@ class Task(Timestamped, TasksManager):
     reactions = relationship("Reaction", back_populates="task")
 
 
+# Full text search of tasks on PostgreSQL (TasksManager.search): the
+# tsvector index has to be built from the same expression as
+# TasksManager.search_document, trigrams of names serve substring and
+# prefix (autocomplete) ILIKE lookups.
+event.listen(
+    Task.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Task.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX ix_task_search_document ON task USING gin "
+        "(to_tsvector('simple'::regconfig, "
+        "(coalesce(name, '') || ' ') || coalesce(description, '')))"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Task.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX ix_task_name_trgm ON task USING gin (name gin_trgm_ops)"
+    ).execute_if(dialect="postgresql"),
+)
+
+
 @event.listens_for(Task.is_done, "set")
 def track_task_completion(target, value, oldvalue, initiator):
     """Updates done_at field when task is being done. Is used to track productivity at dashboard."""
@@ -134,17 +204,77 @@ def track_task_completion(target, value, oldvalue, initiator):
             target.done_at = None
 
 
+@event.listens_for(Session, "after_flush")
+def invalidate_project_access(session, flush_context):
+    """Drops permissions cached by Project.access when owner or participants
+    change, from either side of the relationship."""
+    from app.models.user import User
+
+    cached = session.info.get(PROJECT_ACCESS_CACHE)
+    if not cached:
+        return
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Project):
+            cached.pop(instance.id, None)
+        elif isinstance(instance, Participant):
+            cached.pop(instance.project_id, None)
+        elif isinstance(instance, User):
+            if inspect(instance).attrs.participated_projects.history.has_changes():
+                cached.clear()
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def invalidate_bulk_project_access(context):
+    if context.mapper.class_ in (Project, Participant):
+        context.session.info.pop(PROJECT_ACCESS_CACHE, None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_project_access(session, previous_transaction):
+    session.info.pop(PROJECT_ACCESS_CACHE, None)
+
+
 class UserReaction(Timestamped, BaseManager):
+    __table_args__ = (UniqueConstraint("user_id", "reaction_id"),)
+
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("user.id"))
-    reaction_id = Column(Integer, ForeignKey("reaction.id"))
+    user_id = Column(Integer, ForeignKey("user.id"), index=True)
+    reaction_id = Column(Integer, ForeignKey("reaction.id"), index=True)
 
 
-class Reaction(Timestamped, BaseManager):
+class Reaction(Timestamped, ReactionManager):
+    __table_args__ = (UniqueConstraint("task_id", "emoji"),)
+
     id = Column(Integer, primary_key=True, index=True)
     emoji = Column(String, nullable=False)
+    # Number of users, kept by ReactionManager and count_user_reactions.
+    count = Column(Integer, nullable=False, default=0, server_default="0")
 
-    task_id = Column(Integer, ForeignKey("task.id"))
+    task_id = Column(Integer, ForeignKey("task.id"), index=True)
     task = relationship("Task", back_populates="reactions")
 
     users = relationship("User", secondary="userreaction", back_populates="reactions")
+
+
+@event.listens_for(Session, "after_flush")
+def count_user_reactions(session, flush_context):
+    """Keeps Reaction.count of user reactions added or deleted through the
+    session, ReactionManager updates it with the statements it runs."""
+    deltas = {}
+    for instances, delta in ((session.new, 1), (session.deleted, -1)):
+        for instance in instances:
+            if isinstance(instance, UserReaction) and instance.reaction_id:
+                deltas[instance.reaction_id] = deltas.get(instance.reaction_id, 0) + delta
+    connection = session.connection()
+    for reaction_id, delta in deltas.items():
+        if not delta:
+            continue
+        connection.execute(
+            Reaction.__table__.update()
+            .where(Reaction.id == reaction_id)
+            .values(count=Reaction.count + delta)
+        )
+        reaction = session.identity_map.get(session.identity_key(Reaction, reaction_id))
+        if reaction is not None:
+            session.expire(reaction, ["count"])
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
@@ -11,6 +11,8 @@ from app.models.base import Timestamped
 
 
 class User(Timestamped, UserManager):
+    cache_enabled = True
+
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     password = Column(String, nullable=False)
@@ -47,28 +49,40 @@ class User(Timestamped, UserManager):
 
 class ActivityJournal(Timestamped, BaseManager):
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("user.id"))
+    user_id = Column(Integer, ForeignKey("user.id"), index=True)
     user = relationship("User", back_populates="journal")
 
     activities = relationship("Activity", back_populates="journal")
 
 
 class Activity(Timestamped, BaseManager):
+    __table_args__ = (
+        # Keyset pages of the activity feed of a user, newest first.
+        Index("ix_activity_actor_id_created_id", "actor_id", "created", "id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
 
-    journal_id = Column(Integer, ForeignKey("activityjournal.id"))
+    journal_id = Column(Integer, ForeignKey("activityjournal.id"), index=True)
     journal = relationship("ActivityJournal", back_populates="activities")
 
-    actor_id = Column(Integer, ForeignKey("user.id"))
+    actor_id = Column(Integer, ForeignKey("user.id"), index=True)
     actor = relationship("User", back_populates="activities")
 
     action = Column(String)
 
-    project_id = Column(Integer, ForeignKey("project.id"))
+    # Activities are written after the request, targets may be gone.
+    project_id = Column(
+        Integer, ForeignKey("project.id", ondelete="SET NULL"), index=True
+    )
     project = relationship("Project", back_populates="related_activities")
-    task_id = Column(Integer, ForeignKey("task.id"))
+    task_id = Column(
+        Integer, ForeignKey("task.id", ondelete="SET NULL"), index=True
+    )
     task = relationship("Task", back_populates="related_activities")
-    tag_id = Column(Integer, ForeignKey("tag.id"))
+    tag_id = Column(
+        Integer, ForeignKey("tag.id", ondelete="SET NULL"), index=True
+    )
     tag = relationship("Tag", back_populates="related_activities")
 
     @hybrid_property
@@ -102,7 +116,7 @@ class Message(Timestamped, BaseManager):
     read = Column(Boolean, default=False)
 
     channel = Column(String, nullable=True)
-    user_id = Column(Integer, ForeignKey("user.id"))
+    user_id = Column(Integer, ForeignKey("user.id"), index=True)
     user = relationship("User", back_populates="messages")
 
     body = Column(String, nullable=False)
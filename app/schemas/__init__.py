@@ -1,8 +1,15 @@
-from .project import Project, ProjectCreate, ProjectUpdate  # noqa
-from .reactions import Reaction, ReactionCreate  # noqa
+from .project import (  # noqa
+    Project,
+    ProjectAccess,
+    ProjectCreate,
+    ProjectSummary,
+    ProjectUpdate,
+)
+from .reactions import Reaction, ReactionCreate, ReactionSummary  # noqa
 from .tag_item import TagItem, TagItemCreate  # noqa
 from .tags import Tag, TagCreate, TagInDB, TagUpdate  # noqa
 from .tasks import TaskJSONSerializable  # noqa
-from .tasks import Task, TaskCreate, TaskReorder, TaskUpdate
+from .tasks import Task, TaskCreate, TaskReorder, TasksByDay, TaskUpdate
 from .token import Token, TokenData, TokenPayload  # noqa
 from .users import Activity, User, UserCreate, UserInDB, UserUpdate  # noqa
+from .sync import SyncChanges  # noqa
@@ -43,21 +43,60 @@ class Participant(BaseModel):
         orm_mode = True
 
 
+class ProjectSummary(BaseModel):
+    """Project with task counts, without nested objects."""
+
+    id: int
+    name: str
+    icon: str | None = None
+    accent_color: str | None = None
+    is_pinned: bool | None = False
+    is_favorite: bool | None = False
+    open: int = 0
+    done: int = 0
+    overdue: int = 0
+
+    class Config:
+        orm_mode = True
+
+
+def project_acl(owner_id: int, participant_ids) -> list:
+    acl_list = [
+        (Allow, f"user:{owner_id}", "view"),
+        (Allow, f"user:{owner_id}", "invite"),
+        (Allow, f"user:{owner_id}", "edit"),
+        (Allow, f"user:{owner_id}", "delete"),
+    ]
+    for participant_id in participant_ids:
+        acl_list.append((Allow, f"user:{participant_id}", "view"))
+        acl_list.append((Allow, f"user:{participant_id}", "edit"))
+
+    return acl_list
+
+
+class ProjectAccess(BaseModel):
+    """Fields of a project needed to resolve permissions."""
+
+    id: int
+    owner_id: int
+    participant_ids: list[int]
+
+    def __acl__(self):
+        return project_acl(self.owner_id, self.participant_ids)
+
+
 class Project(ProjectInDBBase):
     owner_id: int
     tasks: list[Task]
     sections: list[Section]
     participants: list[Participant]
 
+    class Config:
+        load_profile = (
+            *(f"tasks.{path}" for path in Task.__config__.load_profile),
+            *(f"sections.{path}" for path in Section.__config__.load_profile),
+            "participants",
+        )
+
     def __acl__(self):
-        acl_list = [
-            (Allow, f"user:{self.owner_id}", "view"),
-            (Allow, f"user:{self.owner_id}", "invite"),
-            (Allow, f"user:{self.owner_id}", "edit"),
-            (Allow, f"user:{self.owner_id}", "delete"),
-        ]
-        for p in self.participants:
-            acl_list.append((Allow, f"user:{p.id}", "view"))
-            acl_list.append((Allow, f"user:{p.id}", "edit"))
-
-        return acl_list
+        return project_acl(self.owner_id, [p.id for p in self.participants])
@@ -14,8 +14,19 @@ class ReactionCreate(ReactionBase):
     pass
 
 
+class ReactionSummary(ReactionBase):
+    """Reaction rendered with tasks, without the users."""
+
+    id: int
+    count: int
+
+    class Config:
+        orm_mode = True
+
+
 class ReactionInDB(ReactionBase):
     id: int
+    count: int
     created: datetime
     updated: datetime
     users: list[User]
@@ -25,7 +36,8 @@ class ReactionInDB(ReactionBase):
 
 
 class Reaction(ReactionInDB):
-    pass
+    class Config:
+        load_profile = ("users",)
 
 
 class ReactionUserCreate(BaseModel):
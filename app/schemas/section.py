@@ -25,6 +25,7 @@ class SectionInDBBase(SectionBase):
     id: int | None = None
     project_id: int
     order: int
+    rank: str | None = None
     created: datetime
     updated: datetime
 
@@ -34,3 +35,6 @@ class SectionInDBBase(SectionBase):
 
 class Section(SectionInDBBase):
     tasks: list[Task]
+
+    class Config:
+        load_profile = tuple(f"tasks.{path}" for path in Task.__config__.load_profile)
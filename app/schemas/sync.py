@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from .reactions import Reaction
+from .section import SectionInDBBase
+from .tag_item import TagItem
+from .tags import TagInDB
+from .tasks import TaskInDBBase
+
+
+class SyncTask(TaskInDBBase):
+    project_id: int | None = None
+    section_id: int | None = None
+    parent_task_id: int | None = None
+
+
+class Tombstone(BaseModel):
+    """`object_id` of a deleted `model` row, deleted at `created`."""
+
+    model: str
+    object_id: int
+    created: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class SyncChanges(BaseModel):
+    """Rows changed since the previous sync, tags and reactions of tasks
+    are sent separately as `tag_items` and `reactions`."""
+
+    cursor: str
+    tasks: list[SyncTask]
+    sections: list[SectionInDBBase]
+    tags: list[TagInDB]
+    tag_items: list[TagItem]
+    reactions: list[Reaction]
+    deleted: list[Tombstone]
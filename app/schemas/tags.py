@@ -57,3 +57,6 @@ class TagInDB(TagBase):
 
 class Tag(TagInDB):
     tasks: list[Task]
+
+    class Config:
+        load_profile = ("tasks",)
@@ -2,7 +2,7 @@ from datetime import date, datetime
 
 from pydantic import BaseModel
 
-from .reactions import Reaction
+from .reactions import ReactionSummary
 from .tags import TagInDB
 
 
@@ -34,6 +34,7 @@ class TaskInDBBase(TaskBase):
     id: int | None = None
     is_done: bool
     order: int
+    rank: str | None = None
     created: datetime
     updated: datetime
 
@@ -54,7 +55,15 @@ class Task(TaskInDBBase):
     tags: list[TagInDB] | None = None
     project_id: int | None = None
     section_id: int | None = None
-    reactions: list[Reaction]
+    reactions: list[ReactionSummary]
+
+    class Config:
+        load_profile = ("tags", "reactions")
+
+
+class TasksByDay(BaseModel):
+    date: date
+    tasks: list[Task]
 
 
 class TaskJSONSerializable(BaseModel):
@@ -54,3 +54,4 @@ class Activity(BaseModel):
 
     class Config:
         orm_mode = True
+        load_profile = ("actor",)
@@ -0,0 +1,260 @@
+"""Activity journal written off the request path.
+
+Managers describe changes with `record(session, activity)`. Events wait in
+the session until it commits, so rolled back changes aren't journaled.
+While the application runs `activity_queue` writes committed events every
+ACTIVITY_FLUSH_INTERVAL_MS, or as soon as ACTIVITY_BATCH_SIZE of them are
+waiting, with a single multi-row INSERT in a worker thread. The queue holds
+at most ACTIVITY_QUEUE_SIZE events, the rest are dropped and counted, so a
+slow database never holds requests. When the queue isn't started (scripts,
+consumers) events are written as soon as they are committed.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Set
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING_ACTIVITIES = "pending_activities"
+# Every row of a multi-row INSERT has to have the same columns.
+EVENT_FIELDS = ("actor_id", "action", "project_id", "task_id", "tag_id", "created")
+
+
+class ActivityStats:
+    __slots__ = ("enqueued", "written", "dropped", "flushes", "errors")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "errors": self.errors,
+        }
+
+
+class ActivityQueue:
+    """Bounded in-process queue of activity events, flushed in batches by
+    a task of the event loop it was started in. Events can be put from any
+    thread."""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        interval_ms: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> None:
+        self.batch_size = batch_size or settings.ACTIVITY_BATCH_SIZE
+        self.interval = (interval_ms or settings.ACTIVITY_FLUSH_INTERVAL_MS) / 1000
+        self.max_size = max_size or settings.ACTIVITY_QUEUE_SIZE
+        self.events: Deque[dict] = deque()
+        self.stats = ActivityStats()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def depth(self) -> int:
+        return len(self.events)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def put(self, events: List[dict]) -> None:
+        with self._lock:
+            accepted = events[: max(self.max_size - len(self.events), 0)]
+            self.events.extend(accepted)
+            self.stats.enqueued += len(accepted)
+            self.stats.dropped += len(events) - len(accepted)
+        if len(self.events) >= self.batch_size:
+            self._wake()
+
+    def _wake(self) -> None:
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def submit(self, events: List[dict]) -> None:
+        """Queues committed events while the flushing task runs, writes them
+        right away otherwise."""
+        if self.running:
+            self.put(events)
+            return
+        self.stats.enqueued += len(events)
+        try:
+            written = self.write(events)
+        except Exception:
+            self._failed(events)
+        else:
+            self._written(events, written)
+
+    def _written(self, batch: List[dict], written: int) -> None:
+        self.stats.written += written
+        self.stats.dropped += len(batch) - written
+        self.stats.flushes += 1
+
+    def _failed(self, batch: List[dict]) -> None:
+        logger.exception("%d activities were not written.", len(batch))
+        self.stats.errors += 1
+        self.stats.dropped += len(batch)
+
+    def _take(self) -> List[dict]:
+        with self._lock:
+            count = min(self.batch_size, len(self.events))
+            return [self.events.popleft() for _ in range(count)]
+
+    @staticmethod
+    def write(events: List[dict]) -> int:
+        """Inserts `events` in one transaction and returns how many were
+        written. Targets deleted since the event are written as NULL and
+        events of deleted users are skipped, the rest of the rows are
+        locked (FOR KEY SHARE) until the INSERT. Missing journals of actors
+        are created."""
+        from app.db.session import engine
+        from app.models import Activity, ActivityJournal, Project, Tag, Task, User
+
+        with engine.begin() as connection:
+
+            def existing(model, key: str) -> Set[int]:
+                ids = {e[key] for e in events if e[key] is not None}
+                if not ids:
+                    return set()
+                return set(
+                    connection.execute(
+                        select(model.id)
+                        .where(model.id.in_(ids))
+                        .with_for_update(read=True, key_share=True)
+                    ).scalars()
+                )
+
+            actors = existing(User, "actor_id")
+            targets = {
+                "project_id": existing(Project, "project_id"),
+                "task_id": existing(Task, "task_id"),
+                "tag_id": existing(Tag, "tag_id"),
+            }
+            rows = [
+                {
+                    **e,
+                    **{k: e[k] if e[k] in ids else None for k, ids in targets.items()},
+                }
+                for e in events
+                if e["actor_id"] in actors
+            ]
+            if not rows:
+                return 0
+
+            def journals() -> Dict[int, int]:
+                return dict(
+                    connection.execute(
+                        select(ActivityJournal.user_id, ActivityJournal.id).where(
+                            ActivityJournal.user_id.in_(actors)
+                        )
+                    ).all()
+                )
+
+            journal_ids = journals()
+            missing = actors - journal_ids.keys()
+            if missing:
+                connection.execute(
+                    insert(ActivityJournal.__table__),
+                    [{"user_id": user_id} for user_id in missing],
+                )
+                journal_ids = journals()
+            connection.execute(
+                insert(Activity.__table__).values(
+                    [{**r, "journal_id": journal_ids[r["actor_id"]]} for r in rows]
+                )
+            )
+            return len(rows)
+
+    async def flush(self) -> None:
+        """Writes every queued event, a batch per INSERT."""
+        loop = asyncio.get_running_loop()
+        while self.events:
+            batch = self._take()
+            try:
+                written = await loop.run_in_executor(None, self.write, batch)
+            except Exception:
+                self._failed(batch)
+            else:
+                self._written(batch, written)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the flushing task and writes events that are still queued."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._loop = None
+        await self.flush()
+
+
+activity_queue = ActivityQueue()
+
+
+def record(session: Session, activity: dict) -> None:
+    activity = {
+        **dict.fromkeys(EVENT_FIELDS),
+        "created": datetime.now(timezone.utc),
+        **{k: v for k, v in activity.items() if v is not None},
+    }
+    session.info.setdefault(PENDING_ACTIVITIES, []).append(activity)
+
+
+@event.listens_for(Session, "after_commit")
+def enqueue_activities(session: Session) -> None:
+    pending = session.info.pop(PENDING_ACTIVITIES, None)
+    if pending:
+        activity_queue.submit(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_activities(session: Session) -> None:
+    session.info.pop(PENDING_ACTIVITIES, None)
@@ -0,0 +1,13 @@
+from fastapi_sqlalchemy import db
+
+
+def rebalance(model, container_model, container_id: int) -> None:
+    """Rewrites too long rank keys of a container outside of the request."""
+    with db():
+        model.rebalance(container_model, container_id)
+
+
+def schedule_rebalance(background_tasks, instance) -> None:
+    model = type(instance)
+    if model.needs_rebalance(instance):
+        background_tasks.add_task(rebalance, model, *model.container_of(instance))
@@ -0,0 +1,227 @@
+"""Runs EXPLAIN on query shapes generated by managers and flags sequential scans.
+
+poetry run index-advisor --seed 5000
+
+Shapes are `get(id=...)`, `filter(<foreign key>=...)` and loading of every
+collection relationship with its order_by. With `--seed` the database is
+filled with a synthetic dataset and analyzed first, so that the planner
+doesn't prefer sequential scans of tiny tables. All changes are rolled back.
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+from typing import Iterator, List, NamedTuple, Tuple
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.orm.interfaces import MANYTOMANY, ONETOMANY
+
+from app.db.base import Base
+from app.db.session import SessionLocal
+from app.models import Project, Tag, Task, User
+from app.models.tasks import Participant, Reaction, Section, TagItem, UserReaction
+from app.models.user import Activity, ActivityJournal
+
+
+class Report(NamedTuple):
+    shape: str
+    plan: str
+    sequential: bool
+
+
+def query_shapes(session: Session) -> Iterator[Tuple[str, Query]]:
+    for mapper in sorted(Base.registry.mappers, key=lambda m: m.class_.__name__):
+        model = mapper.class_
+        name = model.__name__
+
+        yield f"{name}.get(id)", session.query(model).filter(model.id == 1)
+
+        for column in mapper.columns:
+            if column.foreign_keys:
+                key = mapper.get_property_by_column(column).key
+                # Shape of BaseManager.filter with default ordering.
+                yield f"{name}.filter({key})", (
+                    session.query(model)
+                    .filter(column == 1)
+                    .order_by(model.created, model.updated.desc())
+                    .limit(100)
+                )
+
+        for relationship in mapper.relationships:
+            if relationship.direction not in (ONETOMANY, MANYTOMANY):
+                continue
+            target = relationship.mapper.class_
+            query = session.query(target)
+            if relationship.secondary is not None:
+                query = query.join(relationship.secondary, relationship.secondaryjoin)
+            remote = relationship.synchronize_pairs[0][1]
+            query = query.filter(remote == 1)
+            if relationship.order_by:
+                query = query.order_by(*relationship.order_by)
+            yield f"{name}.{relationship.key}", query
+
+
+def explain(session: Session, query: Query) -> str:
+    dialect = session.bind.dialect
+    sql = str(
+        query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    )
+    prefix = "EXPLAIN QUERY PLAN " if dialect.name == "sqlite" else "EXPLAIN "
+    return "\n".join(str(row[-1]) for row in session.execute(text(prefix + sql)))
+
+
+def is_sequential(plan: str, dialect: str) -> bool:
+    if dialect == "sqlite":
+        return any(
+            line.startswith("SCAN ") and "USING" not in line
+            for line in plan.splitlines()
+        )
+    return "Seq Scan" in plan
+
+
+def _next_id(session: Session, model) -> int:
+    return session.execute(select(func.coalesce(func.max(model.id), 0))).scalar() + 1
+
+
+def _insert(session: Session, model, rows: List[dict]) -> range:
+    start = _next_id(session, model)
+    for offset, row in enumerate(rows):
+        row["id"] = start + offset
+    if rows:
+        session.execute(model.__table__.insert(), rows)
+    return range(start, start + len(rows))
+
+
+def seed(session: Session, size: int) -> None:
+    """Inserts about `size` tasks with related rows and refreshes statistics."""
+    users = _insert(
+        session,
+        User,
+        [
+            {"email": f"index-advisor-{i}@example.com", "password": "!"}
+            for i in range(max(size // 100, 2))
+        ],
+    )
+    journals = _insert(session, ActivityJournal, [{"user_id": u} for u in users])
+    projects = _insert(
+        session,
+        Project,
+        [
+            {"name": f"project {i}", "owner_id": users[i % len(users)]}
+            for i in range(max(size // 20, 2))
+        ],
+    )
+    _insert(
+        session,
+        Participant,
+        [
+            {"user_id": users[(i + 1) % len(users)], "project_id": p}
+            for i, p in enumerate(projects)
+        ],
+    )
+    sections = _insert(
+        session,
+        Section,
+        [
+            {"name": "section", "order": i, "project_id": p}
+            for i, p in enumerate(projects)
+        ],
+    )
+    tasks = _insert(
+        session,
+        Task,
+        [
+            {
+                "name": f"task {i}",
+                "order": i,
+                "is_done": i % 3 == 0,
+                "deadline": date.today() + timedelta(days=i % 60),
+                "project_id": None if i % 4 == 0 else projects[i % len(projects)],
+                "section_id": sections[i % len(sections)] if i % 4 == 0 else None,
+            }
+            for i in range(size)
+        ],
+    )
+    session.execute(
+        update(Task.__table__)
+        .where(Task.id.in_(tasks[1::10]))
+        .values(parent_task_id=tasks[0])
+    )
+    tags = _insert(
+        session, Tag, [{"name": f"tag {i}", "owner_id": u} for i, u in enumerate(users)]
+    )
+    _insert(
+        session,
+        TagItem,
+        [
+            {"tag_id": tags[i % len(tags)], "task_id": t}
+            for i, t in enumerate(tasks[::2])
+        ],
+    )
+    reactions = _insert(
+        session, Reaction, [{"emoji": "+1", "task_id": t} for t in tasks[::5]]
+    )
+    _insert(
+        session,
+        UserReaction,
+        [
+            {"user_id": users[i % len(users)], "reaction_id": r}
+            for i, r in enumerate(reactions)
+        ],
+    )
+    _insert(
+        session,
+        Activity,
+        [
+            {
+                "journal_id": journals[i % len(journals)],
+                "actor_id": users[i % len(users)],
+                "action": "created",
+                "task_id": t,
+                "project_id": projects[i % len(projects)] if i % 2 else None,
+                "tag_id": tags[i % len(tags)] if i % 7 == 0 else None,
+            }
+            for i, t in enumerate(tasks)
+        ],
+    )
+    session.execute(text("ANALYZE"))
+
+
+def advise(session: Session, size: int = 0) -> List[Report]:
+    if size:
+        seed(session, size)
+    dialect = session.bind.dialect.name
+    reports = []
+    for shape, query in query_shapes(session):
+        plan = explain(session, query)
+        reports.append(Report(shape, plan, is_sequential(plan, dialect)))
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--seed", type=int, default=0, help="number of synthetic tasks to insert"
+    )
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        reports = advise(session, args.seed)
+    finally:
+        session.rollback()
+        session.close()
+
+    flagged = [report for report in reports if report.sequential]
+    for report in reports:
+        if report.sequential or args.verbose:
+            status = "SEQ" if report.sequential else "ok"
+            print(f"{status:4} {report.shape}")
+            print("     " + report.plan.replace("\n", "\n     "))
+    print(f"{len(flagged)} of {len(reports)} query shapes use sequential scans.")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import pytest
+from pydantic import BaseModel
+
+from app import schemas
+from app.api.router import CrudRouter
+from app.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from app.db.async_session import async_db
+from app.managers.async_base import AsyncBaseManager
+from app.models import Task, User
+from app.models.user import Message
+
+
+class SomeClass:
+    pass
+
+
+@pytest.fixture
+def async_manager():
+    return AsyncBaseManager.for_model(User)
+
+
+@pytest.fixture
+async def async_session(db):
+    async with async_db():
+        yield async_db.session
+
+
+def test_for_model_requires_base_manager():
+    with pytest.raises(ImproperlyConfigured):
+        AsyncBaseManager.for_model(SomeClass)
+
+
+async def test_manager_get(async_session, async_manager, user):
+    instance = await async_manager.get(id=user.id)
+
+    assert instance.id == user.id
+    assert instance.email == user.email
+
+
+async def test_manager_get_does_not_exist(async_session, async_manager):
+    with pytest.raises(ObjectDoesNotExist):
+        await async_manager.get(id=123243444433443)
+
+
+async def test_use_unsuported_fields(async_session, async_manager):
+    with pytest.raises(ValueError):
+        await async_manager.get(wrong_field_name="")
+
+
+async def test_filter_and_all(async_session, async_manager, user):
+    filtered = await async_manager.filter(email=user.email)
+
+    assert [u.id for u in filtered] == [user.id]
+    assert user.id in [u.id for u in await async_manager.all(limit=1000)]
+
+
+async def test_create_update_delete(async_session, user):
+    manager = AsyncBaseManager.for_model(Message)
+    instance = await manager.create(body="async", user_id=user.id)
+
+    assert instance.created is not None
+    assert await manager.exists(body="async")
+
+    updated = await manager.update(instance.id, read=True)
+
+    assert updated.read
+
+    await manager.delete(updated)
+
+    assert not await manager.exists(body="async")
+
+
+async def test_writes_bypassing_model_logic_are_refused(async_session, user):
+    users = AsyncBaseManager.for_model(User)
+    tasks = AsyncBaseManager.for_model(Task)
+
+    with pytest.raises(ImproperlyConfigured):
+        await users.create(email="async@test.py", password="!!!")
+    with pytest.raises(ImproperlyConfigured):
+        await tasks.create(name="Bypassed")
+    with pytest.raises(ImproperlyConfigured):
+        await tasks.update(1, name="Bypassed")
+    with pytest.raises(ImproperlyConfigured):
+        await tasks.delete(Task(name="Bypassed"))
+
+
+def test_router_accepts_async_manager():
+    manager = AsyncBaseManager.for_model(Task)
+    router = CrudRouter(
+        model=Task,
+        get_schema=schemas.Task,
+        create_schema=schemas.TaskCreate,
+        prefix="/test",
+        manager=manager,
+    )
+
+    assert router.manager is manager
+    assert len(router.routes) == 5
+
+
+def test_router_rejects_manager_of_other_model():
+    with pytest.raises(AttributeError):
+        CrudRouter(
+            model=Task,
+            get_schema=BaseModel,
+            create_schema=BaseModel,
+            prefix="/test",
+            manager=AsyncBaseManager.for_model(User),
+        )
@@ -0,0 +1,160 @@
+from datetime import datetime
+
+import orjson
+import pytest
+from fastapi_sqlalchemy import db as DB
+
+from app.core.profiling import watch_queries
+from app.db.cache import ALL, LocalCache, TieredCache, cache, load, store
+from app.models import Project, Section
+
+
+@pytest.fixture
+def empty_cache():
+    cache.clear()
+    cache.stats.reset()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def project(db, user):
+    project = Project.create(name="cached", owner=user)
+    yield project
+    DB.session.expire_all()
+    Project.delete(Project.get(id=project.id))
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(maxsize=2, ttl=60)
+    local.set(("a", 1), 1)
+    local.set(("a", 2), 2)
+    local.get(("a", 1))
+    local.set(("a", 3), 3)
+
+    assert local.get(("a", 2)) is None
+    assert local.get(("a", 1)) == 1
+    assert local.get(("a", 3)) == 3
+
+
+def test_local_cache_expires_entries():
+    local = LocalCache(maxsize=2, ttl=-1)
+    local.set(("a", 1), 1)
+
+    assert local.get(("a", 1)) is None
+    assert len(local) == 0
+
+
+def test_tiered_cache_invalidation_and_stats():
+    tiered = TieredCache(maxsize=10, ttl=60)
+    tiered.set("project", 1, {"id": 1})
+    tiered.set("project", 2, {"id": 2})
+    tiered.set("section", 1, {"id": 1})
+
+    assert tiered.get("project", 1) == {"id": 1}
+    tiered.invalidate({("project", 1)})
+    assert tiered.get("project", 1) is None
+
+    tiered.invalidate({("project", ALL)})
+    assert tiered.get("project", 2) is None
+    assert tiered.get("section", 1) == {"id": 1}
+
+    stats = tiered.stats.as_dict()
+    assert stats["local_hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_pubsub_message_invalidates_local_tier():
+    tiered = TieredCache(maxsize=10, ttl=60)
+    tiered.set("user", 1, {"id": 1})
+    tiered.set("section", 1, {"id": 1})
+
+    tiered._on_message({"data": b"user:1"})
+    tiered._on_message({"data": b"section:*"})
+
+    assert tiered.get("user", 1) is None
+    assert tiered.get("section", 1) is None
+
+
+def test_get_by_id_is_served_from_cache(empty_cache, project):
+    id = project.id
+    DB.session.expunge_all()
+    Project.get(id=id)
+
+    DB.session.expunge_all()
+    with watch_queries() as queries:
+        cached = Project.get(id=id)
+        assert cached.name == "cached"
+
+    assert queries.count == 0
+    assert empty_cache.stats.local_hits == 1
+    # Relationships of cached rows are lazy loaded as usual.
+    assert cached.owner.email == "test3@test.py"
+
+
+def test_update_invalidates_cache(empty_cache, project):
+    DB.session.expunge_all()
+    Project.get(id=project.id)
+    assert empty_cache.local.get(("project", project.id)) is not None
+
+    Project.update(project.id, name="renamed")
+    assert empty_cache.local.get(("project", project.id)) is None
+
+    DB.session.expunge_all()
+    assert Project.get(id=project.id).name == "renamed"
+
+
+def test_bulk_update_invalidates_model(empty_cache, project):
+    section = Section.create(name="cached", order=0, project_id=project.id)
+    DB.session.expunge(section)
+    section = Section.get(id=section.id)
+    assert empty_cache.local.get(("section", section.id)) is not None
+
+    Section.shift_order(Project, project.id, 0, 1)
+    Section.refresh(section)
+
+    assert empty_cache.local.get(("section", section.id)) is None
+    Section.delete(section)
+
+
+def test_cache_metrics_require_superuser(auth_client):
+    assert auth_client.get("metrics/cache").status_code == 400
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+def test_passwords_are_not_cached(empty_cache, user):
+    assert user.password
+    store(DB.session, user)
+
+    snapshot = empty_cache.local.get(("user", user.id))
+    assert snapshot["email"] == user.email
+    assert "password" not in snapshot
+
+
+def test_remote_snapshots_are_json(db, project):
+    tiered = TieredCache(maxsize=10, ttl=60)
+    tiered.remote = FakeRedis()
+    project_id = project.id
+    store(DB.session, project, tier=tiered)
+    tiered.local.clear()
+
+    payload = next(iter(tiered.remote.values.values()))
+    assert orjson.loads(payload)["name"] == "cached"
+
+    DB.session.expunge(project)
+    instance = load(DB.session, Project, project_id, tier=tiered)
+
+    assert tiered.stats.remote_hits == 1
+    assert isinstance(instance.created, datetime)
+    assert instance.created == Project.get(id=project_id).created
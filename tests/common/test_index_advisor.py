@@ -0,0 +1,26 @@
+import pytest
+
+from app.db.session import SessionLocal
+from scripts.index_advisor import advise, is_sequential
+
+
+@pytest.fixture
+def reports():
+    session = SessionLocal()
+    try:
+        yield {report.shape: report for report in advise(session, size=300)}
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_is_sequential():
+    assert is_sequential("Seq Scan on task  (cost=0.00..1.01 rows=1 width=4)", "postgresql")
+    assert not is_sequential("Index Scan using ix_task_project_id", "postgresql")
+    assert is_sequential("SCAN task", "sqlite")
+    assert not is_sequential("SEARCH task USING INDEX ix_task_project_id (project_id=?)", "sqlite")
+
+
+def test_manager_query_shapes_use_indexes(reports):
+    assert {"Project.tasks", "Section.tasks", "Task.filter(project_id)"} <= reports.keys()
+    assert [shape for shape, report in reports.items() if report.sequential] == []
@@ -0,0 +1,90 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.managers.lookups import parse_query_filters, split_lookup
+from app.models import Project, Task, User
+
+
+@pytest.fixture
+def users(db):
+    users = [
+        User.create(email=f"lookup{i}@test.py", password="!!!", first_name=f"Look_{i}")
+        for i in range(3)
+    ]
+    yield users
+    for user in users:
+        User.delete(user)
+
+
+def test_split_lookup():
+    assert split_lookup("deadline__gte") == ("deadline", "gte")
+    assert split_lookup("deadline") == ("deadline", "exact")
+    assert split_lookup("tasks_goal_per_day") == ("tasks_goal_per_day", "exact")
+    assert split_lookup("name__unknown") == ("name__unknown", "exact")
+
+
+def test_comparison_lookups(users):
+    ids = [u.id for u in users]
+
+    assert [u.id for u in User.filter(id__in=ids, order_by="id")] == ids
+    assert [u.id for u in User.filter(id__in=ids, id__gt=ids[0], order_by="id")] == ids[1:]
+    assert [u.id for u in User.filter(id__in=ids, id__lte=ids[1], order_by="id")] == ids[:2]
+    assert [u.id for u in User.filter(id__in=ids, id__ne=ids[1], order_by="id")] == [
+        ids[0],
+        ids[2],
+    ]
+
+
+def test_string_lookups(users):
+    assert {u.id for u in User.filter(email__icontains="LOOKUP")} == {u.id for u in users}
+    assert [u.id for u in User.filter(email__startswith="lookup1")] == [users[1].id]
+    # LIKE wildcards are escaped.
+    assert User.filter(first_name__contains="k%") == []
+    assert [u.id for u in User.filter(first_name__contains="k_1")] == [users[1].id]
+
+
+def test_isnull_lookup(users):
+    ids = [u.id for u in users]
+
+    assert len(User.filter(id__in=ids, last_login__isnull=True)) == 3
+    assert User.filter(id__in=ids, last_login__isnull=False) == []
+
+
+def test_in_lookup_accepts_select(db, user):
+    project = Project.create(name="lookup", owner=user)
+    task = Task.create(name="lookup", project_id=project.id)
+    owned = select(Project.id).where(Project.owner_id == user.id)
+    assert [t.id for t in Task.filter(project_id__in=owned, name="lookup")] == [task.id]
+    Task.delete(task)
+    Project.delete(project)
+
+
+def test_invalid_lookups(db):
+    with pytest.raises(ValueError):
+        User.filter(unknown__gte=1)
+    with pytest.raises(ValueError):
+        Task.filter(project__gte=1)
+    with pytest.raises(ValueError):
+        Project.filter(tasks__isnull=True)
+
+
+def test_parse_query_filters():
+    params = {
+        "deadline__gte": "2022-01-02",
+        "project_id__in": "1,2",
+        "is_done": "false",
+        "deadline__isnull": "true",
+        "name": "ignored",
+    }
+    allowed = ("deadline__gte", "project_id__in", "is_done", "deadline__isnull")
+
+    assert parse_query_filters(Task, params, allowed) == {
+        "deadline__gte": date(2022, 1, 2),
+        "project_id__in": [1, 2],
+        "is_done": False,
+        "deadline__isnull": True,
+    }
+    with pytest.raises(ValueError):
+        parse_query_filters(Task, {"project_id__in": "1,x"}, allowed)
@@ -0,0 +1,65 @@
+import pytest
+
+from app.core.exceptions import InvalidCursor
+from app.managers.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def users(manager):
+    users = [
+        manager.create(
+            email=f"page{i}@test.py", password="!!!", first_name=f"{i % 2}", last_name="t"
+        )
+        for i in range(5)
+    ]
+    yield users
+    for user in users:
+        manager.delete(user)
+
+
+def collect(manager, order_by, desc, limit=2, **fields):
+    items, cursor = manager.paginate(limit=limit, order_by=order_by, desc=desc, **fields)
+    pages = [items]
+    while cursor:
+        items, cursor = manager.paginate(
+            limit=limit, order_by=order_by, desc=desc, cursor=cursor, **fields
+        )
+        pages.append(items)
+    return pages
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor("value", 1)) == ["value", 1]
+
+
+def test_malformed_cursor():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not a cursor")
+
+
+@pytest.mark.parametrize("desc", [False, True])
+def test_paginate_visits_every_row_once(manager, users, desc):
+    pages = collect(manager, "email", desc, last_name="t")
+    emails = [u.email for page in pages for u in page]
+
+    assert emails == sorted((u.email for u in users), reverse=desc)
+    assert all(len(page) <= 2 for page in pages)
+
+
+def test_paginate_with_duplicated_values(manager, users):
+    pages = collect(manager, "first_name", False, last_name="t")
+    ids = [u.id for page in pages for u in page]
+
+    assert sorted(ids) == sorted(u.id for u in users)
+    assert len(set(ids)) == len(ids)
+
+
+def test_last_page_has_no_cursor(manager, users):
+    _, cursor = manager.paginate(limit=10, last_name="t")
+
+    assert cursor is None
+
+
+def test_cursor_has_to_match_ordering(manager, users):
+    with pytest.raises(InvalidCursor):
+        manager.paginate(order_by="created", cursor=encode_cursor("not a date", 1))
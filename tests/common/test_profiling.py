@@ -0,0 +1,48 @@
+import logging
+
+from app.core.profiling import QueryStats, collect_queries, report
+from app.models import User
+
+
+def test_collect_queries(db, user):
+    email = user.email
+    with collect_queries() as stats:
+        User.filter(email=email)
+        User.filter(email=email)
+
+    assert stats.count == 2
+    assert stats.duration > 0
+    assert len(stats.shapes) == 1
+    assert stats.server_timing().endswith('desc="2 queries"')
+
+
+def test_repeated_statements_are_reported(caplog):
+    stats = QueryStats()
+    for _ in range(5):
+        stats.record("SELECT * FROM task WHERE id = ?", 0.001)
+    stats.record("SELECT * FROM project", 0.001)
+
+    assert stats.repeated(5) == {"SELECT * FROM task WHERE id = ?": 5}
+    with caplog.at_level(logging.WARNING):
+        report(stats, "GET", "/tasks/")
+    assert "possible N+1" in caplog.text
+
+
+def test_requests_over_budget_are_logged(caplog, mocker):
+    mocker.patch("app.core.profiling.settings.SQL_QUERY_BUDGET", 1)
+    stats = QueryStats()
+    stats.record("SELECT 1", 0.001)
+    stats.record("SELECT 2", 0.001)
+
+    with caplog.at_level(logging.WARNING):
+        report(stats, "GET", "/projects/")
+    assert "GET /projects/ executed 2 queries" in caplog.text
+
+
+def test_server_timing_header(client, assert_max_queries):
+    # ETag validator and users
+    with assert_max_queries(2):
+        response = client.get("users/")
+
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert response.headers["Server-Timing"].endswith('desc="2 queries"')
@@ -0,0 +1,32 @@
+import pytest
+
+from app.core.ranking import key_between, spread
+
+
+def test_key_between_bounds():
+    assert key_between("a", "c") == "b"
+    assert "a" < key_between("a", "b") < "b"
+    assert key_between(None, "1") < "1"
+    assert key_between("z", None) > "z"
+
+
+def test_key_between_wrong_order():
+    with pytest.raises(ValueError):
+        key_between("b", "a")
+
+
+def test_repeated_inserts_at_top_stay_ordered():
+    keys = [key_between()]
+    for _ in range(100):
+        keys.insert(0, key_between(None, keys[0]))
+
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_spread():
+    keys = spread(1000)
+
+    assert keys == sorted(keys)
+    assert len(set(keys)) == 1000
+    assert max(len(k) for k in keys) == 2
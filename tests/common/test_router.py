@@ -5,6 +5,7 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 
 from app import schemas
+from app.api.api_v1.endpoints.auth.users import router as users_router
 from app.api.router import CrudRouter
 from app.models import Task
 
@@ -112,3 +113,27 @@ def test_delete_route(router):
     assert route.summary == "Delete task"
     assert route.path == "/test/{id}"
     assert route.methods == {"DELETE"}
+
+
+def test_list_route_is_built_once(client, user):
+    routes = list(users_router.routes)
+    for _ in range(3):
+        assert client.get("users/").status_code == 200
+
+    assert users_router.routes == routes
+
+
+def test_list_route_validates_order_by(client):
+    response = client.get("users/", params={"order_by": "password_hash"})
+
+    assert response.status_code == 400
+
+
+def test_list_route_desc(client, user, another_user):
+    ids = [u["id"] for u in client.get("users/", params={"order_by": "id"}).json()]
+    desc_ids = [
+        u["id"] for u in client.get("users/", params={"order_by": "id", "desc": True}).json()
+    ]
+
+    assert ids == sorted(ids)
+    assert desc_ids == sorted(ids, reverse=True)
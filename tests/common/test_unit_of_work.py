@@ -0,0 +1,81 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from fastapi_sqlalchemy import DBSessionMiddleware
+from fastapi_sqlalchemy import db as DB
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.unit_of_work import UnitOfWorkMiddleware, in_unit_of_work, unit_of_work
+from app.models import Project
+
+
+@pytest.fixture
+def commits(db):
+    calls = []
+
+    def listener(session):
+        calls.append(session)
+
+    event.listen(DB.session, "after_commit", listener)
+    yield calls
+    event.remove(DB.session, "after_commit", listener)
+
+
+def test_managers_commit_outside_of_unit_of_work(commits, user):
+    project = Project.create(name="uow", owner=user)
+    Project.update(project.id, name="uow 2")
+    Project.delete(project)
+
+    assert not in_unit_of_work()
+    assert len(commits) == 3
+
+
+def test_unit_of_work_commits_once(commits, user):
+    with unit_of_work():
+        assert in_unit_of_work()
+        project = Project.create(name="uow", owner=user)
+        Project.update(project.id, name="uow 2")
+        assert commits == []
+        # Generated columns are fetched on flush.
+        assert project.id is not None
+        assert project.created is not None
+
+    assert len(commits) == 1
+    assert not in_unit_of_work()
+    assert Project.get(id=project.id).name == "uow 2"
+    Project.delete(project)
+
+
+def test_unit_of_work_rolls_back_on_error(commits, user):
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            Project.create(name="uow rollback", owner=user)
+            raise RuntimeError
+
+    assert commits == []
+    assert not Project.exists(name="uow rollback")
+
+
+def test_request_is_committed_before_response(auth_client, user):
+    response = auth_client.post("projects/", json={"name": "uow request"})
+    assert response.status_code == 201
+
+    DB.session.expire_all()
+    project = Project.get(id=response.json()["id"])
+    assert project.owner_id == user.id
+    Project.delete(project)
+
+
+def test_failed_request_is_rolled_back(user):
+    app = FastAPI()
+    app.add_middleware(UnitOfWorkMiddleware)
+    app.add_middleware(DBSessionMiddleware, db_url=settings.SQLALCHEMY_DATABASE_URI)
+
+    @app.post("/")
+    def failing():
+        Project.create(name="uow failed request", owner_id=user.id)
+        raise HTTPException(status_code=400)
+
+    assert TestClient(app).post("/").status_code == 400
+    assert not Project.exists(name="uow failed request")
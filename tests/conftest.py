@@ -1,9 +1,11 @@
+from contextlib import contextmanager
 from datetime import timedelta
 
 import pytest
 from fastapi.testclient import TestClient
 from fastapi_sqlalchemy import db as DB
 
+from app.core.profiling import watch_queries
 from app.db.base import Base
 from app.db.session import engine
 from app.main import app
@@ -63,6 +65,11 @@ def auth_client(db, user):
     return JWTAuthTestClient(app, user=user, db=db)
 
 
+@pytest.fixture()
+def another_auth_client(db, another_user):
+    return JWTAuthTestClient(app, user=another_user, db=db)
+
+
 @pytest.fixture
 def token(db, user):
     access_token_expires = timedelta(minutes=99999)
@@ -77,3 +84,18 @@ def another_token(db, another_user):
     return User.generate_access_token(
         subject=another_user.id, expires_delta=access_token_expires
     )
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Fails when more than `n` SQL statements are executed inside of the context,
+    requests made with test clients are counted as well."""
+
+    @contextmanager
+    def checker(n: int):
+        with watch_queries() as stats:
+            yield stats
+        statements = "\n".join(stats.statements)
+        assert stats.count <= n, f"{stats.count} queries executed, expected at most {n}:\n{statements}"
+
+    return checker
@@ -1,6 +1,7 @@
 import pytest
 
 from app.models import Project, Tag, TagItem, Task
+from app.models.tasks import Reaction, Section, UserReaction
 
 
 @pytest.fixture
@@ -24,3 +25,28 @@ def tag(db, task, user):
     yield tag
     Tag.delete(tag)
     TagItem.delete(tag_item)
+
+
+@pytest.fixture
+def filled_project(db, user):
+    created = []
+
+    def fill(size):
+        project = Project.create(name=f"Project {size}", owner=user)
+        section = Section.create(name="Section", project_id=project.id)
+        tag = Tag.create(name="Tag", owner=user)
+        created.extend([tag, section, project])
+        for i in range(size):
+            for fields in ({"project_id": project.id}, {"section_id": section.id}):
+                task = Task.create(name=f"Task {i}", **fields)
+                tag_item = TagItem.create(tag_id=tag.id, task_id=task.id)
+                reaction = Reaction.create(emoji="+1", task_id=task.id)
+                user_reaction = UserReaction.create(
+                    user_id=user.id, reaction_id=reaction.id
+                )
+                created[:0] = [user_reaction, reaction, tag_item, task]
+        return project
+
+    yield fill
+    for instance in created:
+        type(instance).delete(instance)
@@ -1,10 +1,17 @@
+import asyncio
+from datetime import datetime
+
 import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.db.unit_of_work import unit_of_work
+from app.models import Activity, ActivityJournal, Project, Task
+from app.tasks.activity import EVENT_FIELDS, ActivityQueue, activity_queue
 
-from app.models import Project
+EVENT = {**dict.fromkeys(EVENT_FIELDS), "action": "event", "created": datetime.now()}
 
 
-@pytest.mark.xfail
-def test_generating_activities(user, db):
+def test_generating_activities(user, db, activities):
     project = Project.create(
         name="projjj",
         owner=user,
@@ -13,3 +20,136 @@ def test_generating_activities(user, db):
     assert len(project.related_activities) == 1
 
     Project.delete(project)
+
+
+@pytest.fixture
+def journal_queue():
+    activity_queue.events.clear()
+    activity_queue.stats.reset()
+    yield activity_queue
+    activity_queue.events.clear()
+
+
+@pytest.fixture
+def activities(db):
+    db.session.query(Activity).delete()
+    db.session.commit()
+    yield
+    db.session.query(Activity).delete()
+    db.session.commit()
+
+
+def journaled():
+    return [(a.action, a.project_id) for a in Activity.filter(order_by="id")]
+
+
+def test_changes_are_written_when_queue_is_stopped(db, user, journal_queue, activities):
+    project = Project.create(name="Journaled", owner=user)
+    Project.update(project.id, name="Renamed")
+
+    assert journaled() == [("created", project.id), ("updated", project.id)]
+
+    Project.delete(project)
+
+    assert journal_queue.depth == 0
+    assert journal_queue.stats.written == 3
+    assert journaled() == [("created", None), ("updated", None), ("deleted", None)]
+    assert {a.actor_id for a in Activity.filter()} == {user.id}
+
+
+async def test_changes_are_queued_while_running(db, user, journal_queue, activities):
+    journal_queue.start()
+    project = Project.create(name="Journaled", owner=user)
+
+    assert journal_queue.depth == 1
+    assert journaled() == []
+
+    await journal_queue.stop()
+
+    assert journaled() == [("created", project.id)]
+    Project.delete(project)
+
+
+def test_unit_of_work_journals_on_commit(db, user, journal_queue, activities):
+    with unit_of_work():
+        project = Project.create(name="Journaled", owner=user)
+        assert journal_queue.stats.enqueued == 0
+
+    assert journaled() == [("created", project.id)]
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            Project.update(project.id, name="Rolled back")
+            raise RuntimeError
+
+    assert journaled() == [("created", project.id)]
+    Project.delete(project)
+
+
+def test_failed_changes_are_not_journaled(db, project, journal_queue, activities):
+    with pytest.raises(IntegrityError):
+        Project.update(project.id, name=None)
+
+    assert journal_queue.stats.enqueued == 0
+    assert journaled() == []
+
+
+async def test_queue_writes_batches(db, user, activities):
+    queue = ActivityQueue(batch_size=2, interval_ms=10_000, max_size=3)
+    queue.start()
+    queue.put([{**EVENT, "actor_id": user.id}])
+    await asyncio.sleep(0.05)
+
+    # Neither the batch is full nor the interval passed.
+    assert queue.depth == 1
+
+    queue.put([{**EVENT, "actor_id": user.id} for _ in range(3)])
+    await asyncio.sleep(0.1)
+
+    assert queue.depth == 0
+    assert queue.stats.as_dict() == {
+        "enqueued": 3,
+        "written": 3,
+        "dropped": 1,
+        "flushes": 2,
+        "errors": 0,
+    }
+
+    queue.put([{**EVENT, "actor_id": user.id}])
+    await queue.stop()
+
+    assert queue.depth == 0
+    written = Activity.filter(actor_id=user.id, action="event")
+    assert len(written) == 4
+    assert {a.journal_id for a in written} == {user.journal.id}
+
+
+async def test_queue_skips_deleted_rows(db, user, another_user, task, activities):
+    ActivityJournal.delete(ActivityJournal.get(user_id=another_user.id))
+    deleted = Task.create(name="Deleted", project_id=task.project_id)
+    deleted_id = deleted.id
+    Task.delete(deleted)
+    queue = ActivityQueue()
+    queue.put(
+        [
+            {**EVENT, "actor_id": user.id, "task_id": task.id},
+            {**EVENT, "actor_id": user.id, "task_id": deleted_id},
+            {**EVENT, "actor_id": another_user.id, "task_id": task.id},
+            {**EVENT, "actor_id": 10**9},
+        ]
+    )
+
+    await queue.stop()
+
+    assert (queue.stats.written, queue.stats.dropped, queue.stats.errors) == (3, 1, 0)
+    written = Activity.filter(action="event", actor_id__in=[user.id, another_user.id])
+    assert {(a.actor_id, a.task_id) for a in written} == {
+        (user.id, task.id),
+        (user.id, None),
+        (another_user.id, task.id),
+    }
+    assert ActivityJournal.get(user_id=another_user.id)
+
+
+def test_activity_metrics_require_superuser(auth_client):
+    assert auth_client.get("metrics/activities").status_code == 400
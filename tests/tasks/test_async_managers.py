@@ -0,0 +1,111 @@
+import pytest
+
+from app.api.api_v1.endpoints.tasks.sections import router as sections_router
+from app.core import hashing
+from app.core.config import settings
+from app.db.async_session import async_db
+from app.managers.async_tasks import AsyncSectionManager, AsyncTasksManager
+from app.managers.async_users import AsyncUserManager
+from app.models import Activity, ActivityJournal, Section, Task, User
+
+
+@pytest.fixture
+async def async_session(db):
+    async with async_db():
+        yield async_db.session
+
+
+@pytest.fixture
+def activities(db):
+    db.session.query(Activity).delete()
+    db.session.commit()
+    yield
+    db.session.query(Activity).delete()
+    db.session.commit()
+
+
+async def orders(manager, **filters):
+    instances = await manager.filter(**filters, order_by="order")
+    return [(i.name, i.order) for i in instances]
+
+
+async def test_task_create_shifts_order_and_journals(
+    async_session, project, activities
+):
+    manager = AsyncTasksManager.for_model(Task)
+    first = await manager.create(name="first", project_id=project.id)
+    second = await manager.create(name="second", project_id=project.id)
+    third = await manager.create(name="third", project_id=project.id, order=1)
+
+    assert await orders(manager, project_id=project.id) == [
+        ("second", 0),
+        ("third", 1),
+        ("first", 2),
+    ]
+    assert {(a.action, a.task_id) for a in Activity.filter()} == {
+        ("created", first.id),
+        ("created", second.id),
+        ("created", third.id),
+    }
+
+    await manager.delete(third)
+
+    assert await orders(manager, project_id=project.id) == [("second", 0), ("first", 1)]
+    assert Activity.filter(action="deleted", project_id=project.id)
+
+    await manager.delete(first)
+    await manager.delete(second)
+
+
+async def test_task_create_ranks_among_open_tasks(
+    async_session, project, monkeypatch
+):
+    monkeypatch.setattr(settings, "ORDERING_STRATEGY", "rank")
+    manager = AsyncTasksManager.for_model(Task)
+    done = await manager.create(name="done", project_id=project.id, is_done=True)
+    open_ = await manager.create(name="open", project_id=project.id, order=1)
+
+    ranked = await manager.filter(project_id=project.id)
+    ranked.sort(key=lambda t: (t.is_done, t.rank))
+
+    assert [t.name for t in ranked] == ["open", "done"]
+
+    await manager.delete(done)
+    await manager.delete(open_)
+
+
+async def test_user_create_hashes_password_and_creates_journal(async_session):
+    manager = AsyncUserManager.for_model(User)
+    user = await manager.create(
+        email="async@test.py", first_name="Async", last_name="User", password="1234"
+    )
+
+    assert user.password != "1234"
+    assert hashing.verify_password("1234", user.password)
+    assert ActivityJournal.filter(user_id=user.id)
+
+    await manager.delete(user)
+
+    assert not ActivityJournal.filter(user_id=user.id)
+
+
+def section_orders(project):
+    sections = Section.filter(project_id=project.id, order_by="order")
+    return [(s.name, s.order) for s in sections]
+
+
+def test_sections_are_served_by_async_manager(auth_client, project):
+    assert issubclass(sections_router.manager, AsyncSectionManager)
+
+    created = [
+        auth_client.post("sections/", json={"name": name, "project_id": project.id})
+        for name in ("first", "second")
+    ]
+
+    assert [r.status_code for r in created] == [201, 201]
+    ids = [r.json()["id"] for r in created]
+    assert section_orders(project) == [("second", 0), ("first", 1)]
+
+    assert auth_client.delete(f"sections/{ids[1]}").status_code < 300
+    assert section_orders(project) == [("first", 0)]
+    auth_client.delete(f"sections/{ids[0]}")
@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy import select
+from starlette.requests import Request
+
+from app import schemas
+from app.api.etag import compute_etag, is_fresh, validator_sources
+from app.models import Project, Task
+from app.models.tasks import Reaction, UserReaction
+
+
+def make_request(if_none_match=None):
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.parametrize(
+    "header, fresh",
+    [
+        (None, False),
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('W/"other", W/"abc"', True),
+        ("*", True),
+        ('W/"other"', False),
+    ],
+)
+def test_is_fresh(header, fresh):
+    assert is_fresh(make_request(header), 'W/"abc"') is fresh
+
+
+def test_validator_sources_include_nested_relationships():
+    ids = select(Project.id)
+    tables = {
+        source.get_final_froms()[0].name
+        for source in validator_sources(Project, schemas.Project, ids)
+    }
+
+    assert {
+        "project", "task", "section", "tagitem", "reaction", "participant"
+    } <= tables
+
+
+def test_etag_changes_with_nested_rows(db, task, user):
+    ids = select(Task.id).where(Task.id == task.id)
+    etag = compute_etag(db.session, Task, schemas.Task, ids)
+    assert compute_etag(db.session, Task, schemas.Task, ids) == etag
+    assert compute_etag(db.session, Task, schemas.Task, ids, vary="?a=1") != etag
+
+    reaction = Reaction.create(emoji="+1", task_id=task.id)
+    user_reaction = UserReaction.create(user_id=user.id, reaction_id=reaction.id)
+    try:
+        assert compute_etag(db.session, Task, schemas.Task, ids) != etag
+    finally:
+        UserReaction.delete(user_reaction)
+        Reaction.delete(reaction)
+    assert compute_etag(db.session, Task, schemas.Task, ids) == etag
+
+
+def test_conditional_get(client, task, assert_max_queries):
+    url = f"tasks/{task.id}"
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    # ETag validator only
+    with assert_max_queries(1):
+        response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_conditional_get_of_list(client, task):
+    response = client.get("tasks/", params={"project_id": task.project_id})
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        "tasks/",
+        params={"project_id": task.project_id},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 304
+
+    response = client.get(
+        "tasks/", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_list_etag_is_computed_from_the_page(client, task):
+    params = {"project_id": task.project_id, "order_by": "id", "limit": 1}
+    second = Task.create(name="Second", project_id=task.project_id)
+    outside = Task.create(name="Outside of the page", project_id=task.project_id)
+    etag = client.get("tasks/", params=params).headers["ETag"]
+
+    Task.delete(outside)
+
+    response = client.get("tasks/", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    Task.delete(second)
+
+    response = client.get("tasks/", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_project_etag_changes_with_tasks(auth_client, project):
+    url = f"projects/{project.id}"
+    etag = auth_client.get(url).headers["ETag"]
+    assert auth_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    task = Task.create(name="New task", project_id=project.id)
+    try:
+        response = auth_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+    finally:
+        Task.delete(task)
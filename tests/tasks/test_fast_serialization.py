@@ -0,0 +1,77 @@
+import json
+import time
+
+import orjson
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from starlette.responses import JSONResponse
+
+from app import schemas
+from app.api.api_v1.endpoints.tasks import projects
+from app.api.serialization import serializer
+from app.managers.loading import load_profile
+from app.models import Project, Task
+
+
+def test_serializer_matches_schema(db, filled_project):
+    project = filled_project(2)
+    with load_profile(Project, schemas.Project):
+        project = Project.get(id=project.id)
+
+    fast = orjson.loads(orjson.dumps(serializer(Project, schemas.Project)(project)))
+    validated = json.loads(
+        json.dumps(jsonable_encoder(schemas.Project.from_orm(project)))
+    )
+
+    assert fast == validated
+    assert fast["tasks"][0]["reactions"][0]["count"] == 1
+    assert fast["tags"] is None
+
+
+def test_fast_and_validated_responses_match(auth_client, filled_project, mocker):
+    project = filled_project(2)
+    url = f"projects/{project.id}"
+
+    fast = auth_client.get(url)
+    mocker.patch.object(projects.router, "fast_serialization", False)
+    validated = auth_client.get(url)
+
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.headers["ETag"] == validated.headers["ETag"]
+    assert fast.json() == validated.json()
+
+
+def _best_of(callback, runs=3):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        callback()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.benchmark
+def test_fast_serialization_speedup(db, user):
+    project = Project.create(name="Benchmark", owner=user)
+    db.session.add_all(
+        [Task(name=f"Task {i}", project_id=project.id, order=i) for i in range(1000)]
+    )
+    db.session.commit()
+    with load_profile(Project, schemas.Project):
+        project = Project.get(id=project.id)
+
+    def validated():
+        content = jsonable_encoder(schemas.Project.from_orm(project))
+        return JSONResponse(content).body
+
+    def fast():
+        return ORJSONResponse(serializer(Project, schemas.Project)(project)).body
+
+    assert json.loads(fast()) == json.loads(validated())
+    validated_time, fast_time = _best_of(validated), _best_of(fast)
+
+    db.session.query(Task).filter(Task.project_id == project.id).delete()
+    db.session.commit()
+    Project.delete(project)
+    assert fast_time * 3 < validated_time
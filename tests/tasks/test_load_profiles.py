@@ -0,0 +1,66 @@
+import pytest
+
+from app import schemas
+from app.core.exceptions import ImproperlyConfigured
+from app.core.profiling import watch_queries
+from app.managers.loading import build_load_options, load_profile, options_for
+from app.models import Project, Task
+from app.schemas.section import Section as SectionSchema
+
+# project, tasks, tags, reactions, sections, section tasks, their tags,
+# reactions and participants
+PROJECT_QUERIES = 9
+
+
+def test_profiles_are_declared():
+    assert "tasks.reactions" in schemas.Project.__config__.load_profile
+    assert SectionSchema.__config__.load_profile == ("tasks.tags", "tasks.reactions")
+
+
+def test_options_only_apply_to_profile_model():
+    assert options_for(Project) == ()
+
+    with load_profile(Project, schemas.Project):
+        assert len(options_for(Project)) == 5
+        assert options_for(Task) == ()
+
+    assert options_for(Project) == ()
+
+
+def test_unknown_relationship_in_profile():
+    with pytest.raises(ImproperlyConfigured):
+        build_load_options(Task, ("unknown",))
+
+
+@pytest.mark.parametrize("size", [2, 6])
+def test_project_query_count_is_constant(db, filled_project, size):
+    project_id = filled_project(size).id
+    db.session.expire_all()
+
+    with watch_queries() as queries, load_profile(Project, schemas.Project):
+        data = schemas.Project.from_orm(Project.get(id=project_id))
+
+    assert len(data.tasks) == size
+    assert queries.count == PROJECT_QUERIES
+
+
+@pytest.mark.parametrize("size", [2, 6])
+def test_tasks_list_query_count_is_constant(db, filled_project, size):
+    project_id = filled_project(size).id
+    db.session.expire_all()
+
+    with watch_queries() as queries, load_profile(Task, schemas.Task):
+        data = [schemas.Task.from_orm(t) for t in Task.filter(project_id=project_id)]
+
+    assert len(data) == size
+    assert queries.count == 3
+
+
+def test_project_endpoint_query_count(auth_client, filled_project, assert_max_queries):
+    project_id = filled_project(4).id
+
+    # current user, permissions, ETag validator and the project tree
+    with assert_max_queries(PROJECT_QUERIES + 3):
+        response = auth_client.get(f"projects/{project_id}")
+
+    assert response.status_code == 200
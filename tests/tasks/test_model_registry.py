@@ -0,0 +1,93 @@
+import time
+
+import pytest
+from sqlalchemy import MetaData
+
+from app.managers.registry import get_registry
+from app.models import Project, Task, User
+
+
+def legacy_model_fields(cls):
+    """Field lookup used by BaseManager before the registry, kept for the benchmark."""
+    fields = []
+    for field in dir(cls):
+        if not field.startswith("_"):
+            if not callable(getattr(cls, field)) and not isinstance(
+                getattr(cls, field), MetaData
+            ):
+                fields.append(field)
+    return fields
+
+
+def legacy_check_fields(cls, **fields):
+    for field in fields.keys():
+        if field not in legacy_model_fields(cls):
+            raise ValueError(field)
+
+
+def test_registry_is_cached():
+    assert get_registry(Task) is get_registry(Task)
+    assert Task.model_registry() is get_registry(Task)
+
+
+def test_registry_fields():
+    registry = Task.model_registry()
+
+    assert {"id", "order", "rank", "project_id", "is_done"} <= registry.columns
+    assert {"project", "section", "tags", "reactions"} <= registry.relationships
+    assert "project" in registry.filterable
+    assert "tags" not in registry.filterable
+    assert {"order", "created", "deadline", "name"} <= registry.sortable
+    assert "project" not in registry.sortable
+
+
+def test_registry_knows_hybrid_properties():
+    assert "full_name" in User.model_registry().fields
+
+
+def test_registry_covers_legacy_fields():
+    for model in (Task, Project, User):
+        legacy = set(legacy_model_fields(model)) - {
+            "registry",
+            "cache_enabled",
+            "cache_excluded",
+            "sensitive_fields",
+        }
+        assert legacy <= model.model_registry().fields
+
+
+def test_sensitive_fields_are_not_filterable_or_sortable():
+    registry = User.model_registry()
+
+    assert "password" in registry.fields
+    assert "password" not in registry.filterable
+    assert "password" not in registry.sortable
+    with pytest.raises(ValueError):
+        User.build_filter(password__startswith="$argon2")
+
+
+def test_filter_by_collection_is_rejected():
+    with pytest.raises(ValueError):
+        Project.build_filter(tasks=[])
+
+
+def test_unknown_order_by_is_ignored(db, project):
+    assert Task.filter(order_by="tags", project_id=project.id) == []
+
+
+@pytest.mark.benchmark
+def test_check_fields_overhead():
+    fields = {"id": 1, "project_id": 1, "order": 0}
+    rounds = 200
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        legacy_check_fields(Task, **fields)
+    before = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        Task.check_fields(**fields)
+    after = (time.perf_counter() - start) / rounds
+
+    assert after * 10 < before
@@ -0,0 +1,51 @@
+import pytest
+
+from app.core.exceptions import ObjectDoesNotExist
+from app.models import Project
+
+
+def test_access_is_resolved_with_one_query(
+    db, project, another_user, assert_max_queries
+):
+    project_id, owner_id = project.id, project.owner_id
+    project.participants.append(another_user)
+    Project.refresh(project)
+    another_user_id = another_user.id
+
+    with assert_max_queries(1):
+        assert Project.access(project_id) == (owner_id, (another_user_id,))
+        assert Project.access(project_id) == (owner_id, (another_user_id,))
+
+    project.participants.remove(another_user)
+    Project.refresh(project)
+
+
+def test_access_is_invalidated_by_participants(db, project, another_user):
+    assert Project.access(project.id)[1] == ()
+
+    another_user.participated_projects.append(project)
+    db.session.flush()
+    assert Project.access(project.id)[1] == (another_user.id,)
+
+    project.participants.remove(another_user)
+    db.session.flush()
+    assert Project.access(project.id)[1] == ()
+    db.session.commit()
+
+
+def test_access_of_missing_project(db):
+    with pytest.raises(ObjectDoesNotExist):
+        Project.access(0)
+
+
+def test_participant_can_view_project(another_auth_client, project, another_user):
+    url = f"projects/{project.id}"
+    assert another_auth_client.get(url).status_code == 403
+
+    project.participants.append(another_user)
+    Project.refresh(project)
+    assert another_auth_client.get(url).status_code == 200
+
+    project.participants.remove(another_user)
+    Project.refresh(project)
+    assert another_auth_client.get(url).status_code == 403
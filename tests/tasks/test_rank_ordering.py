@@ -0,0 +1,134 @@
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models import Project, Section, Task
+
+
+@pytest.fixture
+def rank_strategy(monkeypatch):
+    monkeypatch.setattr(settings, "ORDERING_STRATEGY", "rank")
+
+
+def ordered_names(project):
+    return [
+        t.name
+        for t in Task.filter(project_id=project.id, order_by="rank", limit=1000)
+    ]
+
+
+def test_create_at_top(rank_strategy, db, project):
+    first = Task.create(name="first", project_id=project.id)
+    second = Task.create(name="second", project_id=project.id)
+
+    assert second.rank < first.rank
+    assert ordered_names(project) == ["second", "first"]
+
+    Task.delete(first)
+    Task.delete(second)
+
+
+def test_create_at_position(rank_strategy, db, project):
+    tasks = [Task.create(name=str(i), project_id=project.id) for i in range(3)]
+    middle = Task.create(name="middle", project_id=project.id, order=1)
+
+    assert ordered_names(project) == ["2", "middle", "1", "0"]
+
+    for task in tasks + [middle]:
+        Task.delete(task)
+
+
+def test_reorder_writes_single_row(rank_strategy, db, project):
+    tasks = [Task.create(name=str(i), project_id=project.id) for i in range(5)]
+    statements = []
+
+    def track(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            statements.append(parameters)
+
+    engine = db.session.get_bind()
+    event.listen(engine, "before_cursor_execute", track)
+    try:
+        Task.reorder(tasks[0], project, 0)
+    finally:
+        event.remove(engine, "before_cursor_execute", track)
+
+    assert len(statements) == 1
+    assert ordered_names(project) == ["0", "4", "3", "2", "1"]
+
+    for task in tasks:
+        Task.delete(task)
+
+
+def test_dense_tasks_are_ranked_on_first_move(db, project, monkeypatch):
+    tasks = [Task.create(name=str(i), project_id=project.id) for i in range(3)]
+    monkeypatch.setattr(settings, "ORDERING_STRATEGY", "rank")
+
+    Task.reorder(Task.get(id=tasks[0].id), project, 1)
+
+    assert ordered_names(project) == ["2", "0", "1"]
+
+    for task in tasks:
+        Task.delete(task)
+
+
+def test_rebalance(rank_strategy, db, project, monkeypatch):
+    monkeypatch.setattr(settings, "RANK_MAX_LENGTH", 2)
+    tasks = [Task.create(name=str(i), project_id=project.id) for i in range(20)]
+
+    assert Task.needs_rebalance(tasks[-1])
+
+    Task.rebalance(Project, project.id)
+
+    assert all(not Task.needs_rebalance(Task.get(id=t.id)) for t in tasks)
+    assert ordered_names(project) == [str(i) for i in reversed(range(20))]
+    assert [Task.get(id=t.id).order for t in reversed(tasks)] == list(range(20))
+
+    for task in tasks:
+        Task.delete(task)
+
+
+def test_section_reorder(rank_strategy, db, project):
+    sections = [Section.create(name=str(i), project_id=project.id) for i in range(3)]
+
+    Section.reorder(sections[2], project, 2)
+
+    names = [s.name for s in Section.filter(project_id=project.id, order_by="rank")]
+    assert names == ["1", "0", "2"]
+
+    for section in sections:
+        Section.delete(section)
+
+
+def test_reorder_among_done_tasks(rank_strategy, auth_client, db, project):
+    created = [Task.create(name=name, project_id=project.id) for name in "cba"]
+    created += [
+        Task.create(name=name, project_id=project.id, is_done=True) for name in "yx"
+    ]
+
+    def listed():
+        db.session.expire(project, ["tasks"])
+        return [t.name for t in project.tasks]
+
+    def reorder(position, order):
+        payload = {
+            "source_id": project.id,
+            "source_type": "project",
+            "destination_id": project.id,
+            "destination_type": "project",
+            "order": order,
+        }
+        return auth_client.post(f"tasks/{position}/reorder/", json=payload)
+
+    assert listed() == ["a", "b", "c", "x", "y"]
+    assert Task.at_position(Project, project.id, 3).name == "x"
+
+    assert reorder(4, 3).json()["name"] == "y"
+    assert listed() == ["a", "b", "c", "y", "x"]
+
+    # Open tasks can't be moved past done ones.
+    assert reorder(0, 4).json()["name"] == "a"
+    assert listed() == ["b", "c", "a", "y", "x"]
+
+    for task in created:
+        Task.delete(task)
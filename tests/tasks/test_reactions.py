@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.tasks import Reaction, UserReaction
+
+
+def toggle(client, task, emoji="+1"):
+    return client.post("reactions/toggle", json={"task_id": task.id, "emoji": emoji})
+
+
+def reactions(response):
+    return {r["emoji"]: r["count"] for r in response.json()["reactions"]}
+
+
+def test_toggle_reaction(auth_client, task):
+    added = toggle(auth_client, task)
+
+    assert added.status_code == 200
+    assert reactions(added) == {"+1": 1}
+    assert "users" not in added.json()["reactions"][0]
+
+    removed = toggle(auth_client, task)
+
+    assert removed.status_code == 200
+    assert reactions(removed) == {}
+    assert not Reaction.exists(task_id=task.id)
+
+
+def test_reactions_of_several_users(auth_client, another_auth_client, task):
+    toggle(auth_client, task)
+    toggle(another_auth_client, task, "tada")
+    response = toggle(another_auth_client, task)
+
+    assert reactions(response) == {"+1": 2, "tada": 1}
+
+    response = toggle(auth_client, task)
+
+    assert reactions(response) == {"+1": 1, "tada": 1}
+    toggle(another_auth_client, task)
+    toggle(another_auth_client, task, "tada")
+
+
+def test_add_reaction_is_idempotent(auth_client, task):
+    payload = {"task_id": task.id, "emoji": "+1"}
+    auth_client.post("reactions/", json=payload)
+    response = auth_client.post("reactions/", json=payload)
+
+    assert reactions(response) == {"+1": 1}
+
+    response = auth_client.post("reactions/remove", json=payload)
+
+    assert response.status_code == 200
+    assert reactions(response) == {}
+
+
+def test_remove_missing_reaction(auth_client, task):
+    response = auth_client.post(
+        "reactions/remove", json={"task_id": task.id, "emoji": "+1"}
+    )
+
+    assert response.status_code == 404
+
+
+def test_react_to_missing_task(auth_client):
+    response = auth_client.post(
+        "reactions/toggle", json={"task_id": 10**9, "emoji": "+1"}
+    )
+
+    assert response.status_code == 404
+    assert not Reaction.exists(task_id=10**9)
+
+
+def test_toggle_query_count(auth_client, task, assert_max_queries):
+    # user; upsert, reaction id, user reaction and count; task with
+    # tags and reactions
+    with assert_max_queries(8):
+        toggle(auth_client, task)
+
+    toggle(auth_client, task)
+
+
+def test_count_follows_user_reactions(db, user, another_user, task):
+    reaction = Reaction.create(emoji="+1", task_id=task.id)
+    first = UserReaction.create(user_id=user.id, reaction_id=reaction.id)
+    second = UserReaction.create(user_id=another_user.id, reaction_id=reaction.id)
+
+    assert reaction.count == 2
+
+    UserReaction.delete(second)
+
+    assert reaction.count == 1
+    UserReaction.delete(first)
+    Reaction.delete(reaction)
+
+
+def test_reaction_is_unique_per_emoji(db, task):
+    reaction = Reaction.create(emoji="+1", task_id=task.id)
+
+    with pytest.raises(IntegrityError):
+        Reaction.create(emoji="+1", task_id=task.id)
+
+    db.session.rollback()
+    Reaction.delete(reaction)
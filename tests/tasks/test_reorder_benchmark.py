@@ -0,0 +1,62 @@
+import time
+
+import pytest
+from sqlalchemy import event
+
+from app.models import Project, Task
+
+SIZES = (50, 1000)
+
+
+def _fill_project(db, project, size):
+    db.session.add_all(
+        [Task(name=f"Task {i}", project_id=project.id, order=i) for i in range(size)]
+    )
+    db.session.commit()
+
+
+def _measure(db, callback):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.session.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        start = time.perf_counter()
+        result = callback()
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return result, elapsed, len(statements)
+
+
+@pytest.mark.benchmark
+def test_reorder_latency_is_flat(db, user):
+    results = {}
+    for size in SIZES:
+        project = Project.create(name=f"Benchmark {size}", owner=user)
+        _fill_project(db, project, size)
+
+        top, insert_time, insert_queries = _measure(
+            db, lambda: Task.create(name="Top", project_id=project.id)
+        )
+        last = Task.get(project_id=project.id, order=size)
+        _, reorder_time, reorder_queries = _measure(
+            db, lambda: Task.reorder(last, project, 0)
+        )
+
+        assert Task.get(id=top.id).order == 1
+        assert Task.get(id=last.id).order == 0
+
+        results[size] = (insert_time, insert_queries, reorder_time, reorder_queries)
+
+        db.session.query(Task).filter(Task.project_id == project.id).delete()
+        db.session.commit()
+        Project.delete(project)
+
+    small, large = results[SIZES[0]], results[SIZES[-1]]
+    assert small[1] == large[1]
+    assert small[3] == large[3]
+    assert large[2] < small[2] * 10
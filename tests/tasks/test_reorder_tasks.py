@@ -82,3 +82,25 @@ def test_reorder_from_project_to_project(db, project):
 
     Task.delete(another_updated)
     Task.delete(new_updated)
+
+
+def test_reorder_route(auth_client, db, project):
+    first = Task.create(name="First", project_id=project.id)
+    second = Task.create(name="Second", project_id=project.id)
+    payload = {
+        "source_id": project.id,
+        "source_type": "project",
+        "destination_id": project.id,
+        "destination_type": "project",
+        "order": 1,
+    }
+
+    response = auth_client.post("tasks/0/reorder/", json=payload)
+
+    assert response.status_code == 201
+    assert response.json()["id"] == second.id
+    assert Task.get(id=first.id).order == 0
+    assert auth_client.post("tasks/first/reorder/", json=payload).status_code == 422
+
+    Task.delete(first)
+    Task.delete(second)
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import Float, cast
+from sqlalchemy.dialects import postgresql
+
+from app.models import Project, Tag, TagItem, Task
+from app.models.tasks import Section
+
+
+@pytest.fixture
+def searchable(db, project, another_user):
+    section = Section.create(name="Section", project_id=project.id)
+    foreign_project = Project.create(name="Foreign", owner=another_user)
+    tag = Tag.create(name="Search", owner_id=project.owner_id)
+    created = {
+        "prefix": Task.create(name="Report draft", project_id=project.id),
+        "inside": Task.create(name="Write report", project_id=project.id, is_done=True),
+        "described": Task.create(
+            name="Meeting", description="Discuss the report", section_id=section.id
+        ),
+        "other": Task.create(name="Groceries", project_id=project.id),
+        "foreign": Task.create(name="Report", project_id=foreign_project.id),
+    }
+    tag_item = TagItem.create(tag_id=tag.id, task_id=created["described"].id)
+    yield created, tag
+    TagItem.delete(tag_item)
+    for task in created.values():
+        Task.delete(task)
+    for instance in (tag, section, foreign_project):
+        type(instance).delete(instance)
+
+
+def search(client, **params):
+    return client.get("tasks/search", params=params)
+
+
+def ids(response):
+    return [task["id"] for task in response.json()]
+
+
+def test_search_ranks_visible_tasks(auth_client, searchable):
+    tasks, _ = searchable
+
+    response = search(auth_client, q="report")
+
+    assert response.status_code == 200
+    assert ids(response) == [
+        tasks["prefix"].id,
+        tasks["inside"].id,
+        tasks["described"].id,
+    ]
+
+
+def test_search_filters(auth_client, searchable):
+    tasks, tag = searchable
+
+    assert ids(search(auth_client, q="report", is_done=True)) == [tasks["inside"].id]
+    assert ids(search(auth_client, q="report", tag_id=tag.id)) == [
+        tasks["described"].id
+    ]
+
+
+def test_search_pages(auth_client, searchable):
+    tasks, _ = searchable
+
+    first = search(auth_client, q="report", limit=2)
+    second = search(
+        auth_client, q="report", limit=2, cursor=first.headers["X-Next-Cursor"]
+    )
+
+    assert ids(first) == [tasks["prefix"].id, tasks["inside"].id]
+    assert ids(second) == [tasks["described"].id]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_search_escapes_wildcards(auth_client, searchable):
+    assert search(auth_client, q="%").json() == []
+
+
+def test_search_malformed_cursor(auth_client):
+    assert search(auth_client, q="report", cursor="nope").status_code == 400
+
+
+def test_search_document_matches_index():
+    document = Task.search_document().compile(dialect=postgresql.dialect())
+
+    assert str(document) == (
+        "to_tsvector('simple'::regconfig, "
+        "(coalesce(task.name, '') || ' ') || coalesce(task.description, ''))"
+    )
+
+
+def test_postgresql_rank_boosts_prefixes_and_is_a_double():
+    _, rank = Task._search_terms("report", "postgresql")
+    rank = str(
+        cast(rank, Float(53)).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    assert rank.startswith("CAST(") and rank.endswith("AS FLOAT(53))")
+    assert "task.name ILIKE 'report%%'" in rank
+    assert "ts_rank(" in rank and "similarity(task.name, 'report')" in rank
@@ -0,0 +1,137 @@
+import pytest
+
+from app import schemas
+from app.api.serialization import load_paths, parse_fieldset
+from app.models import Project
+
+TASK_FIELDS = set(schemas.Task.__fields__)
+
+
+def test_parse_fieldset():
+    assert parse_fieldset(Project, schemas.Project, {}) is None
+
+    fieldset = parse_fieldset(
+        Project,
+        schemas.Project,
+        {
+            "fields": "name,tasks.name",
+            "expand": "sections.tasks.tags",
+            "tasks_limit": "5",
+        },
+    )
+    assert fieldset.fields == {"name"}
+    assert fieldset.children["tasks"].fields == {"name"}
+    assert fieldset.limits == {"tasks": 5}
+    assert load_paths(Project, schemas.Project, fieldset) == ("sections.tasks.tags",)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"expand": "owner"},
+        {"expand": "tasks.unknown"},
+        {"fields": "password"},
+        {"participants_limit": "x"},
+        {"name_limit": "1"},
+    ],
+)
+def test_parse_fieldset_errors(params):
+    with pytest.raises(ValueError):
+        parse_fieldset(Project, schemas.Project, params)
+
+
+def test_default_paths_match_profile():
+    fieldset = parse_fieldset(Project, schemas.Project, {"tasks_limit": "1"})
+
+    assert set(load_paths(Project, schemas.Project, fieldset)) == {
+        path
+        for path in schemas.Project.__config__.load_profile
+        if not path.startswith("tasks.")
+    }
+
+
+def test_project_fields(auth_client, filled_project, assert_max_queries):
+    project = filled_project(3)
+    expected = {"id": project.id, "name": project.name}
+
+    # current user, permissions, ETag validator and the project row
+    with assert_max_queries(4):
+        response = auth_client.get(f"projects/{project.id}", params={"fields": "name"})
+
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+def test_project_expand_with_limit(auth_client, filled_project):
+    project = filled_project(3)
+    tasks = auth_client.get(f"projects/{project.id}").json()["tasks"]
+
+    response = auth_client.get(
+        f"projects/{project.id}", params={"expand": "tasks", "tasks_limit": 2}
+    )
+
+    data = response.json()
+    assert response.status_code == 200
+    assert "sections" not in data and "participants" not in data
+    assert data["owner_id"] == project.owner_id
+    assert [t["id"] for t in data["tasks"]] == [t["id"] for t in tasks[:2]]
+    assert set(data["tasks"][0]) == TASK_FIELDS - {"tags", "reactions"}
+
+
+def test_project_nested_fields(auth_client, filled_project):
+    project = filled_project(2)
+
+    response = auth_client.get(
+        f"projects/{project.id}",
+        params={"fields": "id,tasks.name,sections.name", "expand": "tasks.tags"},
+    )
+
+    data = response.json()
+    assert set(data) == {"id", "tasks", "sections"}
+    assert data["sections"] == [{"id": project.sections[0].id, "name": "Section"}]
+    assert [set(t) for t in data["tasks"]] == [{"id", "name", "tags"}] * 2
+    assert data["tasks"][0]["tags"][0]["name"] == "Tag"
+
+
+def test_limit_keeps_default_fields(auth_client, filled_project):
+    project = filled_project(3)
+
+    data = auth_client.get(f"projects/{project.id}", params={"tasks_limit": 1}).json()
+
+    assert len(data["tasks"]) == 1
+    assert len(data["sections"][0]["tasks"]) == 3
+    assert data["tasks"][0]["reactions"][0]["emoji"] == "+1"
+
+
+def test_list_route_limits_every_parent(auth_client, filled_project):
+    first, second = filled_project(3), filled_project(2)
+
+    response = auth_client.get(
+        "projects/user/", params={"expand": "tasks", "tasks_limit": 1}
+    )
+
+    projects = {p["id"]: p for p in response.json()}
+    assert len(projects[first.id]["tasks"]) == 1
+    assert len(projects[second.id]["tasks"]) == 1
+
+
+def test_invalid_fields(auth_client, filled_project):
+    project = filled_project(1)
+
+    response = auth_client.get(f"projects/{project.id}", params={"expand": "owner"})
+
+    assert response.status_code == 400
+
+
+def test_crud_router_list_fields(auth_client, filled_project):
+    project = filled_project(2)
+    expected = [{"id": t.id, "name": t.name} for t in project.tasks]
+
+    response = auth_client.get(
+        "tasks/", params={"fields": "name", "project_id": project.id}
+    )
+
+    assert response.status_code == 200
+    assert sorted(response.json(), key=lambda t: t["id"]) == sorted(
+        expected, key=lambda t: t["id"]
+    )
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.models import Project, Task, Tombstone
+from app.models.tasks import Reaction, Section
+
+
+def age(db, *instances):
+    """Moves `updated` of instances an hour back, before any sync cursor."""
+    past = datetime.utcnow() - timedelta(hours=1)
+    for instance in instances:
+        model = type(instance)
+        db.session.execute(
+            update(model.__table__).where(model.id == instance.id).values(updated=past)
+        )
+    db.session.commit()
+
+
+@pytest.fixture
+def foreign_project(db, another_user):
+    project = Project.create(name="Foreign project", owner=another_user)
+    yield project
+    Project.delete(project)
+
+
+@pytest.fixture
+def clean_tombstones(db):
+    # Ids of deleted rows are reused by SQLite, tombstones of other tests
+    # would match new projects.
+    db.session.query(Tombstone).delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def board(db, project, clean_tombstones):
+    section = Section.create(name="Sync section", project_id=project.id)
+    task = Task.create(name="Old task", project_id=project.id)
+    reaction = Reaction.create(emoji="+1", task_id=task.id)
+    yield section, task, reaction
+    Reaction.delete(reaction)
+    Task.delete(task)
+    Section.delete(section)
+
+
+def ids(items):
+    return {item["id"] for item in items}
+
+
+def test_full_sync(auth_client, board, foreign_project):
+    section, task, reaction = board
+    foreign = Task.create(name="Foreign", project_id=foreign_project.id)
+
+    response = auth_client.get("sync/")
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["cursor"]
+    assert task.id in ids(data["tasks"]) and foreign.id not in ids(data["tasks"])
+    assert section.id in ids(data["sections"])
+    assert reaction.id in ids(data["reactions"])
+    assert data["deleted"] == []
+    Task.delete(foreign)
+
+
+def test_changes_since_cursor(db, auth_client, project, board, foreign_project):
+    section, task, reaction = board
+    in_section = Task.create(name="In section", section_id=section.id)
+    foreign = Task.create(name="Foreign", project_id=foreign_project.id)
+    age(db, section, task, reaction, in_section, foreign)
+    cursor = auth_client.get("sync/").json()["cursor"]
+
+    new = Task.create(name="New task", project_id=project.id)
+    Section.update(section.id, name="Renamed section")
+    Task.delete(in_section)
+    Task.delete(foreign)
+
+    response = auth_client.get("sync/", params={"since": cursor})
+
+    data = response.json()
+    # the new task is inserted at the top, order of the old one is shifted
+    assert ids(data["tasks"]) == {new.id, task.id}
+    assert [s["name"] for s in data["sections"]] == ["Renamed section"]
+    assert data["reactions"] == [] and data["tag_items"] == []
+    assert [(d["model"], d["object_id"]) for d in data["deleted"]] == [
+        ("task", in_section.id)
+    ]
+    Task.delete(new)
+
+
+def test_tombstone_is_scoped_by_project(db, project, board):
+    section, _, _ = board
+    task = Task.create(name="Deleted", section_id=section.id)
+    task_id = task.id
+
+    Task.delete(task)
+
+    tombstone = Tombstone.get(model="task", object_id=task_id)
+    assert tombstone.project_id == project.id
+    assert tombstone.owner_id is None
+
+
+def test_sync_invalid_cursor(auth_client):
+    response = auth_client.get("sync/", params={"since": "broken"})
+
+    assert response.status_code == 400
@@ -0,0 +1,146 @@
+from datetime import date
+
+import pytest
+
+from app.models import Project, Task
+from app.models.tasks import Section
+
+
+@pytest.fixture
+def project(db, user):
+    project = Project.create(name="Filtered project", owner=user)
+    yield project
+    Project.delete(project)
+
+
+@pytest.fixture
+def tasks(db, project):
+    tasks = [
+        Task.create(name="Write docs", project_id=project.id, deadline=date(2022, 1, 1)),
+        Task.create(name="Fix bug", project_id=project.id, deadline=date(2022, 1, 5)),
+        Task.create(name="Fix another bug", project_id=project.id),
+    ]
+    yield tasks
+    for task in tasks:
+        Task.delete(task)
+
+
+def test_list_tasks_with_lookups(auth_client, project, tasks):
+    response = auth_client.get(
+        "tasks/",
+        params={"project_id__in": f"{project.id},0", "name__icontains": "fix"},
+    )
+    assert response.status_code == 200
+    assert {t["id"] for t in response.json()} == {tasks[1].id, tasks[2].id}
+
+    response = auth_client.get(
+        "tasks/",
+        params={"project_id": project.id, "deadline__gte": "2022-01-02"},
+    )
+    assert [t["id"] for t in response.json()] == [tasks[1].id]
+
+    response = auth_client.get(
+        "tasks/", params={"project_id": project.id, "deadline__isnull": "true"}
+    )
+    assert [t["id"] for t in response.json()] == [tasks[2].id]
+
+
+def test_list_tasks_ignores_unlisted_lookups(auth_client, project, tasks):
+    response = auth_client.get(
+        "tasks/", params={"project_id": project.id, "description__isnull": "false"}
+    )
+    assert len(response.json()) == 3
+
+
+def test_list_tasks_invalid_lookup_value(auth_client, project, tasks):
+    response = auth_client.get("tasks/", params={"deadline__gte": "yesterday"})
+    assert response.status_code == 400
+
+
+def test_get_tasks_by_date(auth_client, project, tasks):
+    response = auth_client.get("tasks/date/2022-01-05")
+
+    assert response.status_code == 200
+    assert [t["id"] for t in response.json()] == [tasks[1].id]
+
+
+@pytest.fixture
+def shared_project(db, user, another_user):
+    project = Project.create(name="Shared project", owner=another_user)
+    project.participants.append(user)
+    Project.refresh(project)
+    yield project
+    project.participants.remove(user)
+    Project.delete(project)
+
+
+@pytest.fixture
+def foreign_project(db, another_user):
+    project = Project.create(name="Foreign project", owner=another_user)
+    yield project
+    Project.delete(project)
+
+
+@pytest.fixture
+def calendar(db, tasks, project, shared_project, foreign_project):
+    section = Section.create(name="Calendar section", order=0, project_id=project.id)
+    created = [
+        Task.create(name="Shared", project_id=shared_project.id, deadline=date(2022, 1, 5)),
+        Task.create(name="In section", section_id=section.id, deadline=date(2022, 1, 3)),
+        Task.create(name="Foreign", project_id=foreign_project.id, deadline=date(2022, 1, 5)),
+    ]
+    yield created
+    for task in created:
+        Task.delete(task)
+    Section.delete(section)
+
+
+def test_get_tasks_by_range(auth_client, tasks, calendar, assert_max_queries):
+    shared, in_section, _ = calendar
+
+    # user, tasks with tags and reactions
+    with assert_max_queries(4):
+        response = auth_client.get(
+            "tasks/range", params={"from": "2022-01-01", "to": "2022-01-05"}
+        )
+
+    assert response.status_code == 200
+    days = {day["date"]: {t["id"] for t in day["tasks"]} for day in response.json()}
+    assert days == {
+        "2022-01-01": {tasks[0].id},
+        "2022-01-03": {in_section.id},
+        "2022-01-05": {tasks[1].id, shared.id},
+    }
+
+
+def test_get_tasks_by_range_validates_range(auth_client):
+    for start, end in (("2022-01-05", "2022-01-01"), ("2022-01-01", "2024-01-01")):
+        response = auth_client.get("tasks/range", params={"from": start, "to": end})
+        assert response.status_code == 400
+
+
+def test_projects_summary(
+    auth_client, project, tasks, calendar, shared_project, assert_max_queries
+):
+    Task.update(tasks[0].id, is_done=True)
+
+    # user and projects with counts
+    with assert_max_queries(2):
+        response = auth_client.get("projects/summary")
+
+    assert response.status_code == 200
+    summaries = {p["id"]: p for p in response.json()}
+    assert summaries[project.id] == {
+        "id": project.id,
+        "name": "Filtered project",
+        "icon": None,
+        "accent_color": None,
+        "is_pinned": False,
+        "is_favorite": False,
+        "open": 3,
+        "done": 1,
+        "overdue": 2,
+    }
+    assert summaries[shared_project.id]["open"] == 1
+    assert summaries[shared_project.id]["overdue"] == 1
+    assert not any(p["name"] == "Foreign project" for p in summaries.values())
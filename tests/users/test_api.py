@@ -1,15 +1,22 @@
+from datetime import datetime
+
 import jwt
+import pytest
 from pydantic import ValidationError
 
 from app.core.config import settings
-from app.models import User
+from app.models import Activity, User
+
 
+def test_get_user(client, user, assert_max_queries):
+    user_id = user.id
 
-def test_get_user(client, user):
-    response = client.get(f"users/{user.id}")
+    # ETag validator and the user
+    with assert_max_queries(2):
+        response = client.get(f"users/{user_id}")
 
     assert response.status_code == 200
-    assert response.json()["id"] == user.id
+    assert response.json()["id"] == user_id
 
 
 def test_get_me_anon_user(client):
@@ -18,8 +25,10 @@ def test_get_me_anon_user(client):
     assert response.status_code == 401
 
 
-def test_get_all_users(client, user):
-    response = client.get("users/")
+def test_get_all_users(client, user, assert_max_queries):
+    # ETag validator and users
+    with assert_max_queries(2):
+        response = client.get("users/")
 
     assert response.status_code == 200
     assert len(response.json()) >= 1
@@ -31,8 +40,9 @@ def test_auth_client(auth_client):
     assert response.status_code == 200
 
 
-def test_access_get_me(auth_client, user):
-    response = auth_client.get("users/me/")
+def test_access_get_me(auth_client, user, assert_max_queries):
+    with assert_max_queries(1):
+        response = auth_client.get("users/me/")
 
     assert response.status_code == 200
     assert response.json()["id"] == user.id
@@ -97,3 +107,84 @@ def test_access_token(client, user):
 
     assert "exp" in payload
     assert "sub" in payload
+
+
+def test_get_all_users_with_cursor(client, user, another_user):
+    response = client.get("users/", params={"limit": 1, "order_by": "id"})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    cursor = response.headers["X-Next-Cursor"]
+
+    next_page = client.get(
+        "users/", params={"limit": 1, "order_by": "id", "cursor": cursor}
+    )
+
+    assert next_page.status_code == 200
+    assert next_page.json()[0]["id"] > response.json()[0]["id"]
+
+
+def test_users_cant_be_ordered_by_password(client):
+    response = client.get("users/", params={"order_by": "password"})
+
+    assert response.status_code == 400
+
+
+def test_get_all_users_with_malformed_cursor(client):
+    response = client.get("users/", params={"cursor": "not a cursor"})
+
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def activities(db, user, another_user):
+    db.session.query(Activity).filter(Activity.actor_id == user.id).delete()
+    db.session.commit()
+    # Two activities share the timestamp, the id breaks the tie.
+    created = [
+        Activity.create(
+            actor_id=user.id,
+            action=f"action {i}",
+            project_id=i % 2 or None,
+            created=datetime(2022, 1, 1, 12, min(i, 3)),
+        )
+        for i in range(5)
+    ]
+    created.append(Activity.create(actor_id=another_user.id, action="foreign"))
+    yield created
+    for activity in created:
+        Activity.delete(activity)
+
+
+def test_activity_feed_pages(auth_client, user, activities, assert_max_queries):
+    own = sorted(activities[:5], key=lambda a: (a.created, a.id), reverse=True)
+
+    # current user, activities with their actor
+    with assert_max_queries(2):
+        response = auth_client.get("users/me/activities", params={"limit": 3})
+
+    assert response.status_code == 200
+    assert [a["id"] for a in response.json()] == [a.id for a in own[:3]]
+    assert response.json()[0]["actor"]["id"] == user.id
+
+    next_page = auth_client.get(
+        "users/me/activities",
+        params={"limit": 3, "cursor": response.headers["X-Next-Cursor"]},
+    )
+
+    assert [a["id"] for a in next_page.json()] == [a.id for a in own[3:]]
+    assert "X-Next-Cursor" not in next_page.headers
+
+
+def test_activity_feed_filters(auth_client, activities):
+    response = auth_client.get("users/me/activities", params={"project_id": 1})
+
+    assert {a["id"] for a in response.json()} == {
+        a.id for a in activities[:5] if a.project_id == 1
+    }
+
+
+def test_activity_feed_malformed_cursor(auth_client):
+    response = auth_client.get("users/me/activities", params={"cursor": "nope"})
+
+    assert response.status_code == 400
@@ -2,6 +2,7 @@ import pytest
 from fastapi.exceptions import HTTPException
 
 from app.api import deps
+from app.db import cache
 from app.models.user import User
 
 
@@ -37,3 +38,39 @@ def test_get_verified_user(user):
 
     assert isinstance(user_out, User)
     assert user_out.email_verified is True
+
+
+def test_get_current_user_from_snapshot(
+    db, another_user, another_token, assert_max_queries
+):
+    user_id, email = another_user.id, another_user.email
+    db.session.expunge(another_user)
+    user = deps.get_current_user(another_token)
+    assert cache.auth_cache.get("user", user_id) == {
+        "id": user_id,
+        "is_active": True,
+        "is_superuser": False,
+        "email_verified": False,
+    }
+    db.session.expunge(user)
+
+    with assert_max_queries(0):
+        user = deps.get_current_active_user(deps.get_current_user(another_token))
+    assert user.id == user_id
+
+    # other columns are loaded on access
+    with assert_max_queries(1):
+        assert user.email == email
+
+
+def test_user_snapshot_is_invalidated(db, another_user, another_token):
+    user_id = another_user.id
+    db.session.expunge(another_user)
+    deps.get_current_user(another_token)
+    assert cache.auth_cache.get("user", user_id) is not None
+
+    User.update(user_id, is_active=False)
+
+    assert cache.auth_cache.get("user", user_id) is None
+    with pytest.raises(HTTPException):
+        deps.get_current_active_user(deps.get_current_user(another_token))
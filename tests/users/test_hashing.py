@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.api.exceptions import WrongLoginCredentials
+from app.core import hashing
+from app.models import User
+
+BURST = 16
+
+
+def test_hasher_is_built_once():
+    assert hashing.hasher() is hashing.hasher()
+    assert User._hasher() is hashing.hasher()
+
+
+async def test_hash_in_pool_matches_sync_hash():
+    hashed = await hashing.ahash_password("1234")
+
+    assert hashed == User.set_password("1234")
+    assert await hashing.averify_password("1234", hashed)
+    assert not await hashing.averify_password("4321", hashed)
+
+
+async def test_aauthenticate(db, user):
+    assert (await User.aauthenticate(user.email, "1234")).id == user.id
+
+    with pytest.raises(WrongLoginCredentials):
+        await User.aauthenticate(user.email, "wrong")
+    with pytest.raises(WrongLoginCredentials):
+        await User.aauthenticate("nobody@example.com", "1234")
+
+
+async def test_aauthenticate_looks_user_up_off_the_loop(db, user, mocker):
+    threads = []
+    get = User.get
+
+    def recording_get(**fields):
+        threads.append(threading.current_thread())
+        return get(**fields)
+
+    mocker.patch.object(User, "get", side_effect=recording_get)
+
+    assert (await User.aauthenticate(user.email, "1234")).id == user.id
+    assert threads and threads[0] is not threading.current_thread()
+
+
+def test_create_user_route(client, db):
+    response = client.post(
+        "users/", json={"email": "pool@example.com", "password": "1234"}
+    )
+
+    assert response.status_code == 201
+    user = User.get(id=response.json()["id"])
+    assert User.verify_password("1234", user)
+    User.delete(user)
+
+
+async def _burst(hash_burst):
+    """Max delay of a 1ms ticker and elapsed time while hashing a burst."""
+    lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - start)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await hash_burst()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await task
+    return lag, elapsed
+
+
+@pytest.mark.benchmark
+async def test_signup_burst_doesnt_block_event_loop():
+    passwords = [f"password {i}" for i in range(BURST)]
+
+    async def blocking():
+        for password in passwords:
+            hashing.hash_password(password)
+
+    async def pooled():
+        await asyncio.gather(*(hashing.ahash_password(p) for p in passwords))
+
+    await pooled()  # start workers
+    blocking_lag, blocking_time = await _burst(blocking)
+    pooled_lag, pooled_time = await _burst(pooled)
+
+    single = blocking_time / BURST
+    assert pooled_lag < max(single * 2, 0.02)
+    assert pooled_lag * 4 < blocking_lag
+    assert pooled_time < blocking_time * 1.5